@@ -0,0 +1,78 @@
+import os
+import random
+from typing import List
+
+_SENTENCES = [
+    "The price to earnings ratio compares the share price with the earnings per share of a company.",
+    "A high P/E ratio can signal growth expectations or an overvalued stock relative to its earnings multiple.",
+    "Return on equity measures how much profit a company generates with the money shareholders have invested.",
+    "Return on assets shows how efficiently management uses the asset base to produce net income.",
+    "The price to book ratio relates the market value of equity to its accounting book value.",
+    "Debt to equity describes financial leverage and the share of the balance sheet funded by creditors.",
+    "Market capitalization is the market value of all outstanding shares and a common measure of company size.",
+    "The price to sales ratio is useful for companies without positive earnings because revenue is rarely negative.",
+    "Diluted earnings per share include the effect of options and convertible securities on the share count.",
+    "Valuation multiples should be compared with peers in the same industry and with the company's own history.",
+    "Inflation and interest rates influence the discount rate investors apply to expected cash flows.",
+    "Free cash flow is the cash a business generates after capital expenditures required to maintain its assets.",
+]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: List[str], line_length: int = 90) -> None:
+    """
+    Writes a minimal PDF with one Helvetica text page per entry of pages.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>")
+    font_id = 3 + 2 * len(pages)
+    for i, text in enumerate(pages):
+        lines = [text[j:j + line_length] for j in range(0, len(text), line_length)]
+        operations = "BT /F1 9 Tf 30 810 Td 11 TL " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>")
+        objects.append(f"<< /Length {len(operations)} >>\nstream\n{operations}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def build_corpus(directory: str, documents: int, pages_per_document: int = 4, sentences_per_page: int = 30,
+                 seed: int = 0) -> List[str]:
+    """
+    Generates reproducible finance-flavoured PDF documents.
+    Args:
+        directory: Target folder, created if missing.
+        documents: Number of PDF files.
+        pages_per_document: Pages per file.
+        sentences_per_page: Sentences per page.
+        seed: Random seed; the same arguments always produce the same files.
+    Returns:
+        The paths of the generated files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for d in range(documents):
+        pages = []
+        for p in range(pages_per_document):
+            sentences = [rng.choice(_SENTENCES) for _ in range(sentences_per_page)]
+            pages.append(f"Document {d} page {p + 1}. " + " ".join(sentences))
+        path = os.path.join(directory, f"document_{d:04d}.pdf")
+        write_pdf(path, pages)
+        paths.append(path)
+    return paths
@@ -0,0 +1,135 @@
+import re
+import json
+import time
+import math
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def deterministic_embedding(text: str, dim: int = 64) -> List[float]:
+    """
+    Hashes the words of a text into a normalized bag-of-words vector, so texts sharing words are similar
+    and the same text always gets the same embedding.
+    """
+    vector = [0.0] * dim
+    for word in _WORD_PATTERN.findall(text.lower()):
+        digest = hashlib.sha256(word.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], "little") % dim
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOllama:
+    """
+    Local stand-in for the Ollama HTTP API (/api/embed, /api/chat, /api/tags) with deterministic
+    embeddings and canned generations of configurable latency.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, embedding_dim: int = 64,
+                 embed_latency: float = 0.0, generation_latency: float = 0.05, token_latency: float = 0.0,
+                 tokens: int = 64, models: Optional[List[str]] = None):
+        self.embedding_dim = embedding_dim
+        self.embed_latency = embed_latency
+        self.generation_latency = generation_latency
+        self.token_latency = token_latency
+        self.tokens = tokens
+        self.models = models or ["llama3:latest", "mxbai-embed-large:latest"]
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _answer_words(self, prompt: str) -> List[str]:
+        seed = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return [f"word{i}-{seed}" for i in range(self.tokens)]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, body: dict, status: int = 200):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": name, "model": name} for name in fake.models]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/embed":
+                    inputs = body.get("input", [])
+                    inputs = [inputs] if isinstance(inputs, str) else inputs
+                    time.sleep(fake.embed_latency)
+                    self._send_json({
+                        "model": body.get("model"),
+                        "embeddings": [deterministic_embedding(text, fake.embedding_dim) for text in inputs],
+                    })
+                elif self.path == "/api/chat":
+                    self._chat(body)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _chat(self, body: dict):
+                prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+                words = fake._answer_words(prompt)[:body.get("options", {}).get("num_predict", fake.tokens)]
+                stats = {
+                    "prompt_eval_count": len(prompt) // 4,
+                    "prompt_eval_duration": int(fake.generation_latency * 1e9),
+                    "eval_count": len(words),
+                    "eval_duration": int(fake.token_latency * len(words) * 1e9),
+                }
+                time.sleep(fake.generation_latency)
+                if not body.get("stream"):
+                    time.sleep(fake.token_latency * len(words))
+                    self._send_json({"model": body.get("model"), "message": {"role": "assistant", "content": " ".join(words)},
+                                     "done": True, **stats})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for word in words:
+                    time.sleep(fake.token_latency)
+                    self._write_chunk({"message": {"role": "assistant", "content": word + " "}, "done": False})
+                self._write_chunk({"message": {"role": "assistant", "content": ""}, "done": True, **stats})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, event: dict):
+                data = (json.dumps(event) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
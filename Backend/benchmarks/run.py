@@ -0,0 +1,272 @@
+"""
+End-to-end latency benchmarks of the RAG pipeline against local stand-ins.
+
+Starts a fake Ollama server and replaces yfinance and the World Bank API with deterministic stubs, then
+measures ingestion, retrieval, prompt building and the full /api/run endpoint for every corpus size and
+concurrency level. Run from the Backend folder:
+
+    python -m benchmarks.run --corpus-sizes 5,20 --concurrency 1,4 --output benchmark_results.json
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.corpus import build_corpus
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.stubs import install_stubs
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Returns the q-th percentile (0-100) of the values with linear interpolation.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], wall_time: float) -> Dict:
+    """
+    Summarizes per-call latencies (seconds) and the wall time of all calls.
+    """
+    return {
+        "iterations": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "throughput_per_s": len(latencies) / wall_time if wall_time else None,
+    }
+
+
+def measure(call: Callable[[int], None], iterations: int, concurrency: int) -> Dict:
+    """
+    Runs call(i) for i in range(iterations) with the given number of threads and summarizes the latencies.
+    """
+    def timed(i: int) -> float:
+        started = time.perf_counter()
+        call(i)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(iterations)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _configure_environment(base_url: str, args: argparse.Namespace) -> None:
+    # Read by the rag modules at import time, so this has to run before they are imported
+    os.environ["OLLAMA_BASE_URL"] = base_url
+    os.environ["OLLAMA_MAX_PARALLEL"] = str(args.ollama_parallel)
+    os.environ["LLM_CACHE_BACKEND"] = "none"
+    os.environ["SECTOR_ETF_CACHE_PATH"] = ""
+    os.environ["SECTOR_ETF_REFRESH_INTERVAL"] = "0"
+    os.environ.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+
+def bench_ingestion(pipeline, folder: str) -> Dict:
+    report = pipeline.ingest_pdf_folder(folder)
+    files = len(report["ingested"])
+    return {
+        "files": files,
+        "chunks": report["chunks"],
+        "failed": len(report["failed"]),
+        "duration_s": report["duration"],
+        "files_per_s": files / report["duration"] if report["duration"] else None,
+        "chunks_per_s": report["chunks"] / report["duration"] if report["duration"] else None,
+    }
+
+
+def bench_retrieval(pipeline, iterations: int, concurrency: int) -> Dict:
+    queries = [pipeline.query_builder.build_query(metric) for metric in pipeline.query_builder.metric_keywords]
+
+    def call(i: int):
+        pipeline.db_connector.query_collection(queries[i % len(queries)], n_results=5)
+
+    return measure(call, iterations, concurrency)
+
+
+def bench_prompt_build(iterations: int) -> Dict:
+    from rag.metrics import CompanyMetricsRetriever
+    from rag.prompt_engineering import build_metric_analysis_prompt
+
+    data = CompanyMetricsRetriever("BENCH").get_metrics()
+    context = "Literature context. " * 200
+
+    def call(i: int):
+        for metric, value in data["metrics"]["metrics"].items():
+            build_metric_analysis_prompt(
+                ticker="BENCH", metric=metric, value=value,
+                historical_metrics=data["historical_metrics"], peer_metrics=data["peer_metrics"],
+                macro_info=data["macro_info"], company_info=data["company_info"], literature_context=context,
+            )
+
+    return measure(call, iterations, 1)
+
+
+class _APIServer:
+    """
+    Serves the FastAPI app with uvicorn in a background thread.
+    """
+    def __init__(self):
+        import uvicorn
+        from fastapi_rag_api import app
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="bench-api", daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("API server failed to start")
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+def bench_api_run(base_url: str, iterations: int, concurrency: int, label: str) -> Dict:
+    import requests
+
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=max(concurrency, 10)))
+
+    def call(i: int):
+        # A new ticker per request, so neither the result cache nor the market data cache answers it
+        response = session.post(f"{base_url}/api/run", json={"ticker": f"B{label}C{concurrency}N{i:04d}"}, timeout=600)
+        response.raise_for_status()
+
+    return measure(call, iterations, concurrency)
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict:
+    fake = FakeOllama(embed_latency=args.embed_latency, generation_latency=args.llm_latency,
+                      token_latency=args.token_latency, tokens=args.tokens)
+    base_url = fake.start()
+    _configure_environment(base_url, args)
+
+    from rag.pipeline import RAGPipeline
+    install_stubs(market_latency=args.market_latency, worldbank_latency=args.worldbank_latency)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    original_cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    results = []
+    try:
+        for size in args.corpus_sizes:
+            # Every corpus size gets its own ChromaDB, manifest and embedding cache (all relative to the cwd)
+            size_dir = os.path.join(workdir, f"corpus_{size}")
+            os.makedirs(size_dir)
+            os.chdir(size_dir)
+            build_corpus("literature", size, pages_per_document=args.pages_per_document)
+            pipeline = RAGPipeline(persist_directory="rag/chroma_db")
+            try:
+                if "ingest" in args.benchmarks:
+                    result = bench_ingestion(pipeline, "literature")
+                    results.append({"benchmark": "ingest", "corpus_size": size, "concurrency": None, **result})
+                    logging.warning(f"ingest size={size}: {result['duration_s']:.2f}s")
+                elif "retrieval" in args.benchmarks or "run" in args.benchmarks:
+                    pipeline.ingest_pdf_folder("literature")
+
+                for concurrency in args.concurrency:
+                    if "retrieval" in args.benchmarks:
+                        result = bench_retrieval(pipeline, args.iterations, concurrency)
+                        results.append({"benchmark": "retrieval", "corpus_size": size, "concurrency": concurrency, **result})
+                        logging.warning(f"retrieval size={size} c={concurrency}: p50={result['p50_ms']:.1f}ms")
+            finally:
+                pipeline.close()
+
+            if "run" in args.benchmarks:
+                with _APIServer() as api_url:
+                    for concurrency in args.concurrency:
+                        result = bench_api_run(api_url, args.run_iterations, concurrency, label=str(size))
+                        results.append({"benchmark": "api_run", "corpus_size": size, "concurrency": concurrency, **result})
+                        logging.warning(f"api_run size={size} c={concurrency}: p50={result['p50_ms']:.1f}ms")
+
+        if "prompt" in args.benchmarks:
+            result = bench_prompt_build(args.iterations)
+            results.append({"benchmark": "prompt_build", "corpus_size": None, "concurrency": 1, **result})
+    finally:
+        os.chdir(original_cwd)
+        fake.stop()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency benchmarks of the RAG pipeline with local stand-ins.")
+    parser.add_argument("--corpus-sizes", type=_int_list, default=[5, 20], help="Comma-separated numbers of PDFs")
+    parser.add_argument("--pages-per-document", type=int, default=4)
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4], help="Comma-separated client concurrency levels")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per retrieval/prompt measurement")
+    parser.add_argument("--run-iterations", type=int, default=8, help="Requests per /api/run measurement")
+    parser.add_argument("--benchmarks", type=lambda v: v.split(","), default=["ingest", "retrieval", "prompt", "run"],
+                        help="Comma-separated subset of ingest,retrieval,prompt,run")
+    parser.add_argument("--embed-latency", type=float, default=0.005, help="Seconds per fake /api/embed request")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds of fake prefill per generation")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per fake generated token")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens per fake generation")
+    parser.add_argument("--market-latency", type=float, default=0.05, help="Seconds per stubbed yfinance field")
+    parser.add_argument("--worldbank-latency", type=float, default=0.02, help="Seconds per stubbed World Bank lookup")
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="OLLAMA_MAX_PARALLEL of the pipeline")
+    parser.add_argument("--output", default="benchmark_results.json", help="Path of the JSON report ('-' for stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+    output = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(output)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import time
+import hashlib
+from typing import Dict, Optional
+import pandas as pd
+
+# Deterministic per-ticker values, so repeated benchmark runs build identical prompts
+_YEARS = [pd.Timestamp(f"{year}-12-31") for year in (2024, 2023, 2022, 2021)]
+
+
+def _ticker_number(ticker: str) -> float:
+    return int(hashlib.sha256(ticker.encode("utf-8")).hexdigest()[:6], 16) / 0xFFFFFF
+
+
+class FakeTicker:
+    """
+    Stand-in for yfinance.Ticker serving canned info and statements after a configurable delay per field.
+    """
+    latency = 0.0
+
+    def __init__(self, ticker: str, *args, **kwargs):
+        self.ticker = ticker.upper()
+        self._x = _ticker_number(self.ticker)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def info(self) -> Dict:
+        self._wait()
+        x = self._x
+        return {
+            "longName": f"{self.ticker} Corporation",
+            "sector": "Technology",
+            "industry": "Software",
+            "fullTimeEmployees": int(1000 + x * 100000),
+            "marketCap": int(1e9 + x * 1e12),
+            "longBusinessSummary": f"{self.ticker} develops software and services for enterprise customers. " * 10,
+            "city": "Cupertino", "state": "CA", "country": "United States",
+            "website": f"https://{self.ticker.lower()}.example",
+            "trailingEps": round(1 + 10 * x, 2),
+            "trailingPE": round(10 + 30 * x, 2),
+            "returnOnAssets": round(0.02 + 0.2 * x, 4),
+            "priceToBook": round(1 + 20 * x, 2),
+            "returnOnEquity": round(0.05 + 0.5 * x, 4),
+            "debtToEquity": round(20 + 150 * x, 2),
+            "priceToSalesTrailing12Months": round(1 + 10 * x, 2),
+            # Sector ETF fields
+            "ytdReturn": 0.12, "threeYearAverageReturn": 0.15, "totalAssets": 7e10,
+            "dividendYield": 0.007, "beta": 1.1,
+        }
+
+    def _statement(self, rows: Dict[str, float]) -> pd.DataFrame:
+        self._wait()
+        return pd.DataFrame(
+            {year: {name: value * (1 - 0.05 * i) for name, value in rows.items()} for i, year in enumerate(_YEARS)}
+        )
+
+    @property
+    def financials(self) -> pd.DataFrame:
+        return self._statement({"Total Revenue": 5e10 * (1 + self._x), "Net Income": 8e9 * (1 + self._x)})
+
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self._statement({"Total Stockholder Equity": 6e10, "Total Debt": 3e10 * (1 + self._x)})
+
+    @property
+    def cashflow(self) -> pd.DataFrame:
+        return self._statement({"Free Cash Flow": 9e9 * (1 + self._x)})
+
+
+class StubWorldBankClient:
+    """
+    Stand-in for rag.worldbank.WorldBankClient returning deterministic indicator values after a delay per lookup.
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    @staticmethod
+    def _value(country_code: str, indicator: str, year: int) -> float:
+        return round(_ticker_number(f"{country_code}/{indicator}/{year}") * 10, 3)
+
+    def get_indicator_value(self, country_code: str, indicator: str, year: int) -> Optional[float]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._value(country_code, indicator, year)
+
+    def get_indicator_values(self, country_code: str, indicators: Dict[str, str], year: int) -> Dict[str, Optional[float]]:
+        # The real client fetches missing indicators concurrently, so one delay covers all of them
+        if self.latency:
+            time.sleep(self.latency)
+        return {name: self._value(country_code, code, year) for name, code in indicators.items()}
+
+
+def install_stubs(market_latency: float = 0.0, worldbank_latency: float = 0.0) -> None:
+    """
+    Replaces yfinance.Ticker and the process-wide World Bank client with the local stand-ins.
+    """
+    import yfinance
+    from rag import worldbank
+
+    FakeTicker.latency = market_latency
+    yfinance.Ticker = FakeTicker
+    worldbank._default_client = StubWorldBankClient(worldbank_latency)
@@ -1,10 +1,13 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Tuple, Optional
+from contextlib import asynccontextmanager
 import json
 import os
 import logging
+import threading
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,12 +15,21 @@ logging.basicConfig(
     datefmt="%H:%M:%S"
 )
 from rag.pipeline import RAGPipeline  # Passe den Import ggf. an
+from rag.sector_etf import get_sector_etf_cache
+from rag.http_client import close_session, aclose_async_client
+from rag.jobs import JobManager
+from rag.telemetry import trace, render_metrics
 
 # =====================================================
 
 logger = logging.getLogger("RAGAPI")
 logging.basicConfig(level=logging.INFO)
 
+# Intervall (Sekunden) für die Hintergrund-Aktualisierung der Sektor-ETFs, 0 = deaktiviert
+SECTOR_ETF_REFRESH_INTERVAL = float(os.getenv("SECTOR_ETF_REFRESH_INTERVAL", "0"))
+# Maximale Anzahl Ticker pro /api/run-batch-Anfrage
+RUN_BATCH_MAX_TICKERS = int(os.getenv("RUN_BATCH_MAX_TICKERS", "50"))
+
 # -------------------- Pydantic Schemas --------------------
 
 class QueryRequest(BaseModel):
@@ -30,9 +42,14 @@ class QueryResponse(BaseModel):
 
 class IngestFolderRequest(BaseModel):
     folder_path: str = Field(..., description="Ordnerpfad mit PDFs")
+    remove_missing: bool = Field(False, description="Chunks gelöschter Dateien aus der Collection entfernen")
 
 class RunRequest(BaseModel):
     ticker: str = Field(..., description="Aktien-Ticker, z. B. AAPL")
+    include_timings: bool = Field(False, description="Zeitmessung je Pipeline-Schritt mit zurückgeben (Debugging)")
+
+class RunBatchRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1, max_length=RUN_BATCH_MAX_TICKERS, description="Aktien-Ticker der Watchlist")
 
 class RunMetricItem(BaseModel):
     value: Any
@@ -41,10 +58,22 @@ class RunMetricItem(BaseModel):
 
 class RunResponse(BaseModel):
     results: Dict[str, RunMetricItem]
+    timings: Optional[Dict[str, Any]] = None
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl: float
+    hits: int
+    misses: int
+    hit_rate: float
 
 class HealthResponse(BaseModel):
+    status: str
     database: Dict[str, Any]
     llm: Dict[str, Any]
+    checked_at: float
+    cached: bool
 
 class AddDocumentRequest(BaseModel):
     path: str
@@ -55,14 +84,33 @@ class RAGAPI:
 
     def __init__(self, pipeline: Optional[RAGPipeline] = None) -> None:
         self.pipeline = pipeline or RAGPipeline()
+        self._reload_lock = threading.Lock()
+        # Ingestion läuft im Hintergrund, Status über /api/jobs/{id}
+        self.jobs = JobManager()
+
+    def close(self) -> None:
+        self.jobs.shutdown()
+        self.pipeline.close()
 
     # ---- Endpoints ----
 
+    def reload(self) -> dict:
+        try:
+            with self._reload_lock:
+                # Ein Job schreibt über den Client in die Collection und liest das Manifest
+                if self.jobs.has_active():
+                    raise HTTPException(status_code=409, detail="Reload nicht möglich, solange Ingestion-Jobs laufen")
+                self.pipeline.reload()
+            return {"message": "Pipeline neu geladen"}
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception("Fehler bei reload")
+            raise HTTPException(status_code=500, detail=str(e))
+
     def health(self) -> HealthResponse:
         try:
-            status_json = self.pipeline.check_health()
-            status = json.loads(status_json)
-            return HealthResponse(**status)
+            return HealthResponse(**self.pipeline.check_health())
         except Exception as e:
             logger.exception("Healthcheck fehlgeschlagen")
             raise HTTPException(status_code=500, detail=f"Healthcheck fehlgeschlagen: {e}")
@@ -71,8 +119,17 @@ class RAGAPI:
         try:
             if not os.path.isdir(payload.folder_path):
                 raise HTTPException(status_code=400, detail="Ordner nicht gefunden oder kein Verzeichnis")
-            self.pipeline.ingest_pdf_folder(payload.folder_path)
-            return {"message": "Ingestion gestartet/abgeschlossen", "folder": payload.folder_path}
+            job = self.jobs.submit(
+                "ingest-folder",
+                payload.folder_path,
+                lambda job: self.pipeline.ingest_pdf_folder(
+                    payload.folder_path,
+                    remove_missing=payload.remove_missing,
+                    progress_callback=job.on_progress,
+                    should_stop=job.is_cancelled,
+                ),
+            )
+            return {"message": "Ingestion gestartet", "folder": payload.folder_path, "job_id": job.id}
         except HTTPException:
             raise
         except Exception as e:
@@ -86,14 +143,39 @@ class RAGAPI:
             if not path.lower().endswith(".pdf"):
                 raise HTTPException(status_code=400, detail="Nur PDF-Dateien werden akzeptiert")
 
-            self.pipeline.add_document(path)
-            return {"message": "Dokument hinzugefügt", "path": path}
+            def work(job):
+                job.on_progress({"file": path, "status": "running"})
+                try:
+                    ids = self.pipeline.add_document(path)
+                except Exception as e:
+                    job.on_progress({"file": path, "status": "failed", "error": str(e)})
+                    raise
+                job.on_progress({"file": path, "status": "written", "chunks": len(ids)})
+                return {"chunk_ids": ids}
+
+            job = self.jobs.submit("add-document", path, work)
+            return {"message": "Dokument wird hinzugefügt", "path": path, "job_id": job.id}
         except HTTPException:
             raise
         except Exception as e:
             logger.exception("Fehler bei add_document")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def get_job(self, job_id: str) -> dict:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden")
+        return job.to_dict()
+
+    def list_jobs(self) -> List[dict]:
+        return [job.to_dict() for job in self.jobs.list()]
+
+    def cancel_job(self, job_id: str) -> dict:
+        job = self.jobs.cancel(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job nicht gefunden")
+        return job.to_dict()
+
     def delete_collection(self) -> dict:
         try:
             self.pipeline.delete_collection()
@@ -112,7 +194,8 @@ class RAGAPI:
 
     def run(self, payload: RunRequest) -> RunResponse:
         try:
-            raw = self.pipeline.run(payload.ticker)
+            with trace() as run_trace:
+                raw = self.pipeline.run(payload.ticker)
             # Rohformat -> pydantic-konformes Mapping
             normalized: Dict[str, RunMetricItem] = {}
             for metric, content in raw.items():
@@ -121,30 +204,76 @@ class RAGAPI:
                     llm_response=content.get("llm_response", ""),
                     sources=content.get("sources", []),
                 )
-            return RunResponse(results=normalized)
+            timings = run_trace.to_dict() if payload.include_timings else None
+            return RunResponse(results=normalized, timings=timings)
         except Exception as e:
             logger.exception("Fehler bei run")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def run_stream(self, payload: RunRequest) -> StreamingResponse:
+        # Läuft auf der Event-Loop: die Generierung nutzt den async Ollama-Client statt eines Threads pro Metrik
+        async def events():
+            try:
+                async for event in self.pipeline.run_stream(payload.ticker):
+                    yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+            except Exception as e:
+                logger.exception("Fehler bei run_stream")
+                yield json.dumps({"event": "error", "message": str(e)}, ensure_ascii=False) + "\n"
+
+        # NDJSON: ein Event pro Zeile, sobald es verfügbar ist
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    def run_batch(self, payload: RunBatchRequest) -> StreamingResponse:
+        def events():
+            try:
+                for event in self.pipeline.run_batch(payload.tickers):
+                    yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+            except Exception as e:
+                logger.exception("Fehler bei run_batch")
+                yield json.dumps({"event": "error", "message": str(e)}, ensure_ascii=False) + "\n"
+
+        # NDJSON: ein Ergebnis pro Ticker, sobald alle seine Kennzahlen generiert sind
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    def run_cache_stats(self) -> CacheStatsResponse:
+        return CacheStatsResponse(**self.pipeline.cache_stats())
+
 # -------------------- FastAPI-Wiring --------------------
 
 router = APIRouter()
 
-def get_api() -> RAGAPI:
-    return RAGAPI()
+def get_api(request: Request) -> RAGAPI:
+    # Prozessweite Instanz aus dem App-Lifespan (kein Neuaufbau pro Request)
+    return request.app.state.api
 
 @router.get("/health", response_model=HealthResponse)
-def health(api: RAGAPI = Depends(get_api)):
-    return api.health()
-
-@router.post("/ingest-folder")
+def health(response: Response, api: RAGAPI = Depends(get_api)):
+    result = api.health()
+    # 503, damit Load Balancer die Instanz nicht mehr anfragen, solange DB oder Ollama nicht erreichbar sind
+    if result.status == "error":
+        response.status_code = 503
+    return result
+
+@router.post("/ingest-folder", status_code=202)
 def ingest_folder(payload: IngestFolderRequest, api: RAGAPI = Depends(get_api)):
     return api.ingest_folder(payload)
 
-@router.post("/add-document")
+@router.post("/add-document", status_code=202)
 def add_document(payload: AddDocumentRequest, api: RAGAPI = Depends(get_api)):
     return api.add_document(payload.path)
 
+@router.get("/jobs")
+def list_jobs(api: RAGAPI = Depends(get_api)):
+    return api.list_jobs()
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, api: RAGAPI = Depends(get_api)):
+    return api.get_job(job_id)
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str, api: RAGAPI = Depends(get_api)):
+    return api.cancel_job(job_id)
+
 @router.delete("/collection")
 def delete_collection(api: RAGAPI = Depends(get_api)):
     return api.delete_collection()
@@ -157,9 +286,46 @@ def query(payload: QueryRequest, api: RAGAPI = Depends(get_api)):
 def run(payload: RunRequest, api: RAGAPI = Depends(get_api)):
     return api.run(payload)
 
+@router.post("/run/stream")
+async def run_stream(payload: RunRequest, api: RAGAPI = Depends(get_api)):
+    return api.run_stream(payload)
+
+@router.post("/run-batch")
+def run_batch(payload: RunBatchRequest, api: RAGAPI = Depends(get_api)):
+    return api.run_batch(payload)
+
+@router.get("/run/cache-stats", response_model=CacheStatsResponse)
+def run_cache_stats(api: RAGAPI = Depends(get_api)):
+    return api.run_cache_stats()
+
+@router.post("/reload")
+def reload(api: RAGAPI = Depends(get_api)):
+    return api.reload()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pipeline einmalig beim Start aufbauen und Collection-Handle vorwärmen
+    api = RAGAPI()
+    api.pipeline.db_connector.get_collection()
+    app.state.api = api
+    # Retrieval-Ergebnisse der Metrik-Queries im Hintergrund vorberechnen
+    threading.Thread(target=api.pipeline.refresh_retrieval_index, name="retrieval-warmup", daemon=True).start()
+    logger.info("RAGPipeline initialisiert")
+    if SECTOR_ETF_REFRESH_INTERVAL > 0:
+        get_sector_etf_cache().start_background_refresh(SECTOR_ETF_REFRESH_INTERVAL)
+    try:
+        yield
+    finally:
+        get_sector_etf_cache().stop_background_refresh()
+        api.close()
+        close_session()
+        await aclose_async_client()
+        logger.info("RAGPipeline beendet")
+
 
 def build_app() -> FastAPI:
-    app = FastAPI(title="RAGPipeline API", version="1.0.0")
+    app = FastAPI(title="RAGPipeline API", version="1.0.0", lifespan=lifespan)
 
     # CORS für Frontends (anpassen für Produktion)
     app.add_middleware(
@@ -171,6 +337,13 @@ def build_app() -> FastAPI:
     )
 
     app.include_router(router, prefix="/api")
+
+    # Prometheus-Metriken (Dauer je Pipeline-Schritt, Token-Zahlen von Ollama)
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
     return app
 
 
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    A thread-safe in-memory LRU cache whose entries expire after a fixed time-to-live.
+    """
+    def __init__(self, maxsize: int = 128, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One future per key that is currently being computed, so concurrent misses compute only once
+        self._inflight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for the key or the default if it is missing or expired.
+        Args:
+            key: The cache key.
+            default: Value returned on a cache miss.
+        Returns:
+            The cached value or the default.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value and evicts the least recently used entries if the cache is full.
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl: Optional time-to-live in seconds overriding the cache default.
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Returns the cached value or computes, stores and returns it. Concurrent callers
+        asking for the same missing key wait for a single computation and share its result or error.
+        Args:
+            key: The cache key.
+            factory: Callable producing the value on a cache miss.
+            ttl: Optional time-to-live in seconds overriding the cache default.
+        Returns:
+            The cached or freshly computed value.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+
+        with self._lock:
+            # Another caller may have filled the entry since the lookup above
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._data.move_to_end(key)
+                return entry[1]
+            future = self._inflight.get(key)
+            computing = future is None
+            if computing:
+                future = self._inflight[key] = Future()
+        if not computing:
+            return future.result()
+
+        try:
+            value = factory()
+        except BaseException as e:
+            # Waiting callers get the error as well, the next caller computes again
+            future.set_exception(e)
+            raise
+        else:
+            # The value is stored before the future is dropped, so later callers find it in the cache
+            self.set(key, value, ttl=ttl)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a single entry from the cache.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss counters and the current size of the cache.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,159 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Token budget of the literature context per metric prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+# Per-model budgets overriding CONTEXT_TOKEN_BUDGET, e.g. "llama3=1200,mistral=2000"
+CONTEXT_TOKEN_BUDGETS = os.getenv("CONTEXT_TOKEN_BUDGETS", "")
+# Jaccard similarity of word shingles above which a context block counts as a duplicate
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+# Rough characters per token of the Llama/Mistral tokenizers for English text
+CHARS_PER_TOKEN = 4
+# Minimum number of characters two adjacent chunks have to share to be merged at the overlap
+_MIN_OVERLAP = 20
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _parse_budgets(spec: str) -> Dict[str, int]:
+    budgets = {}
+    for entry in spec.split(","):
+        model, _, tokens = entry.partition("=")
+        if model.strip() and tokens.strip():
+            budgets[model.strip()] = int(tokens)
+    return budgets
+
+
+_MODEL_BUDGETS = _parse_budgets(CONTEXT_TOKEN_BUDGETS)
+
+
+def context_budget(model_name: Optional[str]) -> int:
+    """
+    Returns the context token budget of a model; "llama3" and "llama3:latest" share one entry.
+    """
+    if model_name:
+        for name in (model_name, model_name.split(":")[0], f"{model_name}:latest"):
+            if name in _MODEL_BUDGETS:
+                return _MODEL_BUDGETS[name]
+    return CONTEXT_TOKEN_BUDGET
+
+
+def _merge_overlapping(first: str, second: str) -> str:
+    """
+    Joins two consecutive chunks, dropping the text the second one repeats from the end of the first.
+    """
+    for size in range(min(len(first), len(second)), _MIN_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    # Chunks are stripped, so the overlap may have lost a space at either end
+    head = second[:_MIN_OVERLAP]
+    position = first.rfind(head, max(0, len(first) - len(second) - _MIN_OVERLAP))
+    if position != -1 and second.startswith(first[position:].strip()):
+        return first[:position] + second
+    return first + " " + second
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """
+    Cuts a text to at most max_chars characters, preferably after a sentence.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind('.'), cut.rfind('!'), cut.rfind('?'))
+    if sentence_end > max_chars // 2:
+        return cut[:sentence_end + 1]
+    word_end = cut.rfind(' ')
+    return cut[:word_end] if word_end > 0 else cut
+
+
+def assemble_context(results: Sequence[Sequence[Any]], token_budget: int = CONTEXT_TOKEN_BUDGET,
+                     duplicate_threshold: float = CONTEXT_DUPLICATE_THRESHOLD) -> Tuple[str, List[str]]:
+    """
+    Builds the prompt context from ranked retrieval results.
+
+    Neighbouring chunks of the same PDF are merged into one block without repeating their overlap,
+    blocks that are near-duplicates of a better ranked block are dropped, and the blocks are added
+    in rank order until the token budget is used up (the last one is cut at a sentence).
+    Args:
+        results: [document_id, document_text, metadata] per chunk, best first
+        token_budget: Maximum estimated tokens of the context
+        duplicate_threshold: Shingle similarity at which a block counts as a duplicate
+    Returns:
+        The context and the IDs of the chunks it contains
+    """
+    # Group the chunks into blocks of consecutive chunks of one PDF, ranked by their best chunk
+    blocks: List[dict] = []
+    by_position: Dict[Tuple[str, Any, int], dict] = {}
+    for rank, result in enumerate(results):
+        doc_id, text = result[0], result[1]
+        metadata = result[2] if len(result) > 2 and result[2] else {}
+        pdf_hash, index = metadata.get("pdf_hash"), metadata.get("chunk_index")
+        if pdf_hash is None or index is None:
+            blocks.append({"rank": rank, "chunks": [(0, doc_id, text)]})
+            continue
+        # Chunks of the same PDF with other chunking parameters are not neighbours
+        document = (pdf_hash, metadata.get("chunking"))
+        if (*document, index) in by_position:
+            continue  # The same chunk was returned twice
+        block = {"rank": rank, "chunks": [(index, doc_id, text)]}
+        by_position[(*document, index)] = block
+        for neighbour_index in (index - 1, index + 1):
+            neighbour = by_position.get((*document, neighbour_index))
+            if neighbour is not None and neighbour is not block:
+                block["rank"] = min(block["rank"], neighbour["rank"])
+                block["chunks"].extend(neighbour["chunks"])
+                blocks.remove(neighbour)
+                for chunk_index, _, _ in neighbour["chunks"]:
+                    by_position[(*document, chunk_index)] = block
+        blocks.append(block)
+    blocks.sort(key=lambda block: block["rank"])
+
+    # Merge every block into one text and drop near-duplicates
+    selected: List[Tuple[str, List[str]]] = []
+    seen_shingles: List[set] = []
+    for block in blocks:
+        chunks = sorted(block["chunks"])
+        text = chunks[0][2]
+        for _, _, chunk in chunks[1:]:
+            text = _merge_overlapping(text, chunk)
+        text = text.strip()
+        if not text:
+            continue
+        shingles = _shingles(text)
+        duplicate = any(
+            shingles and len(shingles & other) / len(shingles | other) >= duplicate_threshold
+            for other in seen_shingles
+        )
+        if duplicate:
+            continue
+        seen_shingles.append(shingles)
+        selected.append((text, [doc_id for _, doc_id, _ in chunks]))
+
+    # Fill the token budget in rank order
+    context_parts = []
+    sources = []
+    remaining = token_budget * CHARS_PER_TOKEN
+    separator = len("\n\n")
+    for text, ids in selected:
+        if context_parts:
+            remaining -= separator
+        if remaining <= 0:
+            break
+        if len(text) > remaining:
+            # A short remainder is not worth a fragment
+            if remaining < 50 * CHARS_PER_TOKEN and context_parts:
+                break
+            text = _truncate(text, remaining)
+        context_parts.append(text)
+        sources.extend(ids)
+        remaining -= len(text)
+    return "\n\n".join(context_parts), sources
@@ -0,0 +1,128 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from typing import List, Optional, Sequence
+import numpy as np
+
+# Optional directory shared by all ChromaDB paths; by default every database keeps its own cache next to its data
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR") or None
+
+
+def text_hash(text: str) -> str:
+    """
+    Returns the sha256 hex digest of a chunk text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (embedding model, sha256 of the chunk text).
+
+    The vectors of each model are stored as consecutive float32 rows in one file that is read
+    through a memory map; a SQLite index maps every text hash to its row.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL, rows INTEGER NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " model TEXT NOT NULL, sha TEXT NOT NULL, row INTEGER NOT NULL, PRIMARY KEY (model, sha))"
+        )
+        self._db.commit()
+        self._memmaps = {}
+
+    def _vector_path(self, model: str) -> str:
+        safe = "".join(c if c.isalnum() or c in ('-', '_', '.') else '-' for c in model)
+        return os.path.join(self.directory, f"{safe}.f32")
+
+    def _memmap(self, model: str, dim: int, rows: int) -> np.ndarray:
+        """
+        Returns a read-only memory map over the stored vectors of a model, reopened when rows were appended.
+        """
+        cached = self._memmaps.get(model)
+        if cached is None or cached.shape[0] != rows:
+            cached = np.memmap(self._vector_path(model), dtype=np.float32, mode="r", shape=(rows, dim))
+            self._memmaps[model] = cached
+        return cached
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up the embeddings of several texts.
+        Args:
+            model: The embedding model name.
+            texts: The chunk texts.
+        Returns:
+            One embedding per text (in input order), or None for texts that are not cached.
+        """
+        hashes = [text_hash(text) for text in texts]
+        with self._lock:
+            model_row = self._db.execute("SELECT dim, rows FROM models WHERE model = ?", (model,)).fetchone()
+            if model_row is None or model_row[1] == 0:
+                return [None] * len(texts)
+            dim, rows = model_row
+            found = {}
+            # Query in chunks to stay below SQLite's host parameter limit
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                for sha, row in self._db.execute(
+                    f"SELECT sha, row FROM vectors WHERE model = ? AND sha IN ({placeholders})", (model, *part)
+                ):
+                    found[sha] = row
+            vectors = self._memmap(model, dim, rows)
+            return [vectors[found[sha]].tolist() if sha in found else None for sha in hashes]
+
+    def put_many(self, model: str, texts: Sequence[str], embeddings: Sequence[Sequence[float]]) -> None:
+        """
+        Stores the embeddings of several texts; texts that are already cached are skipped.
+        Args:
+            model: The embedding model name.
+            texts: The chunk texts.
+            embeddings: One embedding per text.
+        """
+        if not texts:
+            return
+        with self._lock:
+            model_row = self._db.execute("SELECT dim, rows FROM models WHERE model = ?", (model,)).fetchone()
+            dim = len(embeddings[0]) if model_row is None else model_row[0]
+            # Rows are counted from the file, so vectors of an interrupted commit stay unused
+            # instead of shifting the row numbers; a partially written last row is cut off
+            path = self._vector_path(model)
+            rows = os.path.getsize(path) // (4 * dim) if os.path.isfile(path) else 0
+
+            new_hashes = []
+            new_vectors = []
+            seen = set()
+            for text, embedding in zip(texts, embeddings):
+                sha = text_hash(text)
+                if sha in seen or len(embedding) != dim:
+                    continue
+                seen.add(sha)
+                exists = self._db.execute("SELECT 1 FROM vectors WHERE model = ? AND sha = ?", (model, sha)).fetchone()
+                if exists is None:
+                    new_hashes.append(sha)
+                    new_vectors.append(embedding)
+            if not new_hashes:
+                return
+
+            block = np.asarray(new_vectors, dtype=np.float32)
+            with open(path, "ab") as f:
+                f.seek(rows * 4 * dim)
+                f.truncate()
+                f.write(block.tobytes())
+            self._db.executemany(
+                "INSERT INTO vectors (model, sha, row) VALUES (?, ?, ?)",
+                [(model, sha, rows + i) for i, sha in enumerate(new_hashes)]
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO models (model, dim, rows) VALUES (?, ?, ?)",
+                (model, dim, rows + len(new_hashes))
+            )
+            self._db.commit()
@@ -0,0 +1,135 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+import requests
+from .cache import TTLCache
+from .llm import OLLAMA_BASE_URL, is_model_available
+
+# Seconds a health report is reused, so frequent load balancer checks do not reach ChromaDB and Ollama every time
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "5"))
+# Seconds a single probe may take before it is reported as failed
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+
+
+def probe_database(connector, collection_name: str = "docs") -> Dict[str, Any]:
+    """
+    Reports whether the collection exists and how many chunks it holds, using the connector's warm client.
+    Args:
+        connector: The ChromaDBConnector of the pipeline.
+        collection_name: Name of the collection reported.
+    Returns:
+        Dict with status ("ok", "empty", "missing" or "error"), collection, count and latency_ms.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"collection": collection_name}
+    try:
+        collection = connector.get_collection()
+        if collection is None:
+            result.update(status="missing", count=0)
+        else:
+            count = collection.count()
+            result.update(status="ok" if count else "empty", count=count)
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    result["latency_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def fetch_model_names(timeout: float = HEALTH_PROBE_TIMEOUT) -> List[str]:
+    """
+    Lists the models of the Ollama server with a single request. Unlike get_available_models this bypasses the
+    retrying session, so an unreachable server costs at most one connect and one read timeout.
+    Args:
+        timeout: Connect and read timeout in seconds.
+    Returns:
+        The model names reported by /api/tags.
+    """
+    response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=(timeout, timeout))
+    response.raise_for_status()
+    return [model["name"] for model in response.json().get("models", [])]
+
+
+def probe_ollama(llm_model: str, embedding_model: str, timeout: float = HEALTH_PROBE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Checks that Ollama is reachable and serves the configured models; one /api/tags request answers both.
+    Args:
+        llm_model: Name of the generation model.
+        embedding_model: Name of the embedding model.
+        timeout: Maximum number of seconds to wait for Ollama.
+    Returns:
+        Dict with status ("ok", "degraded" or "unreachable"), base_url, reachable, models and latency_ms.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"base_url": OLLAMA_BASE_URL}
+    try:
+        available = fetch_model_names(timeout)
+    except Exception as e:
+        result.update(status="unreachable", reachable=False, error=str(e),
+                      models={llm_model: False, embedding_model: False})
+    else:
+        models = {name: is_model_available(name, available) for name in (llm_model, embedding_model)}
+        result.update(status="ok" if all(models.values()) else "degraded", reachable=True, models=models)
+    result["latency_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+class HealthChecker:
+    """
+    Runs the database and Ollama probes concurrently and caches the combined report for a few seconds.
+    """
+    def __init__(self, get_connector: Callable[[], Any], llm_model: str, embedding_model: str,
+                 collection_name: str = "docs", ttl: float = HEALTH_CACHE_TTL,
+                 probe_timeout: float = HEALTH_PROBE_TIMEOUT):
+        # A callable instead of the connector itself, so a reloaded pipeline is probed with its new client
+        self.get_connector = get_connector
+        self.llm_model = llm_model
+        self.embedding_model = embedding_model
+        self.collection_name = collection_name
+        self.probe_timeout = probe_timeout
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="health")
+
+    def check(self) -> Dict[str, Any]:
+        """
+        Returns the cached health report or probes again once it has expired; concurrent callers share one probe.
+        Returns:
+            Dict with status ("ok", "degraded" or "error"), database, llm, checked_at and cached.
+        """
+        computed = []
+
+        def compute() -> Dict[str, Any]:
+            computed.append(True)
+            return self._probe()
+
+        report = self._cache.get_or_compute("health", compute)
+        return {**report, "cached": not computed}
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached report, e.g. after the database was reloaded.
+        """
+        self._cache.clear()
+
+    def close(self) -> None:
+        """
+        Stops the probe threads.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _probe(self) -> Dict[str, Any]:
+        database_future = self._executor.submit(probe_database, self.get_connector(), self.collection_name)
+        llm_future = self._executor.submit(probe_ollama, self.llm_model, self.embedding_model, self.probe_timeout)
+        database = database_future.result()
+        llm = llm_future.result()
+
+        if database["status"] == "error" or not llm["reachable"]:
+            status = "error"
+        elif database["status"] != "ok" or llm["status"] != "ok":
+            status = "degraded"
+        else:
+            status = "ok"
+        if status != "ok":
+            logging.warning(f"Health check {status}: database={database['status']}, llm={llm['status']}")
+        return {"status": status, "database": database, "llm": llm, "checked_at": time.time()}
@@ -0,0 +1,170 @@
+import os
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Timeouts in seconds for connecting to Ollama and for waiting on a response
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "300"))
+# Retries for connection errors and 502/503/504 answers, with exponential backoff
+OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "3"))
+OLLAMA_RETRY_BACKOFF = float(os.getenv("OLLAMA_RETRY_BACKOFF", "0.5"))
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "16"))
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# An httpx.AsyncClient is bound to the event loop it was first used on
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def default_timeout(read_timeout: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Returns the (connect, read) timeout tuple used for Ollama requests.
+    Args:
+        read_timeout: Optional read timeout overriding OLLAMA_READ_TIMEOUT.
+    Returns:
+        The timeout tuple accepted by requests.
+    """
+    return OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT if read_timeout is None else read_timeout
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide requests session with keep-alive connection pooling and retries.
+    Generations are never retried after a read error, only connection errors and overload answers are.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=OLLAMA_MAX_RETRIES,
+                connect=OLLAMA_MAX_RETRIES,
+                read=0,
+                status=OLLAMA_MAX_RETRIES,
+                backoff_factor=OLLAMA_RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=None,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=OLLAMA_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled httpx.AsyncClient of the running event loop, the async counterpart of get_session
+    for async FastAPI endpoints. It keeps up to OLLAMA_POOL_SIZE connections alive.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            timeout=async_timeout(),
+            limits=httpx.Limits(max_connections=OLLAMA_POOL_SIZE, max_keepalive_connections=OLLAMA_POOL_SIZE),
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+def async_timeout(read_timeout: Optional[float] = None) -> httpx.Timeout:
+    """
+    Returns the httpx timeout used for async Ollama requests.
+    Args:
+        read_timeout: Optional read timeout overriding OLLAMA_READ_TIMEOUT.
+    Returns:
+        The timeout with OLLAMA_CONNECT_TIMEOUT for connecting.
+    """
+    return httpx.Timeout(OLLAMA_READ_TIMEOUT if read_timeout is None else read_timeout, connect=OLLAMA_CONNECT_TIMEOUT)
+
+
+async def _async_send(method: str, url: str, read_timeout: Optional[float], stream: bool, **kwargs) -> httpx.Response:
+    """
+    Sends a request with the async client, retrying connection errors and 502/503/504 answers with backoff
+    like the requests session; read errors are not retried.
+    """
+    client = get_async_client()
+    for attempt in range(OLLAMA_MAX_RETRIES + 1):
+        last_attempt = attempt == OLLAMA_MAX_RETRIES
+        try:
+            request = client.build_request(method, url, timeout=async_timeout(read_timeout), **kwargs)
+            response = await client.send(request, stream=stream)
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            await response.aclose()
+        except httpx.ConnectError:
+            if last_attempt:
+                raise
+        delay = OLLAMA_RETRY_BACKOFF * (2 ** attempt)
+        logging.info(f"Retrying {method} {url} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+async def async_request(method: str, url: str, read_timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+    """
+    Sends a request with the pooled async client.
+    Args:
+        method: The HTTP method.
+        url: The request URL.
+        read_timeout: Optional read timeout overriding OLLAMA_READ_TIMEOUT.
+        kwargs: Further arguments passed to httpx.AsyncClient.build_request.
+    Returns:
+        The httpx response with its body read.
+    """
+    return await _async_send(method, url, read_timeout, stream=False, **kwargs)
+
+
+@asynccontextmanager
+async def async_stream(method: str, url: str, read_timeout: Optional[float] = None, **kwargs) -> AsyncIterator[httpx.Response]:
+    """
+    Sends a request with the pooled async client and yields the response before its body is read.
+    Args:
+        method: The HTTP method.
+        url: The request URL.
+        read_timeout: Optional timeout for each chunk, overriding OLLAMA_READ_TIMEOUT.
+        kwargs: Further arguments passed to httpx.AsyncClient.build_request.
+    Yields:
+        The streaming httpx response; it is closed when the block is left.
+    """
+    response = await _async_send(method, url, read_timeout, stream=True, **kwargs)
+    try:
+        yield response
+    finally:
+        await response.aclose()
+
+
+def close_session() -> None:
+    """
+    Closes the pooled requests session.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+
+async def aclose_async_client() -> None:
+    """
+    Closes the pooled async client.
+    """
+    global _async_client, _async_client_loop
+    if _async_client is not None:
+        client, _async_client, _async_client_loop = _async_client, None, None
+        await client.aclose()
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+
+def file_content_hash(path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Returns the sha256 hex digest of a file's content.
+    Args:
+        path: Path to the file.
+        block_size: Number of bytes read at a time.
+    Returns:
+        The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Records every ingested file with size, mtime, content hash and the IDs of its chunks,
+    persisted as a JSON file next to the ChromaDB data.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """
+        Normalizes a file path to the manifest key.
+        """
+        return os.path.abspath(file_path)
+
+    def get(self, file_path: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(self.key(file_path))
+            return dict(entry) if entry else None
+
+    def is_unchanged(self, file_path: str) -> bool:
+        """
+        Checks size and mtime of a file against its manifest entry without reading the file.
+        """
+        entry = self.get(file_path)
+        if entry is None:
+            return False
+        stat = os.stat(file_path)
+        return entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime
+
+    def set(self, file_path: str, content_hash: str, chunk_ids: List[str], chunking: Optional[List[int]] = None) -> None:
+        stat = os.stat(file_path)
+        with self._lock:
+            self._entries[self.key(file_path)] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "content_hash": content_hash,
+                "chunking": chunking,
+                "chunk_ids": list(chunk_ids),
+            }
+            self._save()
+
+    def remove(self, file_path: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.pop(self.key(file_path), None)
+            self._save()
+            return entry
+
+    def files_with_hash(self, content_hash: str) -> List[str]:
+        """
+        Returns all recorded files with the given content hash.
+        """
+        with self._lock:
+            return [path for path, entry in self._entries.items() if entry["content_hash"] == content_hash]
+
+    def referenced_chunk_ids(self) -> set:
+        """
+        Returns the chunk IDs referenced by any recorded file.
+        """
+        with self._lock:
+            return {chunk_id for entry in self._entries.values() for chunk_id in entry["chunk_ids"]}
+
+    def files_in_folder(self, folder_path: str) -> List[str]:
+        """
+        Returns all recorded files located directly in the given folder.
+        """
+        folder = os.path.abspath(folder_path)
+        with self._lock:
+            return [path for path in self._entries if os.path.dirname(path) == folder]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
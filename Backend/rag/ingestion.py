@@ -0,0 +1,246 @@
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+from .vectordb import ChromaDBConnector, INGEST_BATCH_SIZE
+from .ingest_manifest import file_content_hash
+from .pdf_text import init_extract_worker, stream_pdf_batches
+
+# Marks the end of a stage's input
+_DONE = object()
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class IngestionPipeline:
+    """
+    Staged PDF ingestion: a process pool extracts and chunks the files page by page and streams fixed-size
+    chunk batches back through a bounded queue, concurrent embedding workers embed them and a single writer
+    upserts each batch into ChromaDB. Every stage is bounded, so memory use does not grow with the size of
+    a PDF. A file is recorded once all of its batches are written; a failing file is reported, its written
+    batches are removed, and the other files continue.
+    """
+    def __init__(self, connector: ChromaDBConnector, extract_workers: Optional[int] = None, embed_workers: int = 2,
+                 queue_size: int = 8, write_batch_size: int = INGEST_BATCH_SIZE,
+                 progress_callback: Optional[Callable[[dict], None]] = None):
+        self.connector = connector
+        self.extract_workers = extract_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.embed_workers = max(1, embed_workers)
+        self.queue_size = queue_size
+        self.write_batch_size = write_batch_size
+        self.progress_callback = progress_callback
+
+    def _report(self, **event) -> None:
+        if self.progress_callback is not None:
+            try:
+                self.progress_callback(event)
+            except Exception:
+                logging.exception("Progress callback failed")
+
+    def ingest(self, pdf_paths: List[str], chunk_size: int = 600, chunk_overlap: int = 200,
+               metadata: Optional[dict] = None, should_stop: Optional[Callable[[], bool]] = None) -> dict:
+        """
+        Ingests the given PDF files.
+        Args:
+            pdf_paths: Paths of the PDF files to ingest
+            chunk_size: Maximum size of each text chunk (in characters)
+            chunk_overlap: Number of characters to overlap between chunks
+            metadata: Optional metadata to attach to all chunks
+            should_stop: Optional callable; once it returns True no further files are started
+        Returns:
+            A report with the ingested, skipped, failed and cancelled files, the number of written chunks and the duration
+        """
+        started = time.monotonic()
+        chunking = [chunk_size, chunk_overlap]
+        report = {"ingested": [], "skipped": [], "failed": {}, "cancelled": [], "chunks": 0}
+        stopped = should_stop or (lambda: False)
+        report_lock = threading.Lock()
+
+        embed_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+
+        def cancel(pdf_path: str):
+            with report_lock:
+                report["cancelled"].append(pdf_path)
+            self._report(file=pdf_path, status="cancelled")
+
+        def fail(pdf_path: str, error: Exception):
+            logging.error(f"Ingestion of {pdf_path} failed: {error}")
+            with report_lock:
+                report["failed"][pdf_path] = str(error)
+            self._report(file=pdf_path, status="failed", error=str(error))
+
+        def embed_worker():
+            while True:
+                batch = embed_queue.get()
+                if batch is _DONE:
+                    write_queue.put(_DONE)
+                    return
+                if stopped():
+                    batch["cancelled"] = True
+                elif "chunks" in batch and not batch["document"]["failed"]:
+                    try:
+                        batch["embeddings"] = self.connector.embed_documents(batch["chunks"])
+                    except Exception as e:
+                        batch["error"] = e
+                write_queue.put(batch)
+
+        def discard(document: dict):
+            # Drop the already written chunks of an unfinished file unless another file references them
+            written = [chunk_id for ids in document["ids"].values() for chunk_id in ids]
+            try:
+                referenced = self.connector.manifest.referenced_chunk_ids()
+                self.connector.delete_chunks([chunk_id for chunk_id in written if chunk_id not in referenced])
+            except Exception:
+                logging.exception(f"Cleanup of {document['pdf_path']} failed")
+
+        def writer():
+            finished_workers = 0
+            while finished_workers < self.embed_workers:
+                batch = write_queue.get()
+                if batch is _DONE:
+                    finished_workers += 1
+                    continue
+                document = batch["document"]
+                pdf_path = document["pdf_path"]
+                if document["failed"]:
+                    continue
+                try:
+                    if batch.get("cancelled"):
+                        document["failed"] = True
+                        discard(document)
+                        cancel(pdf_path)
+                        continue
+                    if "error" in batch:
+                        raise batch["error"]
+                    if "batches" in batch:
+                        # End of the file: the embedding workers may deliver it before its last batches
+                        document["batches"] = batch["batches"]
+                    else:
+                        ids, metadatas = self.connector.build_chunk_records(
+                            pdf_path, document["content_hash"], chunking, batch["chunks"], metadata,
+                            start_index=batch["start"], pages=batch["pages"])
+                        self.connector.write_chunks(ids, batch["chunks"], batch["embeddings"], metadatas)
+                        document["ids"][batch["start"]] = ids
+                        document["written"] += len(ids)
+                    if document["batches"] is None or len(document["ids"]) < document["batches"]:
+                        self._report(file=pdf_path, status="writing", chunks=document["written"])
+                        continue
+                    ids = [chunk_id for start in sorted(document["ids"]) for chunk_id in document["ids"][start]]
+                    self.connector.record_ingested(pdf_path, document["content_hash"], ids, chunking)
+                    with report_lock:
+                        report["ingested"].append(pdf_path)
+                        report["chunks"] += len(ids)
+                    self._report(file=pdf_path, status="written", chunks=len(ids))
+                except Exception as e:
+                    document["failed"] = True
+                    discard(document)
+                    fail(pdf_path, e)
+
+        threads = [threading.Thread(target=embed_worker, name=f"ingest-embed-{i}", daemon=True) for i in range(self.embed_workers)]
+        threads.append(threading.Thread(target=writer, name="ingest-writer", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # The extraction workers put their chunk batches into a bounded queue; a worker blocks while it is full.
+        # Forking the multi-threaded API process can deadlock the workers on inherited locks, so they are started
+        # by a fork server (or spawned where there is none)
+        context = multiprocessing.get_context(_START_METHOD)
+        batch_queue = context.Queue(maxsize=self.queue_size)
+        stop_event = context.Event()
+        try:
+            with ProcessPoolExecutor(max_workers=self.extract_workers, mp_context=context,
+                                     initializer=init_extract_worker, initargs=(batch_queue, stop_event)) as executor:
+                documents = {}
+                futures = {}
+                for pdf_path in pdf_paths:
+                    if stopped():
+                        cancel(pdf_path)
+                        continue
+                    try:
+                        content_hash = file_content_hash(pdf_path)
+                    except Exception as e:
+                        fail(pdf_path, e)
+                        continue
+                    # Unchanged content or a copy of an ingested file does not need extraction or embedding
+                    if self.connector.reuse_ingested(pdf_path, content_hash, chunking) is not None:
+                        with report_lock:
+                            report["skipped"].append(pdf_path)
+                        self._report(file=pdf_path, status="skipped")
+                        continue
+                    documents[pdf_path] = {"pdf_path": pdf_path, "content_hash": content_hash, "sent": 0,
+                                           "batches": None, "ids": {}, "written": 0, "failed": False}
+                    futures[pdf_path] = executor.submit(stream_pdf_batches, pdf_path, chunk_size, chunk_overlap,
+                                                        self.write_batch_size)
+
+                try:
+                    running = set(futures)
+                    while running:
+                        if stopped() and not stop_event.is_set():
+                            # Files that were not started yet are dropped, running extractions stop at their next batch
+                            stop_event.set()
+                            for pdf_path, future in futures.items():
+                                if future.cancel():
+                                    running.discard(pdf_path)
+                                    cancel(pdf_path)
+                            continue
+                        try:
+                            kind, pdf_path, payload = batch_queue.get(timeout=0.5)
+                        except queue.Empty:
+                            # A crashed worker process never sends the end of its file
+                            for pdf_path in list(running):
+                                future = futures[pdf_path]
+                                if future.done() and not future.cancelled() and future.exception() is not None:
+                                    running.discard(pdf_path)
+                                    fail(pdf_path, future.exception())
+                            continue
+
+                        document = documents[pdf_path]
+                        if kind == "batch":
+                            start, chunks, pages = payload
+                            # Putting a batch blocks while the embedding stage is busy (backpressure)
+                            embed_queue.put({"document": document, "start": start, "chunks": chunks, "pages": pages})
+                            document["sent"] += 1
+                            continue
+
+                        running.discard(pdf_path)
+                        if kind == "done" and payload == 0:
+                            fail(pdf_path, ValueError("No text could be extracted from the PDF"))
+                        elif kind == "done":
+                            self._report(file=pdf_path, status="extracted", chunks=payload)
+                            embed_queue.put({"document": document, "batches": document["sent"]})
+                        elif not document["sent"] and kind == "cancelled":
+                            # Nothing of the file reached the writer yet
+                            cancel(pdf_path)
+                        elif not document["sent"]:
+                            fail(pdf_path, Exception(payload))
+                        elif kind == "cancelled":
+                            embed_queue.put({"document": document, "cancelled": True})
+                        else:
+                            embed_queue.put({"document": document, "error": Exception(payload)})
+                finally:
+                    # On errors the workers may be blocked on the full batch queue: stop them and drain it,
+                    # otherwise leaving the pool would wait for them forever
+                    stop_event.set()
+                    for future in futures.values():
+                        future.cancel()
+                    while not all(future.done() for future in futures.values()):
+                        try:
+                            batch_queue.get(timeout=0.1)
+                        except queue.Empty:
+                            pass
+        finally:
+            stop_event.set()
+            for _ in range(self.embed_workers):
+                embed_queue.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        report["duration"] = time.monotonic() - started
+        logging.info(f"Ingested {len(report['ingested'])} files ({report['chunks']} chunks), "
+                     f"skipped {len(report['skipped'])}, failed {len(report['failed'])}, "
+                     f"cancelled {len(report['cancelled'])} in {report['duration']:.1f}s")
+        return report
@@ -0,0 +1,178 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+PARTIAL = "partial"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Job:
+    """
+    A background ingestion job with per-file progress.
+    """
+    def __init__(self, kind: str, target: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.target = target
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.files: Dict[str, dict] = {}
+        self.error: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def on_progress(self, event: dict) -> None:
+        """
+        Progress callback for the ingestion pipeline: records the latest stage of each file.
+        """
+        with self._lock:
+            entry = self.files.setdefault(event["file"], {"status": None, "chunks": 0, "error": None})
+            entry["status"] = event["status"]
+            if "chunks" in event:
+                entry["chunks"] = event["chunks"]
+            if "error" in event:
+                entry["error"] = event["error"]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            written = [f for f in self.files.values() if f["status"] == "written"]
+            chunks = sum(f["chunks"] for f in written)
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "target": self.target,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_seconds": elapsed,
+                "files": {path: dict(entry) for path, entry in self.files.items()},
+                "files_done": sum(1 for f in self.files.values() if f["status"] in ("written", "skipped", "failed", "cancelled")),
+                "chunks_written": chunks,
+                "throughput": {
+                    "files_per_second": len(written) / elapsed if elapsed else 0.0,
+                    "chunks_per_second": chunks / elapsed if elapsed else 0.0,
+                },
+                "errors": {path: f["error"] for path, f in self.files.items() if f["error"]},
+                "error": self.error,
+                "result": self.result,
+            }
+
+
+class JobManager:
+    """
+    Runs ingestion jobs in a background executor and keeps the most recent jobs for status polling.
+    """
+    def __init__(self, max_workers: int = 1, max_jobs: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, kind: str, target: str, work: Callable[[Job], Optional[dict]]) -> Job:
+        """
+        Queues a job and returns immediately.
+        Args:
+            kind: The job type, e.g. "ingest-folder" or "add-document".
+            target: The folder or file the job works on.
+            work: Callable doing the work; receives the job for progress reporting and cancellation
+                and returns an optional result dictionary. Its "cancelled" entry lists the files the
+                cancellation stopped; without it a cancelled job that ran to the end is reported as completed.
+                A non-empty "failed" entry marks the job as partial, or as failed when nothing was
+                ingested or skipped.
+        Returns:
+            The queued job.
+        """
+        job = Job(kind, target)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in (QUEUED, RUNNING):
+                    break
+                del self._jobs[oldest_id]
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def _run(self, job: Job, work: Callable[[Job], Optional[dict]]) -> None:
+        if job.is_cancelled():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = work(job)
+            # A cancel request that arrives after the last file was started does not stop anything
+            result = job.result or {}
+            stopped_early = job.is_cancelled() and bool(result.get("cancelled"))
+            failed = result.get("failed") or {}
+            if stopped_early:
+                job.status = CANCELLED
+            elif failed:
+                # Files that could not be ingested must not be reported as done
+                job.error = f"{len(failed)} file(s) failed to ingest"
+                job.status = PARTIAL if result.get("ingested") or result.get("skipped") else FAILED
+            else:
+                job.status = COMPLETED
+        except Exception as e:
+            logging.exception(f"Job {job.id} failed")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def has_active(self) -> bool:
+        """
+        Returns True while a job is queued or running.
+        """
+        return any(job.status in (QUEUED, RUNNING) for job in self.list())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Requests cancellation of a job. Files that are not completely written yet are dropped,
+        including their already written chunks; files that were written before stay ingested.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status in (QUEUED, RUNNING):
+            job.cancel_event.set()
+        return job
+
+    def shutdown(self) -> None:
+        """
+        Cancels all jobs and waits for the running one to stop.
+        """
+        for job in self.list():
+            job.cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        # Queued jobs are dropped by the executor without ever reaching _run
+        for job in self.list():
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = time.time()
@@ -0,0 +1,142 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Splits text into lowercase word tokens; slashes inside a token are kept, so "P/E" stays one term
+_TOKEN_PATTERN = re.compile(r"\w+(?:/\w+)*")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on",
+    "or", "that", "the", "this", "to", "was", "were", "with",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Returns the index terms of a text.
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    Fuses several rankings of document IDs: every document scores 1 / (k + rank) per ranking.
+    Args:
+        rankings: Document IDs ordered by relevance, one sequence per retriever.
+        k: Damping constant; larger values flatten the influence of the top ranks.
+    Returns:
+        All document IDs ordered by fused score.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
+
+
+class BM25Index:
+    """
+    Persistent inverted index over the chunk texts with Okapi BM25 ranking.
+
+    Documents and postings are stored in SQLite next to the ChromaDB data and are updated
+    together with the collection, so both retrievers always see the same chunks.
+    """
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS documents (id TEXT PRIMARY KEY, length INTEGER NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, id TEXT NOT NULL, tf INTEGER NOT NULL, PRIMARY KEY (term, id))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS postings_id ON postings (id)")
+        self._db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _delete(self, ids: Sequence[str]) -> None:
+        # Delete in chunks to stay below SQLite's host parameter limit
+        for start in range(0, len(ids), 500):
+            part = list(ids[start:start + 500])
+            placeholders = ",".join("?" * len(part))
+            self._db.execute(f"DELETE FROM postings WHERE id IN ({placeholders})", part)
+            self._db.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", part)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]) -> None:
+        """
+        Indexes documents; documents that are already indexed are replaced.
+        Args:
+            ids: The document IDs.
+            texts: One text per document.
+        """
+        if not ids:
+            return
+        documents = []
+        postings = []
+        for doc_id, text in zip(ids, texts):
+            terms = Counter(tokenize(text or ""))
+            documents.append((doc_id, sum(terms.values())))
+            postings.extend((term, doc_id, tf) for term, tf in terms.items())
+        with self._lock:
+            self._delete(ids)
+            self._db.executemany("INSERT INTO documents (id, length) VALUES (?, ?)", documents)
+            self._db.executemany("INSERT INTO postings (term, id, tf) VALUES (?, ?, ?)", postings)
+            self._db.commit()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._delete(ids)
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM postings")
+            self._db.execute("DELETE FROM documents")
+            self._db.commit()
+
+    def search(self, query: str, n_results: int = 5) -> List[Tuple[str, float]]:
+        """
+        Ranks the indexed documents against a query.
+        Args:
+            query: The query text.
+            n_results: Number of results to return.
+        Returns:
+            Up to n_results (document_id, score) pairs, best first.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            total, average_length = self._db.execute("SELECT COUNT(*), AVG(length) FROM documents").fetchone()
+            if not total:
+                return []
+            rows = self._db.execute(
+                f"SELECT p.term, p.id, p.tf, d.length FROM postings p JOIN documents d ON d.id = p.id"
+                f" WHERE p.term IN ({placeholders})", terms
+            ).fetchall()
+
+        postings_per_term: Dict[str, list] = defaultdict(list)
+        for term, doc_id, tf, length in rows:
+            postings_per_term[term].append((doc_id, tf, length))
+
+        average_length = average_length or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for postings in postings_per_term.values():
+            df = len(postings)
+            idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            for doc_id, tf, length in postings:
+                norm = self.k1 * (1.0 - self.b + self.b * length / average_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1.0) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return best[:n_results]
@@ -1,14 +1,269 @@
 import os
-import requests
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Callable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import logging
+import sqlite3
+import threading
+import time
+import requests
+from .http_client import get_session, default_timeout, async_request, async_stream, OLLAMA_READ_TIMEOUT
+from .telemetry import annotate, record_llm_usage
 
 load_dotenv()
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# Maximum number of generations that may be in flight per Ollama backend
+OLLAMA_MAX_PARALLEL = int(os.getenv("OLLAMA_MAX_PARALLEL", "4"))
+# Texts per /api/embed request and number of embedding requests in flight
+OLLAMA_EMBED_BATCH_SIZE = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "64"))
+OLLAMA_EMBED_CONCURRENCY = int(os.getenv("OLLAMA_EMBED_CONCURRENCY", "2"))
+# How long Ollama keeps the model (and its KV cache) loaded after a request, e.g. "30m"; unset uses Ollama's default
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE") or None
+
+_generation_slots: Dict[str, threading.BoundedSemaphore] = {}
+_generation_slots_lock = threading.Lock()
+
+
+def _get_generation_slots(base_url: str) -> threading.BoundedSemaphore:
+    """
+    Returns the semaphore limiting concurrent generations for the given Ollama backend.
+    Args:
+        base_url: The base URL of the Ollama backend.
+    Returns:
+        The semaphore shared by all callers of this backend.
+    """
+    with _generation_slots_lock:
+        if base_url not in _generation_slots:
+            _generation_slots[base_url] = threading.BoundedSemaphore(OLLAMA_MAX_PARALLEL)
+        return _generation_slots[base_url]
+
+
+@contextmanager
+def _generation_slot(base_url: str, timeout: Optional[float]) -> Iterator[float]:
+    """
+    Holds one generation slot of the Ollama backend. Waiting for the slot counts against the timeout:
+    if none becomes free in time, the same read timeout error as for a slow response is raised.
+    Args:
+        base_url: The base URL of the Ollama backend.
+        timeout: The time budget in seconds (default: OLLAMA_READ_TIMEOUT).
+    Yields:
+        The remaining budget for the request.
+    """
+    budget = OLLAMA_READ_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    slots = _get_generation_slots(base_url)
+    if not slots.acquire(timeout=budget):
+        raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={budget})")
+    try:
+        remaining = budget - (time.monotonic() - started)
+        if remaining <= 0:
+            raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={budget})")
+        yield remaining
+    finally:
+        slots.release()
+
+
+@asynccontextmanager
+async def _async_generation_slot(base_url: str, timeout: Optional[float]) -> AsyncIterator[float]:
+    """
+    async counterpart of _generation_slot. The slot is taken from the same semaphore in a worker thread,
+    so async and threaded generations share OLLAMA_MAX_PARALLEL without blocking the event loop.
+    Args:
+        base_url: The base URL of the Ollama backend.
+        timeout: The time budget in seconds (default: OLLAMA_READ_TIMEOUT).
+    Yields:
+        The remaining budget for the request.
+    """
+    budget = OLLAMA_READ_TIMEOUT if timeout is None else timeout
+    started = time.monotonic()
+    slots = _get_generation_slots(base_url)
+    acquiring = asyncio.ensure_future(asyncio.to_thread(slots.acquire, True, budget))
+    try:
+        acquired = await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        # The worker thread may still get the slot after the caller gave up; hand it back then
+        acquiring.add_done_callback(lambda done: slots.release() if not done.cancelled() and not done.exception() and done.result() else None)
+        raise
+    if not acquired:
+        raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={budget})")
+    try:
+        remaining = budget - (time.monotonic() - started)
+        if remaining <= 0:
+            raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={budget})")
+        yield remaining
+    finally:
+        slots.release()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for content-addressed LLM response caches.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached response for the key or None.
+        """
+
+    @abstractmethod
+    def set(self, key: str, response: str) -> None:
+        """
+        Stores the response for the key.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all cached responses.
+        """
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    In-memory LRU response cache that evicts the least recently used entries above max_bytes.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._data.get(key)
+            if response is not None:
+                self._data.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            if key in self._data:
+                self._size -= len(self._data.pop(key).encode("utf-8"))
+            self._data[key] = response
+            self._size += size
+            while self._size > self.max_bytes and self._data:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted.encode("utf-8"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk response cache in a SQLite database that evicts the least recently used entries above max_bytes.
+    """
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Delete the least recently used entries until the cache fits again
+                rows = self._db.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall()
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= old_size
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
 
-def call_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01, max_tokens: int = 512) -> str:
+def _create_response_cache() -> Optional[ResponseCache]:
+    """
+    Creates the response cache configured via LLM_CACHE_BACKEND ("none", "memory" or "sqlite").
+    """
+    backend = os.getenv("LLM_CACHE_BACKEND", "none").lower()
+    max_bytes = os.getenv("LLM_CACHE_MAX_BYTES")
+    if backend == "memory":
+        return MemoryResponseCache(**({"max_bytes": int(max_bytes)} if max_bytes else {}))
+    if backend == "sqlite":
+        # Next to this module by default, so every working directory shares one cache
+        default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_responses.sqlite")
+        path = os.getenv("LLM_CACHE_PATH", default_path)
+        return SQLiteResponseCache(path, **({"max_bytes": int(max_bytes)} if max_bytes else {}))
+    return None
+
+
+_response_cache: Optional[ResponseCache] = _create_response_cache()
+# Disables reading from the response cache globally, e.g. to regenerate all answers
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """
+    Replaces the process-wide LLM response cache (None disables caching).
+    Args:
+        cache: The response cache to use.
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def _response_cache_key(model_name: str, prompt: str, options: dict) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    key_payload = json.dumps({"model": model_name, "prompt": prompt_hash, "options": options}, sort_keys=True)
+    return hashlib.sha256(key_payload.encode("utf-8")).hexdigest()
+
+
+def _chat_payload(model_name: str, prompt: str, options: dict, stream: bool, keep_alive: Optional[str]) -> dict:
+    """
+    Builds the /api/chat request body for a single user prompt.
+    """
+    payload = {
+        "model": model_name,
+        "messages": [{"role": "user", "content": prompt}],
+        "options": options,
+        "stream": stream
+    }
+    keep_alive = keep_alive or OLLAMA_KEEP_ALIVE
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+
+def call_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01, max_tokens: int = 512, timeout: Optional[float] = None,
+             use_cache: bool = True, keep_alive: Optional[str] = None) -> str:
     """
     sends a prompt to the specified Ollama model and returns the response text.
     Args:
@@ -16,48 +271,238 @@ def call_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01,
         model_name: The name of the Ollama model to use (default: "llama3").
         temperature: Sampling temperature for response generation (default: 0.01).
         max_tokens: Maximum number of tokens to generate in the response (default: 512).
+        timeout: Maximum number of seconds to wait for the response (default: OLLAMA_READ_TIMEOUT).
+        use_cache: Whether the response cache may be used for this call (default: True).
+        keep_alive: How long Ollama keeps the model loaded after the request (default: OLLAMA_KEEP_ALIVE).
     Returns:
         The generated response text from the model.
     """
     #base url with ollama
     url = f"{OLLAMA_BASE_URL}/api/chat"
-    payload = {
-        "model": model_name,
-        "messages": [{"role": "user", "content": prompt}],
-        "options": {"temperature": temperature, "num_predict": max_tokens},
-        "stream": False
-    }
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    payload = _chat_payload(model_name, prompt, options, stream=False, keep_alive=keep_alive)
+
+    cache = _response_cache if use_cache else None
+    cache_key = None
+    if cache is not None:
+        cache_key = _response_cache_key(model_name, prompt, options)
+        if not LLM_CACHE_BYPASS:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logging.info("LLM response served from cache")
+                annotate(cached=True)
+                return cached
+
+    try:
+        with _generation_slot(OLLAMA_BASE_URL, timeout) as remaining:
+            response = get_session().post(url, json=payload, timeout=default_timeout(remaining))
+        logging.info("Request sent to Ollama")
+        response.raise_for_status()
+        data = response.json()
+        content = data["message"]["content"].strip()
+        record_llm_usage(model_name, data)
+    except Exception as e:
+        raise RuntimeError(f"Ollama LLM-Aufruf fehlgeschlagen: {e}")
+
+    if cache is not None:
+        cache.set(cache_key, content)
+    return content
+
+
+def stream_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01, max_tokens: int = 512, timeout: Optional[float] = None,
+               should_stop: Optional[Callable[[], bool]] = None, keep_alive: Optional[str] = None) -> Iterator[str]:
+    """
+    sends a prompt to the specified Ollama model and yields the response text piece by piece as it is generated.
+    Args:
+        prompt: The input text prompt to send to the model.
+        model_name: The name of the Ollama model to use (default: "llama3").
+        temperature: Sampling temperature for response generation (default: 0.01).
+        max_tokens: Maximum number of tokens to generate in the response (default: 512).
+        timeout: Maximum number of seconds to wait for the next chunk (default: OLLAMA_READ_TIMEOUT).
+        should_stop: Optional callable; generation is aborted as soon as it returns True.
+        keep_alive: How long Ollama keeps the model loaded after the request (default: OLLAMA_KEEP_ALIVE).
+    Yields:
+        The generated text fragments in order.
+    """
+    url = f"{OLLAMA_BASE_URL}/api/chat"
+    payload = _chat_payload(model_name, prompt, {"temperature": temperature, "num_predict": max_tokens},
+                            stream=True, keep_alive=keep_alive)
+    try:
+        # The timeout applies to each chunk, so only the wait for the slot is taken from it
+        with _generation_slot(OLLAMA_BASE_URL, timeout):
+            with get_session().post(url, json=payload, timeout=default_timeout(timeout), stream=True) as response:
+                logging.info("Streaming request sent to Ollama")
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if should_stop is not None and should_stop():
+                        return
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(data["error"])
+                    delta = data.get("message", {}).get("content", "")
+                    if delta:
+                        yield delta
+                    if data.get("done"):
+                        record_llm_usage(model_name, data)
+                        return
+    except Exception as e:
+        raise RuntimeError(f"Ollama LLM-Aufruf fehlgeschlagen: {e}")
+
+
+async def acall_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01, max_tokens: int = 512, timeout: Optional[float] = None,
+                    use_cache: bool = True, keep_alive: Optional[str] = None) -> str:
+    """
+    async counterpart of call_llm for async FastAPI endpoints; does not block the event loop.
+    Args:
+        prompt: The input text prompt to send to the model.
+        model_name: The name of the Ollama model to use (default: "llama3").
+        temperature: Sampling temperature for response generation (default: 0.01).
+        max_tokens: Maximum number of tokens to generate in the response (default: 512).
+        timeout: Maximum number of seconds to wait for the response (default: OLLAMA_READ_TIMEOUT).
+        use_cache: Whether the response cache may be used for this call (default: True).
+        keep_alive: How long Ollama keeps the model loaded after the request (default: OLLAMA_KEEP_ALIVE).
+    Returns:
+        The generated response text from the model.
+    """
+    url = f"{OLLAMA_BASE_URL}/api/chat"
+    options = {"temperature": temperature, "num_predict": max_tokens}
+    payload = _chat_payload(model_name, prompt, options, stream=False, keep_alive=keep_alive)
+
+    cache = _response_cache if use_cache else None
+    cache_key = None
+    if cache is not None:
+        cache_key = _response_cache_key(model_name, prompt, options)
+        if not LLM_CACHE_BYPASS:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                logging.info("LLM response served from cache")
+                annotate(cached=True)
+                return cached
+
     try:
-        response = requests.post(url, json=payload)
+        async with _async_generation_slot(OLLAMA_BASE_URL, timeout) as remaining:
+            response = await async_request("POST", url, read_timeout=remaining, json=payload)
         logging.info("Request sent to Ollama")
         response.raise_for_status()
         data = response.json()
-        return data["message"]["content"].strip()
+        content = data["message"]["content"].strip()
+        record_llm_usage(model_name, data)
     except Exception as e:
         raise RuntimeError(f"Ollama LLM-Aufruf fehlgeschlagen: {e}")
 
+    if cache is not None:
+        await asyncio.to_thread(cache.set, cache_key, content)
+    return content
+
 
-def ollama_embed(texts, model_name: str = "nomic-embed-text"):
+async def astream_llm(prompt: str, model_name: str = "llama3", temperature: float = 0.01, max_tokens: int = 512, timeout: Optional[float] = None,
+                      keep_alive: Optional[str] = None) -> AsyncIterator[str]:
     """
-    Calls the Ollama embedding endpoint for a list of texts.
+    sends a prompt to the specified Ollama model and yields the response text piece by piece as it is generated,
+    using the async client. Closing the generator (e.g. when the client disconnects) aborts the generation.
+    Args:
+        prompt: The input text prompt to send to the model.
+        model_name: The name of the Ollama model to use (default: "llama3").
+        temperature: Sampling temperature for response generation (default: 0.01).
+        max_tokens: Maximum number of tokens to generate in the response (default: 512).
+        timeout: Maximum number of seconds to wait for the next chunk (default: OLLAMA_READ_TIMEOUT).
+        keep_alive: How long Ollama keeps the model loaded after the request (default: OLLAMA_KEEP_ALIVE).
+    Yields:
+        The generated text fragments in order.
+    """
+    url = f"{OLLAMA_BASE_URL}/api/chat"
+    payload = _chat_payload(model_name, prompt, {"temperature": temperature, "num_predict": max_tokens},
+                            stream=True, keep_alive=keep_alive)
+    try:
+        # The timeout applies to each chunk, so only the wait for the slot is taken from it
+        async with _async_generation_slot(OLLAMA_BASE_URL, timeout):
+            async with async_stream("POST", url, read_timeout=timeout, json=payload) as response:
+                logging.info("Streaming request sent to Ollama")
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if "error" in data:
+                        raise RuntimeError(data["error"])
+                    delta = data.get("message", {}).get("content", "")
+                    if delta:
+                        yield delta
+                    if data.get("done"):
+                        record_llm_usage(model_name, data)
+                        return
+    except Exception as e:
+        raise RuntimeError(f"Ollama LLM-Aufruf fehlgeschlagen: {e}")
+
+
+def warm_prompt_prefix(prefix: str, model_name: str = "llama3", temperature: float = 0.01, timeout: Optional[float] = None,
+                       keep_alive: Optional[str] = None) -> None:
+    """
+    Prefills the KV cache of the model with a prompt prefix, so prompts starting with it only have to
+    process their remaining tokens. Generates a single token; failures are logged and ignored.
+    Args:
+        prefix: The shared beginning of the following prompts.
+        model_name: The name of the Ollama model to use (default: "llama3").
+        temperature: Sampling temperature of the following prompts; other options would reload the model.
+        timeout: Maximum number of seconds to wait for the response (default: OLLAMA_READ_TIMEOUT).
+        keep_alive: How long Ollama keeps the model loaded after the request (default: OLLAMA_KEEP_ALIVE).
+    """
+    url = f"{OLLAMA_BASE_URL}/api/chat"
+    payload = _chat_payload(model_name, prefix, {"temperature": temperature, "num_predict": 1}, stream=False, keep_alive=keep_alive)
+    try:
+        with _generation_slot(OLLAMA_BASE_URL, timeout) as remaining:
+            response = get_session().post(url, json=payload, timeout=default_timeout(remaining))
+        response.raise_for_status()
+        logging.info("Prompt prefix prefilled")
+    except Exception as e:
+        logging.warning(f"Prefilling the prompt prefix failed: {e}")
+
+
+def _embed_batch(texts: List[str], model_name: str) -> List[List[float]]:
+    """
+    Embeds one batch of texts with a single request to Ollama's multi-input /api/embed endpoint.
+    """
+    url = f"{OLLAMA_BASE_URL}/api/embed"
+    payload = {"model": model_name, "input": texts}
+    try:
+        response = get_session().post(url, json=payload, timeout=default_timeout(60))
+        response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        raise RuntimeError(f"Ollama Embedding-Aufruf fehlgeschlagen: {e}")
+    embeddings = data.get("embeddings") or []
+    if len(embeddings) != len(texts):
+        raise RuntimeError(f"Ollama Embedding-Aufruf fehlgeschlagen: {len(embeddings)} Embeddings für {len(texts)} Texte erhalten")
+    return embeddings
+
+
+def ollama_embed(texts, model_name: str = "nomic-embed-text", batch_size: int = OLLAMA_EMBED_BATCH_SIZE,
+                 max_concurrency: int = OLLAMA_EMBED_CONCURRENCY):
+    """
+    Calls the Ollama embedding endpoint for a list of texts. The texts are sent in batches of
+    batch_size, up to max_concurrency batches at a time, and the results keep the input order.
     Args:
         texts: List of text strings to embed.
         model_name: The name of the embedding model to use (default: "nomic-embed-text").
+        batch_size: Number of texts per embedding request (default: OLLAMA_EMBED_BATCH_SIZE).
+        max_concurrency: Maximum number of batches in flight (default: OLLAMA_EMBED_CONCURRENCY).
     Returns:
         List of embeddings corresponding to the input texts.
     """
-    url = f"{OLLAMA_BASE_URL}/api/embeddings"
-    results = []
-    for text in texts:
-        payload = {"model": model_name, "prompt": text}
-        try:
-            response = requests.post(url, json=payload, timeout=60)
-            response.raise_for_status()
-            data = response.json()
-            results.append(data["embedding"])
-        except Exception as e:
-            raise RuntimeError(f"Ollama Embedding-Aufruf fehlgeschlagen: {e}")
-    return results
+    texts = list(texts)
+    if not texts:
+        return []
+    batch_size = max(1, batch_size)
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if len(batches) == 1 or max_concurrency <= 1:
+        return [embedding for batch in batches for embedding in _embed_batch(batch, model_name)]
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as executor:
+        # executor.map returns the batches in submission order
+        results = executor.map(lambda batch: _embed_batch(batch, model_name), batches)
+        return [embedding for batch_embeddings in results for embedding in batch_embeddings]
 
 
 def check_ollama_connection() -> bool:
@@ -67,7 +512,7 @@ def check_ollama_connection() -> bool:
         bool: True if the server is reachable, False otherwise
     """
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
+        response = get_session().get(f"{OLLAMA_BASE_URL}/api/tags", timeout=default_timeout(5))
         return response.status_code == 200
     except:
         return False
@@ -80,7 +525,7 @@ def get_available_models() -> List[str]:
         List[str]: List of model names
     """
     try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=10)
+        response = get_session().get(f"{OLLAMA_BASE_URL}/api/tags", timeout=default_timeout(10))
         response.raise_for_status()
         data = response.json()
 
@@ -103,6 +548,53 @@ def test_model_availability(model_name: str) -> bool:
     """
     try:
         available_models = get_available_models()
-        return model_name in available_models
+        return is_model_available(model_name, available_models)
     except:
         return False
+
+
+def is_model_available(model_name: str, available_models: List[str]) -> bool:
+    """
+    checks a model name against the names reported by /api/tags; a name without tag matches ":latest".
+    Args:
+        model_name: The name of the model to check.
+        available_models: Model names as returned by get_available_models.
+    Returns:
+        bool: True if the model is in the list, False otherwise.
+    """
+    def normalize(name: str) -> str:
+        return name if ":" in name else f"{name}:latest"
+    return normalize(model_name) in {normalize(name) for name in available_models}
+
+
+async def acheck_ollama_connection() -> bool:
+    """
+    async counterpart of check_ollama_connection.
+    Returns:
+        bool: True if the server is reachable, False otherwise
+    """
+    try:
+        response = await async_request("GET", f"{OLLAMA_BASE_URL}/api/tags", read_timeout=5)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
+async def aget_available_models() -> List[str]:
+    """
+    async counterpart of get_available_models.
+    Returns:
+        List[str]: List of model names
+    """
+    try:
+        response = await async_request("GET", f"{OLLAMA_BASE_URL}/api/tags", read_timeout=10)
+        response.raise_for_status()
+        data = response.json()
+
+        if "models" not in data:
+            return []
+
+        return [model["name"] for model in data["models"]]
+
+    except Exception as e:
+        raise RuntimeError(f"Konnte verfügbare Modelle nicht abrufen: {e}")
@@ -1,11 +1,49 @@
 from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import os
 import yfinance as yf
-import requests
 import pycountry
+from .cache import TTLCache
+from .worldbank import get_worldbank_client
+from .sector_etf import get_sector_etf_cache
+from .telemetry import span
+
+# Snapshots of the yfinance payloads, shared across requests and keyed by ticker
+MARKET_DATA_TTL = float(os.getenv("MARKET_DATA_TTL", "900"))
+_snapshot_cache = TTLCache(maxsize=256, ttl=MARKET_DATA_TTL)
+
+
+def fetch_snapshot(ticker: str) -> Dict:
+    """
+    Fetches info, financials, balance sheet and cash flow of a ticker in parallel.
+    The lazy properties of a yf.Ticker fill shared state and are not thread-safe,
+    so every field is read from its own Ticker object.
+    Args:
+        ticker: The stock ticker symbol.
+    Returns:
+        A dictionary with the keys 'info', 'financials', 'balance_sheet' and 'cashflow'.
+    """
+    fields = ("info", "financials", "balance_sheet", "cashflow")
+    with ThreadPoolExecutor(max_workers=len(fields)) as executor:
+        futures = {field: executor.submit(lambda f: getattr(yf.Ticker(ticker), f), field) for field in fields}
+        return {field: future.result() for field, future in futures.items()}
+
 
 class CompanyMetricsRetriever:
-    def __init__(self, ticker: str):
-        self.stock = yf.Ticker(ticker)
+    def __init__(self, ticker: str, snapshot_cache: Optional[TTLCache] = None):
+        self.ticker = ticker.upper()
+        self._snapshot_cache = snapshot_cache if snapshot_cache is not None else _snapshot_cache
+        self._snapshot = None
+
+    @property
+    def snapshot(self) -> Dict:
+        """
+        The yfinance payloads of this ticker, fetched once and served from the shared TTL cache.
+        """
+        if self._snapshot is None:
+            with span("market_data", ticker=self.ticker):
+                self._snapshot = self._snapshot_cache.get_or_compute(self.ticker, lambda: fetch_snapshot(self.ticker))
+        return self._snapshot
 
     def get_company_info(self) -> Optional[Dict]:
         """
@@ -13,7 +51,7 @@ class CompanyMetricsRetriever:
         Returns:
             A dictionary containing the company information.
         """
-        info = self.stock.info
+        info = self.snapshot["info"]
         company_info = {
             'name': info.get('longName'),
             'sector': info.get('sector'),
@@ -33,7 +71,7 @@ class CompanyMetricsRetriever:
         Returns:
             A dictionary containing the current financial metrics.
         """
-        info = self.stock.info
+        info = self.snapshot["info"]
         # Mapping to use own Metric names
         metric_mapping = {
             #EPS
@@ -63,10 +101,10 @@ class CompanyMetricsRetriever:
         Returns:
             A dictionary containing historical financial metrics by year.
         """
-        stock = self.stock
-        income = stock.financials
-        balance = stock.balance_sheet
-        cashflow = stock.cashflow
+        snapshot = self.snapshot
+        income = snapshot["financials"]
+        balance = snapshot["balance_sheet"]
+        cashflow = snapshot["cashflow"]
 
         metrics_by_year = {}
 
@@ -94,40 +132,17 @@ class CompanyMetricsRetriever:
         Returns:
             A dictionary containing peer companies and their key metrics.
         """
-        info = self.stock.info
+        info = self.snapshot["info"]
         sector = info.get("sector")
-        # Dictionary mapping GICS sectors to well-known ETFs
-        sector_etf_map = {
-            "Technology": "XLK",
-            "Health Care": "XLV",
-            "Financial Services": "XLF",
-            "Consumer Cyclical": "XLY",
-            "Consumer Defensive": "XLP",
-            "Energy": "XLE",
-            "Industrials": "XLI",
-            "Materials": "XLB",
-            "Utilities": "XLU",
-            "Real Estate": "XLRE",
-            "Communication Services": "XLC"
-        }
-        etf_ticker = sector_etf_map.get(sector)
-        etf = yf.Ticker(etf_ticker)
-        info = etf.info
-        insights = {
-            "Sector": sector,
-            "ETF Symbol": etf_ticker,
-            "ETF Name": info.get("longName", "N/A"),
-            "YTD Return": info.get("ytdReturn", "N/A"),
-            "1Y Return": info.get("threeYearAverageReturn", "N/A"),
-            "Total Assets": info.get("totalAssets", "N/A"),
-            "Dividend Yield": info.get("dividendYield", "N/A"),
-            "Beta": info.get("beta", "N/A")
-        }
+        # ETF insights are shared across all tickers of the same sector
+        with span("peer_data", sector=sector):
+            insights = get_sector_etf_cache().get_insights(sector)
         return insights
 
     def get_indicator_value(self, country_code, indicator, year):
         """
-        Fetches a specific economic indicator value for a given country and year from the World Bank API.
+        Fetches a specific economic indicator value for a given country and year from the World Bank API
+        (served from the on-disk indicator cache if possible).
         Args:
             country_code (str): The 3-letter country code (ISO 3166-1 alpha-3).
             indicator (str): The World Bank indicator code.
@@ -135,19 +150,10 @@ class CompanyMetricsRetriever:
         Returns:
             The value of the indicator or None if not found.
         """
-        url = f'https://api.worldbank.org/v2/country/{country_code}/indicator/{indicator}?format=json&per_page=1&date={year}'
-        response = requests.get(url)
-
-        if response.status_code != 200:
-            return None
-
-        data = response.json()
-        if isinstance(data, list) and len(data) > 1 and data[1]:
-            return data[1][0].get('value')
-        return None
+        return get_worldbank_client().get_indicator_value(country_code, indicator, year)
 
     def get_macro_info(self):
-        info = self.stock.info
+        info = self.snapshot["info"]
         yf_country = info.get('country')
         year = 2024
         try:
@@ -163,9 +169,8 @@ class CompanyMetricsRetriever:
         }
 
         results = {"country": country}
-        for key, code in indicators.items():
-            value = self.get_indicator_value(country, code, year)
-            results[key] = value
+        with span("macro_data", country=country):
+            results.update(get_worldbank_client().get_indicator_values(country, indicators, year))
 
         return results
 
@@ -0,0 +1,216 @@
+import PyPDF2
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Extracts the text of a PDF file page by page.
+    Args:
+        pdf_path: Path to the PDF file
+    Yields:
+        (page_number, page_text) for every non-empty page, page numbers start at 1
+    """
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for page_num, page in enumerate(pdf_reader.pages):
+                page_text = page.extract_text()
+                if page_text.strip():  # Only yield non-empty pages
+                    yield page_num + 1, page_text
+    except Exception as e:
+        raise Exception(f"Error reading PDF: {str(e)}")
+
+
+def iter_page_segments(pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+    """
+    Wraps every page text with its page marker, as it appears in the extracted document text.
+    """
+    for page_number, page_text in pages:
+        yield page_number, f"\n--- Page {page_number} ---\n" + page_text + "\n"
+
+
+def extract_text_from_pdf(pdf_path: str) -> str:
+    """Extract text from PDF file."""
+    return "".join(segment for _, segment in iter_page_segments(iter_pdf_pages(pdf_path))).strip()
+
+
+def iter_chunks(segments: Iterable[Tuple[Optional[int], str]], chunk_size: int, overlap: int) -> Iterator[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Split a stream of text segments into chunks with specified size and overlap, trying to split at sentence or
+    word boundaries. Only the text around the current chunk is kept in memory, and the chunks are identical to
+    chunking the concatenated (stripped) text at once.
+    Args:
+        segments: (page_number, text) pairs in document order; page_number may be None
+        chunk_size: Maximum size of each chunk (in characters)
+        overlap: Number of characters to overlap between chunks
+    Yields:
+        (chunk, first_page, last_page) for every chunk
+    """
+    # validate parameters
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError("overlap must satisfy 0 <= overlap < chunk_size")
+
+    segments = iter(segments)
+    buffer = ""    # text[offset:]
+    offset = 0
+    pages: List[Tuple[int, Optional[int]]] = []  # (absolute start, page number) of the buffered segments
+    exhausted = False
+    n = None       # total text length, known once all segments are read
+    start = 0
+    step = chunk_size - overlap
+
+    def page_at(position: int) -> Optional[int]:
+        page = pages[0][1] if pages else None
+        for segment_start, page_number in pages:
+            if segment_start > position:
+                break
+            page = page_number
+        return page
+
+    while True:
+        # Read segments until the text beyond the current window is known to be non-empty
+        while not exhausted and not buffer[start + chunk_size - offset:].strip():
+            try:
+                page_number, segment = next(segments)
+            except StopIteration:
+                exhausted = True
+                buffer = buffer.rstrip()
+                n = offset + len(buffer)
+                break
+            if offset + len(buffer) == 0:
+                segment = segment.lstrip()
+                if not segment:
+                    continue
+            pages.append((offset + len(buffer), page_number))
+            buffer += segment
+
+        if exhausted and start >= n:
+            return
+
+        # preliminary end point
+        end = start + chunk_size if n is None else min(start + chunk_size, n)
+
+        # Trying to find a sentence boundary
+        if n is None or end < n:
+            win_start = max(start, end - 200) - offset
+            local_end = end - offset
+            sentence_end = max(
+                buffer.rfind('.', win_start, local_end),
+                buffer.rfind('!', win_start, local_end),
+                buffer.rfind('?', win_start, local_end),
+            )
+            if sentence_end + offset > start:
+                end = sentence_end + offset + 1
+            else:
+                word_end = buffer.rfind(' ', win_start, local_end)
+                if word_end + offset > start:
+                    end = word_end + offset
+
+        # If no boundary found, use hard limit
+        if end <= start:
+            end = start + 1
+
+        chunk = buffer[start - offset:end - offset].strip()
+        if chunk:
+            yield chunk, page_at(start), page_at(end - 1)
+
+        if n is not None and end >= n:
+            return  # End of text reached
+
+        # Next start position
+        next_start = start + step
+        # Safety check to ensure progress
+        next_start = max(next_start, end - overlap)
+        if next_start <= start:
+            next_start = start + 1
+        start = next_start
+
+        # Drop the text and page markers before the new start
+        buffer = buffer[start - offset:]
+        offset = start
+        while len(pages) > 1 and pages[1][0] <= start:
+            pages.pop(0)
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """
+    Split text into chunks with specified size and overlap, trying to split at sentence or word boundaries.
+    Args:
+        text: The input text to split
+        chunk_size: Maximum size of each chunk (in characters)
+        overlap: Number of characters to overlap between chunks
+    Returns:
+        List of text chunks
+    """
+    return [chunk for chunk, _, _ in iter_chunks([(None, text)], chunk_size, overlap)]
+
+
+def iter_pdf_chunks(pdf_path: str, chunk_size: int, chunk_overlap: int) -> Iterator[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Extracts and chunks a PDF file page by page.
+    Args:
+        pdf_path: Path to the PDF file
+        chunk_size: Maximum size of each text chunk (in characters)
+        chunk_overlap: Number of characters to overlap between chunks
+    Yields:
+        (chunk, first_page, last_page) for every chunk
+    """
+    return iter_chunks(iter_page_segments(iter_pdf_pages(pdf_path)), chunk_size, chunk_overlap)
+
+
+# Set in the worker processes of the ingestion pipeline by init_extract_worker
+_batch_queue = None
+_stop_event = None
+
+
+def init_extract_worker(batch_queue, stop_event) -> None:
+    """
+    Process pool initializer of the ingestion pipeline: multiprocessing queues and events cannot be passed
+    as task arguments, so they are handed to every worker process once.
+    """
+    global _batch_queue, _stop_event
+    _batch_queue = batch_queue
+    _stop_event = stop_event
+
+
+def stream_pdf_batches(pdf_path: str, chunk_size: int, chunk_overlap: int, batch_size: int) -> None:
+    """
+    Extracts and chunks one PDF file in a worker process of the ingestion pipeline and sends the chunks to the
+    parent in batches through the bounded batch queue, so neither process holds all chunks of a large file.
+    Putting a batch blocks while the queue is full. Only depends on PyPDF2 and the standard library.
+    Args:
+        pdf_path: Path to the PDF file
+        chunk_size: Maximum size of each text chunk (in characters)
+        chunk_overlap: Number of characters to overlap between chunks
+        batch_size: Number of chunks per batch
+    Sends:
+        ("batch", pdf_path, (start_index, chunks, pages)) per batch, then exactly one of
+        ("done", pdf_path, chunk_count), ("failed", pdf_path, error) or ("cancelled", pdf_path, None)
+    """
+    try:
+        count = 0
+        batch: List[Tuple[str, Optional[int], Optional[int]]] = []
+        for chunk in iter_pdf_chunks(pdf_path, chunk_size, chunk_overlap):
+            batch.append(chunk)
+            if len(batch) < batch_size:
+                continue
+            if _stop_event.is_set():
+                _batch_queue.put(("cancelled", pdf_path, None))
+                return
+            _send_batch(pdf_path, count, batch)
+            count += len(batch)
+            batch = []
+        if batch:
+            _send_batch(pdf_path, count, batch)
+            count += len(batch)
+        _batch_queue.put(("done", pdf_path, count))
+    except Exception as e:
+        _batch_queue.put(("failed", pdf_path, str(e)))
+
+
+def _send_batch(pdf_path: str, start: int, batch: List[Tuple[str, Optional[int], Optional[int]]]) -> None:
+    chunks = [chunk for chunk, _, _ in batch]
+    pages = [(first_page, last_page) for _, first_page, last_page in batch]
+    _batch_queue.put(("batch", pdf_path, (start, chunks, pages)))
@@ -1,13 +1,31 @@
 import json
-from .vectordb import ChromaDBConnector
-from .prompt_engineering import build_metric_analysis_prompt
+import hashlib
+from .vectordb import ChromaDBConnector, RETRIEVAL_MODE
+from .prompt_engineering import build_metric_analysis_prompt, PROMPT_TEMPLATE_HASH
+from .cache import TTLCache
+from .context import assemble_context, context_budget
 from .metrics import CompanyMetricsRetriever
-from .llm import call_llm, test_model_availability, check_ollama_connection
+from .llm import call_llm, acall_llm, astream_llm, warm_prompt_prefix
 import os
+import queue
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from .query_builder import MetricQueryBuilder
+from .ingestion import IngestionPipeline
+from .telemetry import span, submit_with_context
+from .health import HealthChecker
 import logging
 load_dotenv()
+# Prefill the prompt prefix shared by all metrics of a ticker once before the metric prompts are generated in parallel
+LLM_PREFIX_WARMUP = os.getenv("LLM_PREFIX_WARMUP", "0") == "1"
+# Number of tickers of a batch run whose market data is fetched at the same time
+BATCH_MARKET_CONCURRENCY = int(os.getenv("BATCH_MARKET_CONCURRENCY", "8"))
+# Chunks retrieved per MetricQueryBuilder query
+METRIC_QUERY_RESULTS = 5
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -19,25 +37,120 @@ class RAGPipeline:
     Orchestrates the Retrieval-Augmented Generation (RAG) process by integrating
     document ingestion, querying, and LLM interaction.
     """
-    def __init__(self, persist_directory: str = "rag/chroma_db", collection_name: str = "docs", embedding_model: str = "mxbai-embed-large:latest", llm_model: str = "llama3"):
+    def __init__(self, persist_directory: str = "rag/chroma_db", collection_name: str = "docs", embedding_model: str = "mxbai-embed-large:latest", llm_model: str = "llama3",
+                 llm_concurrency: int = 4, llm_timeout: float = 300.0,
+                 run_cache_size: int = int(os.getenv("RUN_CACHE_SIZE", "128")),
+                 run_cache_ttl: float = float(os.getenv("RUN_CACHE_TTL", "3600")),
+                 retrieval_mode: Optional[str] = None):
         self.persist_directory = persist_directory
         self.collection_name = collection_name
         self.embedding_model = embedding_model
         self.llm_model = llm_model
+        # Number of metric prompts generated in parallel (1 = sequential)
+        self.llm_concurrency = max(1, llm_concurrency)
+        # Per-metric timeout in seconds for a single LLM generation
+        self.llm_timeout = llm_timeout
+        # "vector", "lexical" or "hybrid"; None uses RETRIEVAL_MODE of the connector
+        self.retrieval_mode = retrieval_mode
         self.db_connector = ChromaDBConnector(
             path=self.persist_directory,
             embedding_model=self.embedding_model
         )
         self.query_builder = MetricQueryBuilder()
+        # Complete analyses of /api/run, keyed by ticker, model, prompt template, inputs and corpus version
+        self.result_cache = TTLCache(maxsize=run_cache_size, ttl=run_cache_ttl)
+        # (corpus version, retrieval result per MetricQueryBuilder query) - replaced as a whole
+        self._retrieval_index: tuple[Optional[str], dict] = (None, {})
+        # Query embedding and ranked chunk IDs per query of the stored index, for incremental updates (vector mode only)
+        self._retrieval_rankings: dict[str, tuple[list[float], list[str]]] = {}
+        self._retrieval_lock = threading.Lock()
+        self.health = HealthChecker(lambda: self.db_connector, llm_model=self.llm_model,
+                                    embedding_model=self.embedding_model, collection_name=self.collection_name)
+
+    def check_health(self) -> dict:
+        """
+        Reports the state of the ChromaDB collection and of the Ollama models, cached for a few seconds.
+        Returns:
+            The health report of HealthChecker.check.
+        """
+        return self.health.check()
+
+    def reload(self):
+        """
+        Reopens the ChromaDB client, e.g. after the persist directory was modified outside of this process.
+        The connector with its manifest, embedding cache and lexical index is kept, so running requests
+        and jobs keep working with the same objects; only the client is replaced once their calls are done.
+        """
+        logging.info(f"Reloading ChromaDB client from {self.persist_directory}")
+        self.db_connector.reopen()
+        # Warm up the collection handle so the next request does not pay for it
+        self.db_connector.get_collection()
+        self.result_cache.clear()
+        self._retrieval_index = (None, {})
+        self._retrieval_rankings = {}
+        self.health.invalidate()
 
-    def ingest_pdf_folder(self, folder_path: str):
+    def close(self):
+        """
+        Releases the ChromaDB client resources held by the pipeline.
         """
-        Adds all PDF documents from the specified folder to the ChromaDB collection.
+        self.health.close()
+        self.db_connector.close()
+
+    def ingest_pdf_folder(self, folder_path: str, remove_missing: bool = False,
+                          progress_callback: Optional[Callable[[dict], None]] = None,
+                          should_stop: Optional[Callable[[], bool]] = None) -> dict:
         """
-        for filename in os.listdir(folder_path):
-            if filename.lower().endswith(".pdf"):
-                pdf_path = os.path.join(folder_path, filename)
-                self.db_connector.add_pdf_to_collection(pdf_path)
+        Adds all new or modified PDF documents from the specified folder to the ChromaDB collection.
+        Files whose size and modification time match the ingest manifest are skipped, the remaining
+        files go through the parallel IngestionPipeline.
+        Args:
+            folder_path (str): The folder containing the PDF files.
+            remove_missing (bool): Also remove the chunks of previously ingested files that
+                are no longer in the folder (default: False).
+            progress_callback: Optional callable receiving a progress event per file and stage.
+            should_stop: Optional callable to cancel the ingestion; no further files are started once it returns True.
+        Returns:
+            The ingestion report with ingested, skipped and failed files.
+        """
+        manifest = self.db_connector.manifest
+        try:
+            pdf_paths = [
+                os.path.join(folder_path, filename)
+                for filename in os.listdir(folder_path)
+                if filename.lower().endswith(".pdf")
+            ]
+            unchanged = [pdf_path for pdf_path in pdf_paths if manifest.is_unchanged(pdf_path)]
+            changed = [pdf_path for pdf_path in pdf_paths if pdf_path not in unchanged]
+            logging.info(f"{len(changed)} new or modified PDFs, {len(unchanged)} unchanged in {folder_path}")
+
+            ingestion = IngestionPipeline(self.db_connector, progress_callback=progress_callback)
+            for pdf_path in unchanged:
+                if progress_callback is not None:
+                    progress_callback({"file": pdf_path, "status": "skipped"})
+            report = ingestion.ingest(changed, should_stop=should_stop)
+            report["skipped"] = unchanged + report["skipped"]
+
+            report["removed"] = []
+            if remove_missing:
+                present = {manifest.key(pdf_path) for pdf_path in pdf_paths}
+                for recorded_path in manifest.files_in_folder(folder_path):
+                    if recorded_path in present:
+                        continue
+                    if should_stop and should_stop():
+                        # The removal counts as cancelled work
+                        report["cancelled"].append(recorded_path)
+                        continue
+                    logging.info(f"{recorded_path} was deleted, removing its chunks")
+                    self.db_connector.remove_pdf_from_collection(recorded_path)
+                    report["removed"].append(recorded_path)
+        except Exception:
+            # Files written before the error changed the corpus; the retrieval results are recomputed on the next run
+            self.result_cache.clear()
+            raise
+        added = [chunk_id for pdf_path in report["ingested"] for chunk_id in (manifest.get(pdf_path) or {}).get("chunk_ids", [])]
+        self._content_changed(added)
+        return report
 
     def query(self, query_text: str, n_results: int = 5) -> tuple[str, list[str]]:
         """
@@ -50,35 +163,136 @@ class RAGPipeline:
                 - context (str): The concatenated text of the retrieved documents.
                 - sources (list[str]): A list of document IDs corresponding to the retrieved documents.
         """
+        return self.query_batch([query_text], n_results=n_results)[0]
+
+    def query_batch(self, query_texts: list[str], n_results: int = 5) -> list[tuple[str, list[str]]]:
+        """
+        Queries the ChromaDB collection for several query texts with a single embedding request and a single search.
+        Args:
+            query_texts (list[str]): The input query texts.
+            n_results (int): The number of top results to retrieve per query text (default: 5).
+        Returns:
+            A list with one (context, sources) tuple per query text, in the same order as query_texts.
+        """
+        return self._query_ranked(query_texts, n_results)[0]
+
+    def _query_ranked(self, query_texts: list[str], n_results: int,
+                      query_embeddings: Optional[list[list[float]]] = None) -> tuple[list[tuple[str, list[str]]], list[list[str]]]:
+        """
+        Like query_batch, but also returns the ranked chunk IDs the context of each query text was built from.
+        """
         try:
             #Query the database for relevant documents
-            results = self.db_connector.query_collection(
-                query_text=query_text,
+            results_per_query = self.db_connector.query_collection_batch(
+                query_texts=query_texts,
                 n_results=n_results,
+                mode=self.retrieval_mode,
+                include_metadata=True,
+                query_embeddings=query_embeddings,
             )
 
-            if not results:
-                return "", []
+            # Merges overlapping chunks, drops duplicates and trims the context to the model's token budget
+            token_budget = context_budget(self.llm_model)
+            answers = [assemble_context(results, token_budget) for results in results_per_query]
+            return answers, [[result[0] for result in results] for results in results_per_query]
 
-            # Build context and sources
-            context_parts = []
-            sources = []
+        except Exception as e:
+            logging.error(f"Fehler bei der Abfrage: {str(e)}")
+            return [("", []) for _ in query_texts], [[] for _ in query_texts]
 
-            for doc_id, doc_text in results:
-                # Only add non-empty document texts to the context
-                context_parts.append(doc_text)
+    def refresh_retrieval_index(self) -> dict[str, tuple[str, list[str]]]:
+        """
+        Precomputes the retrieval results of all MetricQueryBuilder queries for the current corpus version
+        with one batched query. Does nothing if the stored results are still valid.
+        Returns:
+            The (context, sources) tuple per query text.
+        """
+        with self._retrieval_lock:
+            version = self.db_connector.content_version
+            stored_version, stored = self._retrieval_index
+            if stored_version == version:
+                return stored
 
-                # Add sources on different list
-                sources.append(doc_id)
+            queries = sorted({self.query_builder.build_query(metric) for metric in self.query_builder.metric_keywords})
+            collection = self.db_connector.get_collection()
+            rankings = {}
+            if collection is None or collection.count() == 0:
+                index = {query: ("", []) for query in queries}
+            else:
+                embeddings = None
+                if (self.retrieval_mode or RETRIEVAL_MODE) == "vector":
+                    try:
+                        embeddings = self.db_connector.embed(queries)
+                    except Exception as e:
+                        logging.warning(f"Embedding the metric queries failed: {e}")
+                        return {query: ("", []) for query in queries}
+                answers, ranked = self._query_ranked(queries, METRIC_QUERY_RESULTS, embeddings)
+                index = dict(zip(queries, answers))
+                if not any(sources for _, sources in index.values()):
+                    # Retrieval failed (e.g. Ollama unreachable), try again on the next run
+                    return index
+                if embeddings is not None:
+                    rankings = {query: (embedding, ids) for query, embedding, ids in zip(queries, embeddings, ranked)}
+            logging.info(f"Precomputed retrieval results for {len(index)} queries")
+            self._retrieval_index = (version, index)
+            self._retrieval_rankings = rankings
+            return index
 
-            # Join context parts with double newlines for better readability
-            context = "\n\n".join(context_parts)
+    def update_retrieval_index(self, added_chunk_ids: list[str]) -> None:
+        """
+        Brings the precomputed retrieval results up to date after chunks were added or removed, searching
+        only the queries whose ranking can have changed: one of their chunks was removed, or an added chunk
+        is closer to the query than their last result. Without stored rankings (lexical and hybrid mode,
+        where the BM25 statistics change with every document) the results are recomputed on the next run.
+        Args:
+            added_chunk_ids (list[str]): IDs of the chunks written since the index was computed.
+        """
+        with self._retrieval_lock:
+            version = self.db_connector.content_version
+            stored_version, stored = self._retrieval_index
+            if stored_version is None or stored_version == version or not self._retrieval_rankings:
+                return
+            rankings = dict(self._retrieval_rankings)
+            queries = list(rankings)
+            embeddings = [rankings[query][0] for query in queries]
+            current = self.db_connector.distances(embeddings, list({i for q in queries for i in rankings[q][1]}))
+            candidates = self.db_connector.distances(embeddings, added_chunk_ids)
 
-            return context, sources
+            stale = []
+            for query, distances, new in zip(queries, current, candidates):
+                ranked = rankings[query][1]
+                if any(chunk_id not in distances for chunk_id in ranked):
+                    stale.append(query)
+                elif new and (len(ranked) < METRIC_QUERY_RESULTS or min(new.values()) < max(distances[i] for i in ranked)):
+                    stale.append(query)
 
-        except Exception as e:
-            print(f"Fehler bei der Abfrage: {str(e)}")
-            return "", []
+            index = dict(stored)
+            if stale:
+                answers, ranked = self._query_ranked(stale, METRIC_QUERY_RESULTS, [rankings[q][0] for q in stale])
+                for query, answer, ids in zip(stale, answers, ranked):
+                    index[query] = answer
+                    rankings[query] = (rankings[query][0], ids)
+            logging.info(f"Updated the retrieval results of {len(stale)} of {len(queries)} queries")
+            self._retrieval_index = (version, index)
+            self._retrieval_rankings = rankings
+
+    def retrieve_metrics(self, metrics: list[str]) -> list[tuple[str, list[str]]]:
+        """
+        Returns the literature context of the given metrics from the precomputed retrieval results;
+        only metrics without a precomputed query are searched.
+        Args:
+            metrics (list[str]): The metric names.
+        Returns:
+            A list with one (context, sources) tuple per metric, in the same order as metrics.
+        """
+        queries = [self.query_builder.build_query(metric) for metric in metrics]
+        version, index = self._retrieval_index
+        if version != self.db_connector.content_version:
+            index = self.refresh_retrieval_index()
+        missing = [query for query in dict.fromkeys(queries) if query not in index]
+        if missing:
+            index = {**index, **dict(zip(missing, self.query_batch(missing)))}
+        return [index[query] for query in queries]
 
     def run(self, ticker: str):
         """
@@ -88,10 +302,234 @@ class RAGPipeline:
         Returns:
             A dictionary containing the enriched metrics with LLM responses and sources.
         """
-        #check if the db is initialized
-        if not self.db_connector.client.get_collection("docs"):
-            logging.error("Die ChromaDB-Collection 'docs' existiert nicht. Bitte fügen Sie Dokumente hinzu oder initialisieren Sie die Collection.")
-            return {"error": "Die ChromaDB-Collection 'docs' existiert nicht."}
+        with span("run", ticker=ticker.upper()) as run_span:
+            #check if the db is initialized
+            if self.db_connector.get_collection() is None:
+                logging.error("Die ChromaDB-Collection 'docs' existiert nicht. Bitte fügen Sie Dokumente hinzu oder initialisieren Sie die Collection.")
+                return {"error": "Die ChromaDB-Collection 'docs' existiert nicht."}
+
+            cache_key, cached, enriched_metrics, prompts = self._prepare_run(ticker)
+            if cached is not None:
+                run_span["cached"] = True
+                return cached
+
+            #Calls the LLM for all metrics concurrently
+            llm_responses, failed = self._generate(prompts)
+
+            responses = {}
+            for metric, metric_values in enriched_metrics.items():
+                responses[metric] = {
+                    "value": metric_values["value"],
+                    "llm_response": llm_responses[metric],
+                    "sources": metric_values["sources"]
+                }
+
+            #Only complete analyses are cached, failed metrics are retried on the next run
+            if not failed:
+                self.result_cache.set(cache_key, responses)
+            return responses
+
+    async def run_stream(self, ticker: str) -> AsyncIterator[dict]:
+        """
+        Calls the RAG pipeline for a given ticker symbol and yields events as soon as they are available.
+        Market data and retrieval run in a worker thread, the metrics are generated on the event loop
+        with the async Ollama client.
+        Args:
+            ticker (str): The stock ticker symbol.
+        Yields:
+            Event dictionaries:
+                - {"event": "metric", "metric", "value", "sources"} once retrieval for a metric is done
+                - {"event": "token", "metric", "delta"} for each generated text fragment
+                - {"event": "metric_done", "metric", "llm_response"} when a metric is complete
+                - {"event": "error", "metric"?, "message"} on failures
+                - {"event": "done"} at the end of the run
+        """
+        with span("run", ticker=ticker.upper(), stream=True) as run_span:
+            if await asyncio.to_thread(self.db_connector.get_collection) is None:
+                yield {"event": "error", "message": "Die ChromaDB-Collection 'docs' existiert nicht."}
+                return
+
+            cache_key, cached, enriched_metrics, prompts = await asyncio.to_thread(self._prepare_run, ticker)
+            if cached is not None:
+                run_span["cached"] = True
+                for metric, content in cached.items():
+                    yield {"event": "metric", "metric": metric, "value": content["value"], "sources": content["sources"]}
+                    yield {"event": "metric_done", "metric": metric, "llm_response": content["llm_response"]}
+                yield {"event": "done"}
+                return
+
+            #Values and sources are known before generation starts
+            for metric, metric_values in enriched_metrics.items():
+                yield {"event": "metric", "metric": metric, "value": metric_values["value"], "sources": metric_values["sources"]}
+
+            events: "asyncio.Queue[tuple[str, str, str]]" = asyncio.Queue()
+            slots = asyncio.Semaphore(self.llm_concurrency)
+
+            async def generate(metric: str, prompt: str):
+                parts = []
+                try:
+                    async with slots:
+                        with span("llm", metric=metric, model=self.llm_model):
+                            async for delta in astream_llm(prompt, self.llm_model, temperature=0.01, timeout=self.llm_timeout):
+                                parts.append(delta)
+                                events.put_nowait(("token", metric, delta))
+                    events.put_nowait(("metric_done", metric, "".join(parts).strip()))
+                except Exception as e:
+                    logging.error(f"LLM-Aufruf für {metric} fehlgeschlagen: {e}")
+                    events.put_nowait(("error", metric, str(e)))
+
+            await self._awarm_prompt_prefix(prompts)
+            tasks = [asyncio.create_task(generate(metric, prompt)) for metric, prompt in prompts.items()]
+            try:
+                responses = {}
+                failed = False
+                pending = len(prompts)
+                while pending:
+                    kind, metric, text = await events.get()
+                    if kind == "token":
+                        yield {"event": "token", "metric": metric, "delta": text}
+                        continue
+                    pending -= 1
+                    if kind == "metric_done":
+                        llm_response = text
+                        yield {"event": "metric_done", "metric": metric, "llm_response": llm_response}
+                    else:
+                        failed = True
+                        llm_response = f"Keine LLM-Antwort verfügbar: {text}"
+                        yield {"event": "error", "metric": metric, "message": text}
+                    responses[metric] = {
+                        "value": enriched_metrics[metric]["value"],
+                        "llm_response": llm_response,
+                        "sources": enriched_metrics[metric]["sources"]
+                    }
+
+                if not failed:
+                    self.result_cache.set(cache_key, {metric: responses[metric] for metric in enriched_metrics})
+                yield {"event": "done"}
+            finally:
+                # Client disconnected or run finished: stop remaining generations
+                for task in tasks:
+                    task.cancel()
+
+    def run_batch(self, tickers: list[str]) -> Iterator[dict]:
+        """
+        Analyses several tickers together and yields each result as soon as all its metrics are generated.
+        Retrieval runs once for the whole batch, market data is fetched concurrently (sector ETF and macro
+        lookups are shared by tickers of the same sector and country) and the metric prompts of all tickers
+        go through one LLM executor of llm_concurrency workers.
+        Args:
+            tickers (list[str]): The stock ticker symbols; duplicates are analysed once.
+        Yields:
+            Event dictionaries:
+                - {"event": "result", "ticker", "results", "failed_metrics", "cached"} when a ticker is complete
+                - {"event": "error", "ticker"?, "message"} if a ticker (or the whole batch) fails
+                - {"event": "done", "tickers", "failed"} at the end of the batch
+        """
+        with span("run", tickers=len(tickers), batch=True):
+            if self.db_connector.get_collection() is None:
+                yield {"event": "error", "message": "Die ChromaDB-Collection 'docs' existiert nicht."}
+                return
+
+            tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+            # The metric queries are the same for every ticker, so the literature context is retrieved once
+            with span("retrieval", metrics=len(self.query_builder.metric_keywords), tickers=len(tickers)):
+                metric_names = list(self.query_builder.metric_keywords)
+                retrieved = dict(zip(metric_names, self.retrieve_metrics(metric_names)))
+
+            events: "queue.Queue[tuple[str, str, object]]" = queue.Queue()
+
+            def prepare(ticker: str):
+                try:
+                    prepared = self._prepare_run(ticker, retrieved)
+                    # Prefills the shared prefix in the market data worker, the LLM workers stay busy meanwhile
+                    self._warm_prompt_prefix(prepared[3])
+                    events.put(("prepared", ticker, prepared))
+                except Exception as e:
+                    logging.error(f"Vorbereitung für {ticker} fehlgeschlagen: {e}")
+                    events.put(("failed", ticker, str(e)))
+
+            def generate(ticker: str, metric: str, prompt: str):
+                try:
+                    with span("llm", ticker=ticker, metric=metric, model=self.llm_model):
+                        text = call_llm(prompt, self.llm_model, temperature=0.01, timeout=self.llm_timeout)
+                    events.put(("generated", ticker, (metric, text, None)))
+                except Exception as e:
+                    logging.error(f"LLM-Aufruf für {ticker}/{metric} fehlgeschlagen: {e}")
+                    events.put(("generated", ticker, (metric, f"Keine LLM-Antwort verfügbar: {e}", str(e))))
+
+            market_executor = ThreadPoolExecutor(max_workers=max(1, min(BATCH_MARKET_CONCURRENCY, len(tickers))))
+            llm_executor = ThreadPoolExecutor(max_workers=self.llm_concurrency)
+            try:
+                for ticker in tickers:
+                    submit_with_context(market_executor, prepare, ticker)
+
+                runs = {}
+                failed_tickers = 0
+                preparing = len(tickers)
+                while preparing or runs:
+                    kind, ticker, payload = events.get()
+                    if kind == "failed":
+                        preparing -= 1
+                        failed_tickers += 1
+                        yield {"event": "error", "ticker": ticker, "message": payload}
+                        continue
+
+                    if kind == "prepared":
+                        preparing -= 1
+                        cache_key, cached, enriched_metrics, prompts = payload
+                        if cached is not None:
+                            yield {"event": "result", "ticker": ticker, "results": cached, "failed_metrics": [], "cached": True}
+                            continue
+                        runs[ticker] = {"cache_key": cache_key, "metrics": enriched_metrics, "responses": {}, "failed": []}
+                        # Submission order is the queue order: earlier tickers finish first
+                        for metric, prompt in prompts.items():
+                            submit_with_context(llm_executor, generate, ticker, metric, prompt)
+                        if prompts:
+                            continue
+                    else:
+                        metric, text, error = payload
+                        runs[ticker]["responses"][metric] = text
+                        if error is not None:
+                            runs[ticker]["failed"].append(metric)
+
+                    run = runs[ticker]
+                    if len(run["responses"]) < len(run["metrics"]):
+                        continue
+                    del runs[ticker]
+                    responses = {
+                        metric: {
+                            "value": metric_values["value"],
+                            "llm_response": run["responses"][metric],
+                            "sources": metric_values["sources"]
+                        }
+                        for metric, metric_values in run["metrics"].items()
+                    }
+                    #Only complete analyses are cached, failed metrics are retried on the next run
+                    if not run["failed"]:
+                        self.result_cache.set(run["cache_key"], responses)
+                    yield {"event": "result", "ticker": ticker, "results": responses, "failed_metrics": run["failed"], "cached": False}
+
+                yield {"event": "done", "tickers": len(tickers), "failed": failed_tickers}
+            finally:
+                # Client disconnected or batch finished: drop the work that has not started yet
+                market_executor.shutdown(wait=False, cancel_futures=True)
+                llm_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prepare_run(self, ticker: str, retrieved: Optional[dict[str, tuple[str, list[str]]]] = None
+                     ) -> tuple[str, Optional[dict], dict, dict[str, str]]:
+        """
+        Fetches the company data, retrieves the literature context and builds the prompts for all metrics.
+        Args:
+            ticker (str): The stock ticker symbol.
+            retrieved: Optional literature context per metric retrieved beforehand (e.g. once for a batch);
+                metrics missing from it are retrieved here.
+        Returns:
+            A tuple containing:
+                - The result cache key of this run.
+                - The cached result, or None if the run has to be generated.
+                - The metrics with value, context and sources (empty on a cache hit).
+                - The LLM prompt per metric (empty on a cache hit).
+        """
         #Get all information for the given ticker
         retriever = CompanyMetricsRetriever(ticker)
         complete_metrics = retriever.get_metrics()
@@ -103,44 +541,148 @@ class RAGPipeline:
         macro_info = complete_metrics["macro_info"]
         company_info = complete_metrics["company_info"]
 
-        #Enriches the metrics with RAG
+        #Serves the analysis from the result cache if nothing changed since the last run
+        cache_key = self._result_cache_key(ticker, complete_metrics)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"Result cache hit for {ticker}")
+            return cache_key, cached, {}, {}
+
+        #Enriches the metrics with RAG (precomputed per corpus version)
+        current_values = metrics["metrics"]
+        retrieved = retrieved or {}
+        missing = [metric for metric in current_values if metric not in retrieved]
+        if missing:
+            with span("retrieval", metrics=len(missing)):
+                retrieved = {**retrieved, **dict(zip(missing, self.retrieve_metrics(missing)))}
         enriched_metrics = {}
-        for metric, value in metrics["metrics"].items():
-            query = self.query_builder.build_query(metric)
-            context, sources = self.query(query_text=query)
+        for metric, value in current_values.items():
+            context, sources = retrieved[metric]
             enriched_metrics[metric] = {
                 "value": value,
                 "context": context,
                 "sources": sources
             }
 
-        #Builds the LLM prompts and calls the LLM
-        responses = {}
+        #Builds the LLM prompts
+        prompts = {}
         for metric, metric_values in enriched_metrics.items():
-            value = metric_values["value"]
-            context = metric_values["context"]
-            sources = metric_values["sources"]
-            prompt = build_metric_analysis_prompt(
-                ticker=ticker,
-                peer_metrics=peer_metrics,
-                macro_info=macro_info,
-                company_info=company_info,
-                historical_metrics=historical_metrics,
-                metric=metric,
-                value=value,
-                literature_context=context
-            )
-            llm_response = call_llm(prompt, self.llm_model, temperature=0.01)
-            responses[metric] = {
-                "value": value,
-                "llm_response": llm_response,
-                "sources": sources
-            }
-        return responses
+            with span("prompt_build", metric=metric) as prompt_span:
+                prompts[metric] = build_metric_analysis_prompt(
+                    ticker=ticker,
+                    peer_metrics=peer_metrics,
+                    macro_info=macro_info,
+                    company_info=company_info,
+                    historical_metrics=historical_metrics,
+                    metric=metric,
+                    value=metric_values["value"],
+                    literature_context=metric_values["context"]
+                )
+                prompt_span["prompt_chars"] = len(prompts[metric])
+
+        return cache_key, None, enriched_metrics, prompts
+
+    def _result_cache_key(self, ticker: str, complete_metrics: dict) -> str:
+        """
+        Builds the result cache key from everything the analysis depends on.
+        Args:
+            ticker (str): The stock ticker symbol.
+            complete_metrics (dict): The metric inputs returned by CompanyMetricsRetriever.get_metrics.
+        Returns:
+            A hex digest identifying the analysis.
+        """
+        key_payload = json.dumps({
+            "ticker": ticker.upper(),
+            "llm_model": self.llm_model,
+            "prompt_template": PROMPT_TEMPLATE_HASH,
+            "inputs": complete_metrics,
+            "collection_version": self.db_connector.content_version,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(key_payload.encode("utf-8")).hexdigest()
+
+    def cache_stats(self) -> dict:
+        """
+        Returns hit/miss statistics of the result cache.
+        """
+        return self.result_cache.stats()
+
+    def _generate(self, prompts: dict[str, str]) -> tuple[dict[str, str], set[str]]:
+        """
+        Sends the prompts to the LLM with bounded concurrency.
+        Args:
+            prompts (dict[str, str]): Mapping of metric name to prompt.
+        Returns:
+            A tuple containing:
+                - A dictionary mapping each metric to its LLM response. Metrics whose
+                  generation failed or timed out get an error message instead.
+                - The set of metrics whose generation failed.
+        """
+        failed = set()
+
+        def generate(metric: str, prompt: str) -> str:
+            try:
+                with span("llm", metric=metric, model=self.llm_model):
+                    return call_llm(prompt, self.llm_model, temperature=0.01, timeout=self.llm_timeout)
+            except Exception as e:
+                logging.error(f"LLM-Aufruf für {metric} fehlgeschlagen: {e}")
+                failed.add(metric)
+                return f"Keine LLM-Antwort verfügbar: {e}"
+
+        self._warm_prompt_prefix(prompts)
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency) as executor:
+            futures = {metric: submit_with_context(executor, generate, metric, prompt) for metric, prompt in prompts.items()}
+            responses = {metric: future.result() for metric, future in futures.items()}
+        return responses, failed
+
+    def _warm_prompt_prefix(self, prompts: dict[str, str]):
+        """
+        With LLM_PREFIX_WARMUP, prefills the common beginning of the prompts once, so the parallel
+        generations reuse its KV cache instead of each processing the shared company data.
+        """
+        if not LLM_PREFIX_WARMUP or self.llm_concurrency < 2 or len(prompts) < 2:
+            return
+        prefix = os.path.commonprefix(list(prompts.values()))
+        if prefix:
+            with span("prefix_warmup", model=self.llm_model, prefix_chars=len(prefix)):
+                warm_prompt_prefix(prefix, self.llm_model, temperature=0.01, timeout=self.llm_timeout)
+
+    async def _awarm_prompt_prefix(self, prompts: dict[str, str]):
+        """
+        async counterpart of _warm_prompt_prefix for run_stream.
+        """
+        if not LLM_PREFIX_WARMUP or self.llm_concurrency < 2 or len(prompts) < 2:
+            return
+        prefix = os.path.commonprefix(list(prompts.values()))
+        if prefix:
+            with span("prefix_warmup", model=self.llm_model, prefix_chars=len(prefix)):
+                try:
+                    await acall_llm(prefix, self.llm_model, temperature=0.01, max_tokens=1, timeout=self.llm_timeout,
+                                    use_cache=False)
+                    logging.info("Prompt prefix prefilled")
+                except Exception as e:
+                    logging.warning(f"Prefilling the prompt prefix failed: {e}")
 
     def delete_collection(self):
         self.db_connector.delete_collection()
+        self._content_changed([])
+
+    def add_document(self, path: str) -> list[str]:
+        try:
+            ids = self.db_connector.add_pdf_to_collection(path)
+        except Exception:
+            self.result_cache.clear()
+            raise
+        self._content_changed(ids)
+        return ids
 
-    def add_document(self, path: str):
-        self.db_connector.add_pdf_to_collection(path)
+    def _content_changed(self, added_chunk_ids: list[str]):
+        """
+        Drops the cached analyses and updates the retrieval results for the added chunks.
+        A failing update is only logged, the results are then recomputed on the next run.
+        """
+        self.result_cache.clear()
+        try:
+            self.update_retrieval_index(added_chunk_ids)
+        except Exception:
+            logging.exception("Updating the retrieval results failed")
 
@@ -1,7 +1,95 @@
+import os
 import json
+import hashlib
 from typing import Dict, Any, Optional
 import textwrap
 
+_INSTRUCTIONS = textwrap.dedent("""
+    You are an equity analyst. Your sole task is to interpret a single fundamental metric for one company in plain English for a general audience. Do not predict whether the stock will go up or down. Do not give investment advice. Do not provide forward-looking statements or guidance.
+
+    ### Task
+    - Explain what the metric is and what it measures.
+    - Interpret the provided current value (if present) in simple terms.
+    - Use the historical data to describe trend or stability, if available.
+    - Use peer/industry context only to help a layperson understand whether the level is typical or unusual.
+    - Briefly mention any macro or company-specific context that meaningfully affects interpretation of this metric.
+    - State limitations and what this metric does NOT tell us.
+    - Keep the tone neutral, factual, and educational.
+
+    ### Rules (must-follow)
+    1) **No predictions** (no “will rise/fall”, no target prices, no timing).
+    2) **No advice** (no “buy/sell/hold”, no allocation or suitability statements).
+    3) **No fabrication**: Use ONLY the data provided below; if something is missing, say “not provided”.
+    4) **Jargon**: Avoid it; if used, define it in one short clause.
+    5) **Comparisons**: When comparing, prefer “relative to its own history” and “relative to peers in the same industry”, if that data is provided.
+    6) **Numbers**: Quote exact numbers from the input; do not invent benchmarks.
+""").strip()
+
+_OUTPUT_FORMAT = textwrap.dedent("""
+    ### Output format (use these exact section headings)
+    1) Plain-English summary (2–3 sentences)
+    2) What this metric measures
+    3) Interpretation of the current value
+    4) Historical context (trend, variability)
+    5) Peer/industry comparison
+    6) Context that may affect interpretation (macro & company specifics)
+    7) Limitations & caveats of this metric
+    8) One-sentence takeaway (layman-friendly)
+
+    Write the answer in English. Do not include this instruction block in your reply.
+""").strip()
+
+# The original single-payload prompt (input data between the rules and the output format), indented as it was
+# written; build it with textwrap.dedent(METRIC_ANALYSIS_TEMPLATE.format(data_json=...).strip()) like
+# build_metric_analysis_prompt does
+METRIC_ANALYSIS_TEMPLATE = textwrap.indent(
+    f"\n{_INSTRUCTIONS}\n\n### Input Data (JSON)\n{{data_json}}\n\n{_OUTPUT_FORMAT}\n", "    "
+) + "    "
+
+# Same instructions with a stable, ticker-level prefix: everything up to the metric block is identical for all
+# metric prompts of one ticker, so Ollama can reuse the prefilled KV cache between consecutive generations
+SHARED_PREFIX_TEMPLATE = f"{_INSTRUCTIONS}\n\n{_OUTPUT_FORMAT}\n\n### Company Data (JSON)\n{{company_json}}\n\n"
+SHARED_PREFIX_METRIC_TEMPLATE = "### Metric to interpret (JSON)\n{metric_json}"
+
+# "json" is the original single JSON payload layout, "shared_prefix" (opt-in) puts the instructions and the
+# ticker-level data first and the metric at the end
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "json")
+
+# Changes whenever the template changes, used to invalidate cached analyses
+PROMPT_TEMPLATE_HASH = hashlib.sha256(
+    "\0".join([METRIC_ANALYSIS_TEMPLATE, SHARED_PREFIX_TEMPLATE, SHARED_PREFIX_METRIC_TEMPLATE, PROMPT_LAYOUT]).encode("utf-8")
+).hexdigest()[:16]
+
+
+def build_shared_prefix(
+    ticker: str,
+    historical_metrics: Dict[str, Any],
+    peer_metrics: Dict[str, Any],
+    macro_info: Dict[str, Any],
+    company_info: Dict[str, Any]
+) -> str:
+    """
+    Builds the metric-independent beginning of the shared-prefix prompts of one ticker.
+    Args:
+        ticker: Stock ticker symbol.
+        historical_metrics: Historical values of the metrics for trend analysis.
+        peer_metrics: Peer/industry average values for comparison.
+        macro_info: Relevant macroeconomic information.
+        company_info: Company-specific information (sector, industry, description).
+    Returns:
+        The prompt prefix shared by all metrics of the ticker.
+    """
+    company = {
+        "ticker": ticker,
+        "historical_metrics": historical_metrics or {},
+        "peer_metrics": peer_metrics or {},
+        "macro_info": macro_info or {},
+        "company_info": company_info or {},
+    }
+    company_json = json.dumps(company, ensure_ascii=False, sort_keys=True, indent=2, default=str)
+    return SHARED_PREFIX_TEMPLATE.format(company_json=company_json)
+
+
 def build_metric_analysis_prompt(
     ticker: str,
     metric: str,
@@ -10,7 +98,8 @@ def build_metric_analysis_prompt(
     peer_metrics: Dict[str, Any],
     macro_info: Dict[str, Any],
     company_info: Dict[str, Any],
-    literature_context: Optional[str] = None
+    literature_context: Optional[str] = None,
+    layout: Optional[str] = None
 ) -> str:
     """
     Builds a prompt for analyzing a financial metric using provided data.
@@ -23,9 +112,20 @@ def build_metric_analysis_prompt(
         macro_info: Relevant macroeconomic information.
         company_info: Company-specific information (sector, industry, description).
         literature_context: Additional context from literature or reports (may be None).
+        layout: "shared_prefix" or "json" (default: PROMPT_LAYOUT).
     Returns:
         A formatted prompt string for the LLM.
     """
+    if (layout or PROMPT_LAYOUT) == "shared_prefix":
+        metric_data = {
+            "metric": metric,
+            "value": value,  # may be None
+            "literature_context": literature_context or "",
+        }
+        metric_json = json.dumps(metric_data, ensure_ascii=False, indent=2, default=str)
+        prefix = build_shared_prefix(ticker, historical_metrics, peer_metrics, macro_info, company_info)
+        return prefix + SHARED_PREFIX_METRIC_TEMPLATE.format(metric_json=metric_json)
+
     payload = {
         "ticker": ticker,
         "metric": metric,
@@ -39,40 +139,6 @@ def build_metric_analysis_prompt(
 
     data_json = json.dumps(payload, ensure_ascii=False, sort_keys=True, indent=2, default=str)
 
-    prompt = f"""
-    You are an equity analyst. Your sole task is to interpret a single fundamental metric for one company in plain English for a general audience. Do not predict whether the stock will go up or down. Do not give investment advice. Do not provide forward-looking statements or guidance.
-
-    ### Task
-    - Explain what the metric is and what it measures.
-    - Interpret the provided current value (if present) in simple terms.
-    - Use the historical data to describe trend or stability, if available.
-    - Use peer/industry context only to help a layperson understand whether the level is typical or unusual.
-    - Briefly mention any macro or company-specific context that meaningfully affects interpretation of this metric.
-    - State limitations and what this metric does NOT tell us.
-    - Keep the tone neutral, factual, and educational.
-
-    ### Rules (must-follow)
-    1) **No predictions** (no “will rise/fall”, no target prices, no timing).
-    2) **No advice** (no “buy/sell/hold”, no allocation or suitability statements).
-    3) **No fabrication**: Use ONLY the data provided below; if something is missing, say “not provided”.
-    4) **Jargon**: Avoid it; if used, define it in one short clause.
-    5) **Comparisons**: When comparing, prefer “relative to its own history” and “relative to peers in the same industry”, if that data is provided.
-    6) **Numbers**: Quote exact numbers from the input; do not invent benchmarks.
-
-    ### Input Data (JSON)
-    {data_json}
-
-    ### Output format (use these exact section headings)
-    1) Plain-English summary (2–3 sentences)
-    2) What this metric measures
-    3) Interpretation of the current value
-    4) Historical context (trend, variability)
-    5) Peer/industry comparison
-    6) Context that may affect interpretation (macro & company specifics)
-    7) Limitations & caveats of this metric
-    8) One-sentence takeaway (layman-friendly)
-
-    Write the answer in English. Do not include this instruction block in your reply.
-    """.strip()
+    prompt = METRIC_ANALYSIS_TEMPLATE.format(data_json=data_json).strip()
 
-    return textwrap.dedent(prompt)
\ No newline at end of file
+    return textwrap.dedent(prompt)
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import threading
+import logging
+from typing import Dict, Optional
+import yfinance as yf
+from .cache import TTLCache
+
+# Dictionary mapping GICS sectors to well-known ETFs
+SECTOR_ETF_MAP = {
+    "Technology": "XLK",
+    "Health Care": "XLV",
+    "Financial Services": "XLF",
+    "Consumer Cyclical": "XLY",
+    "Consumer Defensive": "XLP",
+    "Energy": "XLE",
+    "Industrials": "XLI",
+    "Materials": "XLB",
+    "Utilities": "XLU",
+    "Real Estate": "XLRE",
+    "Communication Services": "XLC"
+}
+
+SECTOR_ETF_TTL = float(os.getenv("SECTOR_ETF_TTL", str(6 * 3600)))
+# Optional JSON file that keeps the ETF insights across restarts (empty = memory only);
+# kept next to this module by default, so every working directory shares one file
+SECTOR_ETF_CACHE_PATH = os.getenv(
+    "SECTOR_ETF_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "sector_etf.json")
+)
+
+
+def fetch_etf_insights(etf_ticker: str) -> Dict:
+    """
+    Fetches the key figures of a sector ETF from yfinance.
+    Args:
+        etf_ticker: The ETF ticker symbol.
+    Returns:
+        A dictionary with name, returns, total assets, dividend yield and beta of the ETF.
+    """
+    info = yf.Ticker(etf_ticker).info
+    return {
+        "ETF Name": info.get("longName", "N/A"),
+        "YTD Return": info.get("ytdReturn", "N/A"),
+        "1Y Return": info.get("threeYearAverageReturn", "N/A"),
+        "Total Assets": info.get("totalAssets", "N/A"),
+        "Dividend Yield": info.get("dividendYield", "N/A"),
+        "Beta": info.get("beta", "N/A")
+    }
+
+
+class SectorETFCache:
+    """
+    Shares sector ETF insights across tickers: an in-memory LRU cache with optional JSON file
+    backing and an optional background job that refreshes all mapped ETFs periodically.
+    """
+    def __init__(self, ttl: float = SECTOR_ETF_TTL, persist_path: Optional[str] = SECTOR_ETF_CACHE_PATH):
+        self.ttl = ttl
+        self.persist_path = persist_path or None
+        self._memory = TTLCache(maxsize=len(SECTOR_ETF_MAP) * 2, ttl=ttl)
+        self._persist_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._load_persisted()
+
+    def _load_persisted(self) -> None:
+        """
+        Fills the memory cache with the still valid entries of the JSON file.
+        """
+        if not self.persist_path or not os.path.isfile(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception as e:
+            logging.warning(f"Could not read sector ETF cache {self.persist_path}: {e}")
+            return
+        now = time.time()
+        for etf_ticker, entry in stored.items():
+            remaining = self.ttl - (now - entry.get("fetched_at", 0))
+            if remaining > 0:
+                self._memory.set(etf_ticker, entry["insights"], ttl=remaining)
+
+    def _persist(self, etf_ticker: str, insights: Dict) -> None:
+        if not self.persist_path:
+            return
+        with self._persist_lock:
+            stored = {}
+            if os.path.isfile(self.persist_path):
+                try:
+                    with open(self.persist_path, "r", encoding="utf-8") as f:
+                        stored = json.load(f)
+                except Exception:
+                    stored = {}
+            stored[etf_ticker] = {"fetched_at": time.time(), "insights": insights}
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.persist_path)
+
+    def _fetch(self, etf_ticker: str) -> Dict:
+        insights = fetch_etf_insights(etf_ticker)
+        self._persist(etf_ticker, insights)
+        return insights
+
+    def get_insights(self, sector: Optional[str]) -> Dict:
+        """
+        Returns the ETF insights for a sector, fetching them only if they are not cached.
+        Args:
+            sector: The sector name as reported by yfinance.
+        Returns:
+            A dictionary with the sector, the ETF symbol and the ETF key figures. For unmapped
+            sectors all ETF fields are "N/A" and no request is made.
+        """
+        etf_ticker = SECTOR_ETF_MAP.get(sector)
+        if etf_ticker is None:
+            logging.info(f"No sector ETF mapped for sector: {sector}")
+            return {
+                "Sector": sector,
+                "ETF Symbol": "N/A",
+                "ETF Name": "N/A",
+                "YTD Return": "N/A",
+                "1Y Return": "N/A",
+                "Total Assets": "N/A",
+                "Dividend Yield": "N/A",
+                "Beta": "N/A"
+            }
+        insights = self._memory.get_or_compute(etf_ticker, lambda: self._fetch(etf_ticker))
+        return {"Sector": sector, "ETF Symbol": etf_ticker, **insights}
+
+    def refresh(self) -> None:
+        """
+        Refetches the insights of all mapped sector ETFs. Failing ETFs keep their cached entry.
+        """
+        for etf_ticker in SECTOR_ETF_MAP.values():
+            if self._stop_event.is_set():
+                return
+            try:
+                self._memory.set(etf_ticker, self._fetch(etf_ticker))
+            except Exception as e:
+                logging.warning(f"Refreshing sector ETF {etf_ticker} failed: {e}")
+
+    def start_background_refresh(self, interval: float) -> None:
+        """
+        Starts a daemon thread that refreshes all sector ETFs every `interval` seconds.
+        Args:
+            interval: Seconds between two refresh rounds.
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.is_set():
+                self.refresh()
+                self._stop_event.wait(interval)
+
+        self._refresh_thread = threading.Thread(target=loop, name="sector-etf-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self) -> None:
+        """
+        Stops the background refresh job if it is running.
+        """
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+
+_default_cache: Optional[SectorETFCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_sector_etf_cache() -> SectorETFCache:
+    """
+    Returns the process-wide SectorETFCache, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SectorETFCache()
+        return _default_cache
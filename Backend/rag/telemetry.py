@@ -0,0 +1,165 @@
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+STAGE_DURATION = Histogram(
+    "rag_stage_duration_seconds",
+    "Duration of RAG pipeline stages",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+LLM_TOKENS = Counter(
+    "rag_llm_tokens_total",
+    "Tokens processed by Ollama, by model and kind (prompt or completion)",
+    ["model", "kind"],
+)
+LLM_GENERATION_RATE = Histogram(
+    "rag_llm_generation_tokens_per_second",
+    "Completion tokens per second of Ollama generations (eval_count / eval_duration)",
+    ["model"],
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250),
+)
+LLM_PROMPT_RATE = Histogram(
+    "rag_llm_prompt_tokens_per_second",
+    "Prompt tokens per second of Ollama prefills (prompt_eval_count / prompt_eval_duration)",
+    ["model"],
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("rag_trace", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("rag_span", default=None)
+
+
+class Trace:
+    """
+    Collects the spans of one request, including spans recorded in worker threads.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the spans in start order and the summed duration per stage (milliseconds).
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+        stages: Dict[str, float] = {}
+        for span in spans:
+            stages[span["stage"]] = stages.get(span["stage"], 0.0) + span["duration_ms"]
+        return {
+            "total_ms": (time.perf_counter() - self.started) * 1000,
+            "stages": stages,
+            "spans": spans,
+        }
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """
+    Starts collecting the spans of the current request.
+    """
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times a pipeline stage: the duration is observed in the stage histogram and, inside trace(),
+    added to the request's trace together with the attributes.
+    Args:
+        stage: Stage name, used as the histogram label (keep the set of names small).
+        attributes: Details of this span, e.g. the metric; not used as labels.
+    Yields:
+        The span attributes, which may be extended while the stage runs.
+    """
+    current_trace = _current_trace.get()
+    started = time.perf_counter()
+    token = _current_span.set(attributes)
+    try:
+        yield attributes
+    except Exception as e:
+        attributes["error"] = str(e)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # A generator holding the span across yields can be resumed in a copied context
+            # (e.g. each step of a streamed response runs in the threadpool) and closed there
+            pass
+        STAGE_DURATION.labels(stage).observe(duration)
+        if current_trace is not None:
+            current_trace.add({
+                "stage": stage,
+                "start_ms": (started - current_trace.started) * 1000,
+                "duration_ms": duration * 1000,
+                "thread": threading.current_thread().name,
+                **attributes,
+            })
+
+
+def annotate(**attributes: Any) -> None:
+    """
+    Adds attributes to the innermost active span, if any.
+    """
+    attrs = _current_span.get()
+    if attrs is not None:
+        attrs.update(attributes)
+
+
+def record_llm_usage(model: str, response: Dict[str, Any]) -> None:
+    """
+    Records the token counts and timings Ollama reports in the final chat response
+    (prompt_eval_count/-duration, eval_count/-duration) and adds them to the current span.
+    """
+    prompt_tokens = response.get("prompt_eval_count") or 0
+    completion_tokens = response.get("eval_count") or 0
+    prompt_duration = (response.get("prompt_eval_duration") or 0) / 1e9
+    eval_duration = (response.get("eval_duration") or 0) / 1e9
+    LLM_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(model, "completion").inc(completion_tokens)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "prompt_eval_ms": prompt_duration * 1000,
+        "eval_ms": eval_duration * 1000,
+    }
+    if completion_tokens and eval_duration:
+        usage["tokens_per_second"] = completion_tokens / eval_duration
+        LLM_GENERATION_RATE.labels(model).observe(usage["tokens_per_second"])
+    if prompt_tokens and prompt_duration:
+        LLM_PROMPT_RATE.labels(model).observe(prompt_tokens / prompt_duration)
+    if response.get("load_duration"):
+        usage["load_ms"] = response["load_duration"] / 1e6
+    annotate(**usage)
+
+
+def submit_with_context(executor: Executor, fn: Callable, *args: Any) -> Future:
+    """
+    Submits fn to an executor so that it runs with a copy of the caller's context,
+    which keeps spans of worker threads in the caller's trace.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Returns the Prometheus exposition of all metrics and its content type.
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,19 +1,111 @@
 import chromadb
 from chromadb.config import Settings
-import PyPDF2
 from typing import List, Optional, Any
-import hashlib
+import os
 import logging
+import uuid
+import functools
+import threading
+from contextlib import contextmanager
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
+from .llm import ollama_embed
+from .embedding_cache import EmbeddingCache, EMBEDDING_CACHE_DIR
+from .ingest_manifest import IngestManifest, file_content_hash
+from .pdf_text import iter_pdf_chunks
+from .lexical_index import BM25Index, reciprocal_rank_fusion
+from .telemetry import span
+
+# Number of chunks that are embedded and written together while a PDF is streamed
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+# Retrieval mode of query_collection: "vector", "lexical" (BM25) or "hybrid" (both, fused by reciprocal rank)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+# Candidates taken from each retriever per requested result before fusion
+HYBRID_CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "4"))
+
+class _ClientGate:
+    """
+    Lets any number of threads use the ChromaDB client at the same time and lets reopen wait until they are
+    done. Shared use is reentrant per thread, new users wait while the client is replaced.
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._users = 0
+        self._replacing = False
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._condition:
+                while self._replacing:
+                    self._condition.wait()
+                self._users += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._condition:
+                    self._users -= 1
+                    self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            while self._replacing:
+                self._condition.wait()
+            self._replacing = True
+            while self._users:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._replacing = False
+                self._condition.notify_all()
+
+
+def _uses_client(method):
+    """
+    Runs a connector method while the ChromaDB client cannot be replaced by reopen.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._client_gate.shared():
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class ChromaDBConnector:
     """
     A connector class for interacting with a ChromaDB vector database.
     """
-    def __init__(self, path: str, embedding_model: str = None):
+    def __init__(self, path: str, embedding_model: str = None, embedding_cache: Optional[EmbeddingCache] = None):
+        self.path = path
         self.client = chromadb.PersistentClient(path=path, settings= Settings(allow_reset=True))
+        self._client_gate = _ClientGate()
         self.embedding_model = OllamaEmbeddingFunction(url="http://localhost:11434",model_name=embedding_model)
-
+        self.embedding_model_name = embedding_model
+        # Chunk embeddings are looked up here before calling Ollama, stored next to the ChromaDB data
+        if embedding_cache is None:
+            embedding_cache = EmbeddingCache(EMBEDDING_CACHE_DIR or os.path.join(path, "embedding_cache"))
+        self.embedding_cache = embedding_cache
+        # Ingested files with content hash and chunk IDs, stored next to the ChromaDB data
+        self.manifest = IngestManifest(os.path.join(path, "ingest_manifest.json"))
+        # BM25 index over the same chunks, kept in sync by write_chunks/delete_chunks/delete_collection
+        self.lexical_index = BM25Index(os.path.join(path, "lexical_index.sqlite"))
+        self._lexical_synced = False
+        # Warm collection handle, reused across requests until the collection is deleted
+        self._collection = None
+        # Changes whenever documents are added or the collection is deleted
+        self.content_version = uuid.uuid4().hex
+
+    def _bump_content_version(self):
+        self.content_version = uuid.uuid4().hex
+
+    @_uses_client
     def add_or_create_collection(self):
         """
         Add or create a ChromaDB collection.
@@ -22,8 +114,84 @@ class ChromaDBConnector:
         Returns:
             The ChromaDB collection object
         """
-        collection = self.client.get_or_create_collection(name="docs", embedding_function= self.embedding_model)
-        return collection
+        if self._collection is None:
+            self._collection = self.client.get_or_create_collection(name="docs", embedding_function= self.embedding_model)
+        return self._collection
+
+    @_uses_client
+    def get_collection(self):
+        """
+        Returns the warm collection handle without creating the collection.
+        Args:
+            self: The ChromaDBConnector instance
+        Returns:
+            The ChromaDB collection object or None if the collection does not exist
+        """
+        if self._collection is None:
+            try:
+                self._collection = self.client.get_collection(name="docs", embedding_function= self.embedding_model)
+            except Exception:
+                return None
+        return self._collection
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds texts with the batched Ollama embedding engine.
+        Args:
+            self: The ChromaDBConnector instance
+            texts: The texts to embed
+        Returns:
+            One embedding per text, in input order
+        """
+        with span("embed", texts=len(texts)):
+            return ollama_embed(texts, model_name=self.embedding_model_name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds document chunks, reusing cached embeddings of unchanged chunk texts.
+        Args:
+            self: The ChromaDBConnector instance
+            texts: The chunk texts to embed
+        Returns:
+            One embedding per text, in input order
+        """
+        embeddings = self.embedding_cache.get_many(self.embedding_model_name, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        logging.info(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        if missing:
+            new_embeddings = self.embed([texts[i] for i in missing])
+            self.embedding_cache.put_many(self.embedding_model_name, [texts[i] for i in missing], new_embeddings)
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+        return embeddings
+
+    def close(self):
+        """
+        Drops the warm collection handle and releases the cached client resources.
+        Args:
+            self: The ChromaDBConnector instance
+        Returns:
+            None
+        """
+        self._collection = None
+        self.client.clear_system_cache()
+
+    def reopen(self):
+        """
+        Replaces the ChromaDB client, e.g. after the persist directory was modified outside of this process.
+        Waits for running client calls; the manifest, the embedding cache and the lexical index are kept.
+        Args:
+            self: The ChromaDBConnector instance
+        Returns:
+            None
+        """
+        with self._client_gate.exclusive():
+            self._collection = None
+            self.client.clear_system_cache()
+            self.client = chromadb.PersistentClient(path=self.path, settings=Settings(allow_reset=True))
+            # The collection may have been changed by another process
+            self._lexical_synced = False
+            self._bump_content_version()
 
     def add_pdf_to_collection(
             self,
@@ -34,6 +202,8 @@ class ChromaDBConnector:
     ) -> List[str]:
         """
         Add a PDF document to a ChromaDB collection by extracting text and chunking it.
+        The document identity is the hash of the file content: unchanged files are skipped,
+        changed files are upserted and chunks of their previous version are removed.
 
         Args:
             self: The ChromaDBConnector instance
@@ -43,145 +213,219 @@ class ChromaDBConnector:
             metadata: Optional metadata to attach to all chunks from this PDF
 
         Returns:
-            List of document IDs that were added to the collection
+            List of document IDs of this PDF in the collection
         """
 
-        def extract_text_from_pdf(pdf_path: str) -> str:
-            """Extract text from PDF file."""
-            text = ""
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        if page_text.strip():  # Only add non-empty pages
-                            text += f"\n--- Page {page_num + 1} ---\n"
-                            text += page_text + "\n"
-            except Exception as e:
-                raise Exception(f"Error reading PDF: {str(e)}")
-            return text.strip()
-
-        def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
-            """
-            Split text into chunks with specified size and overlap, trying to split at sentence or word boundaries.
-            Args:
-                text: The input text to split
-                chunk_size: Maximum size of each chunk (in characters)
-                overlap: Number of characters to overlap between chunks
-            Returns:
-                List of text chunks
-            """
-            # validate parameters
-            if chunk_size <= 0:
-                raise ValueError("chunk_size must be > 0")
-            if overlap < 0 or overlap >= chunk_size:
-                raise ValueError("overlap must satisfy 0 <= overlap < chunk_size")
-
-            n = len(text)
-            if n == 0:
-                return []
-            if n <= chunk_size:
-                return [text.strip()]
-
-            chunks: List[str] = []
-            start = 0
-            step = chunk_size - overlap
-
-            while start < n:
-                # preliminary end point
-                end = min(start + chunk_size, n)
-
-                # Trying to find a sentence boundary
-                if end < n:
-                    win_start = max(start, end - 200)
-                    sentence_end = max(
-                        text.rfind('.', win_start, end),
-                        text.rfind('!', win_start, end),
-                        text.rfind('?', win_start, end),
-                    )
-                    if sentence_end > start:
-                        end = sentence_end + 1
-                    else:
-                        word_end = text.rfind(' ', win_start, end)
-                        if word_end > start:
-                            end = word_end
-
-                # If no boundary found, use hard limit
-                if end <= start:
-                    end = min(start + 1, n)
-
-                chunk = text[start:end].strip()
-                if chunk:
-                    chunks.append(chunk)
-
-                if end >= n:
-                    break  # End of text reached
-
-                # Next start position
-                next_start = start + step
-                # Safety check to ensure progress
-                next_start = max(next_start, end - overlap)
-                if next_start <= start:
-                    next_start = start + 1
-                start = next_start
-
-            return chunks
-
-        # Extract text from PDF
-        pdf_text = extract_text_from_pdf(pdf_path)
-        logging.info(f"Extracted {len(pdf_text)} characters from {pdf_path}")
-
-        if not pdf_text:
+        # Identify the PDF by its content, not by its path
+        content_hash = file_content_hash(pdf_path)
+        chunking = [chunk_size, chunk_overlap]
+        existing_ids = self.reuse_ingested(pdf_path, content_hash, chunking)
+        if existing_ids is not None:
+            return existing_ids
+
+        # Extract, chunk, embed and write page by page in fixed-size batches, so memory use
+        # does not grow with the size of the PDF
+        ids: List[str] = []
+        batch: List[tuple] = []
+        try:
+            for chunk in iter_pdf_chunks(pdf_path, chunk_size, chunk_overlap):
+                batch.append(chunk)
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    ids.extend(self._write_chunk_batch(pdf_path, content_hash, chunking, batch, len(ids), metadata))
+                    batch = []
+            if batch:
+                ids.extend(self._write_chunk_batch(pdf_path, content_hash, chunking, batch, len(ids), metadata))
+        except Exception:
+            # Drop the partially written chunks unless another file still references them
+            referenced = self.manifest.referenced_chunk_ids()
+            self.delete_chunks([chunk_id for chunk_id in ids if chunk_id not in referenced])
+            raise
+
+        if not ids:
             raise ValueError("No text could be extracted from the PDF")
+        logging.info(f"Added {len(ids)} chunks from {pdf_path} to ChromaDB collection")
 
-        # Split into chunks
-        text_chunks = chunk_text(pdf_text, chunk_size, chunk_overlap)
-        logging.info(f"Split into {len(text_chunks)} chunks from {pdf_path}")
-        # Prepare documents for ChromaDB
-        documents = []
-        metadatas = []
-        ids = []
+        self.record_ingested(pdf_path, content_hash, ids, chunking)
+        return ids
 
-        # Generate a unique identifier for this PDF
-        logging.info(f"Generating unique ID for PDF: {pdf_path}")
-        pdf_hash = hashlib.md5(pdf_path.encode()).hexdigest()[:8]
-        logging.info(f"Generated PDF hash: {pdf_hash}")
-        for i, chunk in enumerate(text_chunks):
+    def _write_chunk_batch(self, pdf_path: str, content_hash: str, chunking: List[int], batch: List[tuple],
+                           start_index: int, metadata: Optional[dict] = None) -> List[str]:
+        """
+        Embeds and writes one batch of (chunk, first_page, last_page) tuples of a PDF.
+        Returns:
+            The chunk IDs of the batch
+        """
+        documents = [chunk for chunk, _, _ in batch]
+        pages = [(first_page, last_page) for _, first_page, last_page in batch]
+        ids, metadatas = self.build_chunk_records(pdf_path, content_hash, chunking, documents, metadata,
+                                                  start_index=start_index, pages=pages)
+
+        # Unchanged chunks come from the embedding cache
+        embeddings = self.embed_documents(documents)
+
+        try:
+            self.write_chunks(ids, documents, embeddings, metadatas)
+        except Exception as e:
+            raise Exception(f"Error adding documents to ChromaDB: {str(e)}")
+        return ids
+
+    def reuse_ingested(self, pdf_path: str, content_hash: str, chunking: List[int]) -> Optional[List[str]]:
+        """
+        Returns the chunk IDs of already stored content, so an unchanged file or a copy of an
+        ingested file does not need to be processed again.
+        Args:
+            self: The ChromaDBConnector instance
+            pdf_path: Path to the PDF file
+            content_hash: The sha256 of the file content
+            chunking: [chunk_size, chunk_overlap] used for the file
+        Returns:
+            The chunk IDs if the content is already stored, otherwise None
+        """
+        previous = self.manifest.get(pdf_path)
+        if previous and previous["content_hash"] == content_hash and previous.get("chunking") == chunking:
+            logging.info(f"{pdf_path} is unchanged, skipping")
+            self.manifest.set(pdf_path, content_hash, previous["chunk_ids"], chunking)
+            return previous["chunk_ids"]
+
+        # The same content may already be stored under another path
+        for other_path in self.manifest.files_with_hash(content_hash):
+            other = self.manifest.get(other_path)
+            if other_path != IngestManifest.key(pdf_path) and other.get("chunking") == chunking:
+                logging.info(f"{pdf_path} has the same content as {other_path}, reusing its chunks")
+                self.record_ingested(pdf_path, content_hash, other["chunk_ids"], chunking)
+                return other["chunk_ids"]
+        return None
+
+    def build_chunk_records(self, pdf_path: str, content_hash: str, chunking: List[int], text_chunks: List[str],
+                            metadata: Optional[dict] = None, start_index: int = 0,
+                            pages: Optional[List[tuple]] = None) -> tuple[List[str], List[dict]]:
+        """
+        Builds the chunk IDs and metadata of a PDF. The IDs contain the chunking parameters, so chunks of
+        the same content split differently never overwrite each other.
+        Args:
+            self: The ChromaDBConnector instance
+            pdf_path: Path to the PDF file
+            content_hash: The sha256 of the file content
+            chunking: [chunk_size, chunk_overlap] used to split the PDF
+            text_chunks: The text chunks of the PDF
+            metadata: Optional metadata to attach to all chunks from this PDF
+            start_index: Index of the first given chunk within the PDF
+            pages: Optional (first_page, last_page) per chunk
+        Returns:
+            A tuple of the chunk IDs and the chunk metadata
+        """
+        pdf_hash = content_hash[:16]
+        chunk_size, chunk_overlap = chunking
+        ids = []
+        metadatas = []
+        for i, chunk in enumerate(text_chunks, start=start_index):
             # Create unique ID for each chunk
-            chunk_id = f"{pdf_hash}_chunk_{i:04d}"
-            ids.append(chunk_id)
-            documents.append(chunk)
+            ids.append(f"{pdf_hash}_{chunk_size}_{chunk_overlap}_chunk_{i:04d}")
 
             # Prepare metadata
             chunk_metadata = {
                 "source": pdf_path,
                 "chunk_index": i,
-                "total_chunks": len(text_chunks),
                 "pdf_hash": pdf_hash,
+                "chunking": f"{chunk_size}/{chunk_overlap}",
                 "chunk_size": len(chunk)
             }
+            if pages is not None:
+                first_page, last_page = pages[i - start_index]
+                if first_page is not None:
+                    chunk_metadata["page_start"] = first_page
+                    chunk_metadata["page_end"] = last_page
 
             # Add custom metadata if provided
             if metadata:
                 chunk_metadata.update(metadata)
 
             metadatas.append(chunk_metadata)
+        return ids, metadatas
 
-        # Add to ChromaDB collection
-        try:
-            logging.info("Adding chunks to ChromaDB collection")
-            collection = self.client.get_or_create_collection(name="docs", embedding_function= self.embedding_model)
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            logging.info(f"Added {len(documents)} chunks to ChromaDB collection")
-            return ids
+    def record_ingested(self, pdf_path: str, content_hash: str, chunk_ids: List[str], chunking: List[int]):
+        """
+        Records an ingested PDF in the manifest and removes the chunks of its previous version
+        that no recorded file references anymore.
+        Args:
+            self: The ChromaDBConnector instance
+            pdf_path: Path to the PDF file
+            content_hash: The sha256 of the file content
+            chunk_ids: The chunk IDs of the PDF
+            chunking: [chunk_size, chunk_overlap] used for the file
+        Returns:
+            None
+        """
+        previous = self.manifest.get(pdf_path)
+        self.manifest.set(pdf_path, content_hash, chunk_ids, chunking)
+        self._delete_unreferenced(previous, pdf_path)
 
-        except Exception as e:
-            raise Exception(f"Error adding documents to ChromaDB: {str(e)}")
+    @_uses_client
+    def write_chunks(self, ids: List[str], documents: List[str], embeddings: List[List[float]], metadatas: List[dict]):
+        """
+        Upserts chunks with precomputed embeddings into the collection.
+        Args:
+            self: The ChromaDBConnector instance
+            ids: The chunk IDs
+            documents: The chunk texts
+            embeddings: One embedding per chunk
+            metadatas: One metadata dictionary per chunk
+        Returns:
+            None
+        """
+        collection = self.add_or_create_collection()
+        collection.upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+        self.lexical_index.add(ids, documents)
+        self._bump_content_version()
+
+    @_uses_client
+    def delete_chunks(self, ids: List[str]):
+        """
+        Deletes chunks from the collection.
+        Args:
+            self: The ChromaDBConnector instance
+            ids: The chunk IDs to delete
+        Returns:
+            None
+        """
+        collection = self.get_collection()
+        if collection is None or not ids:
+            return
+        collection.delete(ids=ids)
+        self.lexical_index.delete(ids)
+        self._bump_content_version()
+
+    def _delete_unreferenced(self, previous: Optional[dict], pdf_path: str):
+        """
+        Deletes the chunks of a previous file version that no recorded file references anymore.
+        """
+        if not previous:
+            return
+        referenced = self.manifest.referenced_chunk_ids()
+        stale = [chunk_id for chunk_id in previous["chunk_ids"] if chunk_id not in referenced]
+        if stale:
+            logging.info(f"Removing {len(stale)} stale chunks of {pdf_path}")
+            self.delete_chunks(stale)
+
+    def remove_pdf_from_collection(self, pdf_path: str):
+        """
+        Removes a previously ingested PDF from the collection and the manifest.
+        Chunks that are shared with another file of the same content are kept.
+        Args:
+            self: The ChromaDBConnector instance
+            pdf_path: Path of the ingested PDF file
+        Returns:
+            None
+        """
+        previous = self.manifest.remove(pdf_path)
+        self._delete_unreferenced(previous, pdf_path)
 
+    @_uses_client
     def delete_collection(self):
         """
         Delete the ChromaDB collection and clear system cache.
@@ -190,6 +434,10 @@ class ChromaDBConnector:
         Returns:
             None
         """
+        self._collection = None
+        self._bump_content_version()
+        self.manifest.clear()
+        self.lexical_index.clear()
         self.client.clear_system_cache()
         self.client.delete_collection(name = "docs")
 
@@ -197,6 +445,7 @@ class ChromaDBConnector:
             self,
             query_text: str,
             n_results: int = 5,
+            mode: Optional[str] = None,
     ) -> List[List[str]]:
         """
         Query a ChromaDB collection with text input and return relevant results as 2D array.
@@ -205,44 +454,165 @@ class ChromaDBConnector:
             self: The ChromaDBConnector instance
             query_text: The text to search for
             n_results: Number of results to return (default: 5)
+            mode: "vector", "lexical" or "hybrid" (default: RETRIEVAL_MODE)
 
 
         Returns:
             List[List[str]]: 2D array where each inner list contains [document_id, document_text]
         """
+        return self.query_collection_batch([query_text], n_results=n_results, mode=mode)[0]
 
-        try:
-            # Get a collection
-            collection = self.client.get_collection(name="docs")
-
-            # Prepare query parameters
-            query_params = {
-                "query_texts": [query_text],
-                "n_results": n_results,
-                "include": ["documents", "data"]  # Only include what we need for the 2D array
-            }
-
-            # Execute query
-            results = collection.query(**query_params)
-            logging.info(f"Query done")
-            # Format results as 2D array [document_id, document_text]
-            formatted_array = []
+    @_uses_client
+    def distances(self, query_embeddings: List[List[float]], ids: List[str]) -> List[dict]:
+        """
+        Computes the distances between query embeddings and the given chunks with the collection's metric.
+        Args:
+            self: The ChromaDBConnector instance
+            query_embeddings: The query embeddings
+            ids: The chunk IDs
+        Returns:
+            List[dict]: One {chunk_id: distance} dictionary per query embedding; chunks that do not exist
+            (any more) are left out
+        """
+        collection = self.get_collection()
+        existing = collection.get(ids=list(ids), include=[])["ids"] if collection is not None and ids else []
+        if not existing:
+            return [{} for _ in query_embeddings]
+        results = collection.query(query_embeddings=query_embeddings, ids=existing, n_results=len(existing),
+                                   include=["distances"])
+        return [dict(zip(ids_, distances)) for ids_, distances in zip(results["ids"], results["distances"])]
+
+    @_uses_client
+    def sync_lexical_index(self, collection=None):
+        """
+        Rebuilds the BM25 index from the collection if both are out of sync,
+        e.g. for a collection that was created before the index existed.
+        Args:
+            self: The ChromaDBConnector instance
+            collection: The collection handle (default: the warm collection)
+        Returns:
+            None
+        """
+        collection = collection if collection is not None else self.get_collection()
+        if collection is None:
+            return
+        if self.lexical_index.count() != collection.count():
+            logging.info("Rebuilding the lexical index from the collection")
+            self.lexical_index.clear()
+            offset = 0
+            while True:
+                page = collection.get(include=["documents"], limit=1000, offset=offset)
+                if not page["ids"]:
+                    break
+                self.lexical_index.add(page["ids"], page["documents"])
+                offset += len(page["ids"])
+        self._lexical_synced = True
+
+    @_uses_client
+    def query_collection_batch(
+            self,
+            query_texts: List[str],
+            n_results: int = 5,
+            mode: Optional[str] = None,
+            include_metadata: bool = False,
+            query_embeddings: Optional[List[List[float]]] = None,
+    ) -> List[List[List[Any]]]:
+        """
+        Query a ChromaDB collection with several texts at once. All query texts are embedded
+        in a single embedding request and searched with a single collection query.
+        In hybrid mode the dense ranking is fused with a BM25 ranking of the same chunks.
 
-            if results.get('ids') and results.get('documents'):
-                # ChromaDB returns nested lists, so we access the first (and usually only) query result
-                ids = results['ids'][0] if results['ids'] else []
-                documents = results['documents'][0] if results['documents'] else []
-                logging.info(f"Got {len(ids)} results")
-                # Ensure both lists have the same length
-                min_length = min(len(ids), len(documents))
+        Args:
+            self: The ChromaDBConnector instance
+            query_texts: The texts to search for
+            n_results: Number of results to return per query text (default: 5)
+            mode: "vector", "lexical" or "hybrid" (default: RETRIEVAL_MODE)
+            include_metadata: Append the chunk metadata to each result
+            query_embeddings: Precomputed embeddings of the query texts (default: embedded with one request)
 
-                for i in range(min_length):
-                    doc_id = ids[i]
-                    doc_text = documents[i]
-                    formatted_array.append([doc_id, doc_text])
+        Returns:
+            List[List[List[Any]]]: One 2D array per query text (same order as query_texts),
+            where each inner list contains [document_id, document_text] or
+            [document_id, document_text, metadata] with include_metadata
+        """
+        if not query_texts:
+            return []
+        mode = mode or RETRIEVAL_MODE
+        if mode not in ("vector", "lexical", "hybrid"):
+            raise ValueError(f"Unknown retrieval mode: {mode}")
 
-            return formatted_array
+        try:
+            # Get the warm collection handle
+            collection = self.get_collection()
+            if collection is None:
+                logging.warning("Collection 'docs' does not exist")
+                return [[] for _ in query_texts]
+
+            candidates = n_results if mode == "vector" else max(n_results, n_results * HYBRID_CANDIDATE_FACTOR)
+            vector_rankings = [[] for _ in query_texts]
+            lexical_rankings = [[] for _ in query_texts]
+            texts = {}
+            metadatas = {}
+            include = ["documents", "metadatas"] if include_metadata else ["documents"]
+
+            if mode != "lexical":
+                # Embed all query texts with one request
+                if query_embeddings is None:
+                    query_embeddings = self.embed(list(query_texts))
+
+                # Prepare query parameters
+                query_params = {
+                    "query_embeddings": query_embeddings,
+                    "n_results": candidates,
+                    "include": include  # Only include what we need for the 2D array
+                }
+
+                # Execute query
+                with span("vector_search", queries=len(query_texts)):
+                    results = collection.query(**query_params)
+                ids_per_query = results.get('ids') or []
+                documents_per_query = results.get('documents') or []
+                metadatas_per_query = results.get('metadatas') or []
+                for q in range(len(query_texts)):
+                    ids = ids_per_query[q] if q < len(ids_per_query) else []
+                    documents = documents_per_query[q] if q < len(documents_per_query) else []
+                    metas = metadatas_per_query[q] if q < len(metadatas_per_query) else []
+                    # Ensure both lists have the same length
+                    for i, (doc_id, doc_text) in enumerate(zip(ids, documents)):
+                        vector_rankings[q].append(doc_id)
+                        texts[doc_id] = doc_text
+                        metadatas[doc_id] = (metas[i] if i < len(metas) else None) or {}
+
+            if mode != "vector":
+                if not self._lexical_synced:
+                    self.sync_lexical_index(collection)
+                with span("lexical_search", queries=len(query_texts)):
+                    for q, query_text in enumerate(query_texts):
+                        lexical_rankings[q] = [doc_id for doc_id, _ in self.lexical_index.search(query_text, candidates)]
+
+                # Fetch the texts of chunks that only the lexical search found
+                missing = list({doc_id for ranking in lexical_rankings for doc_id in ranking if doc_id not in texts})
+                if missing:
+                    found = collection.get(ids=missing, include=include)
+                    texts.update(zip(found["ids"], found["documents"]))
+                    metadatas.update(zip(found["ids"], found.get("metadatas") or [{}] * len(found["ids"])))
+            logging.info(f"Query done for {len(query_texts)} query texts ({mode})")
+
+            # Format results as one 2D array [document_id, document_text] per query text
+            formatted = []
+            for vector_ranking, lexical_ranking in zip(vector_rankings, lexical_rankings):
+                if mode == "hybrid":
+                    ranking = reciprocal_rank_fusion([vector_ranking, lexical_ranking])
+                else:
+                    ranking = vector_ranking or lexical_ranking
+                results = [[doc_id, texts[doc_id]] for doc_id in ranking if doc_id in texts][:n_results]
+                if include_metadata:
+                    results = [[doc_id, doc_text, metadatas.get(doc_id) or {}] for doc_id, doc_text in results]
+                formatted.append(results)
+            logging.info(f"Got {sum(len(f) for f in formatted)} results")
+
+            return formatted
 
         except Exception as e:
             print(f"Error querying collection: {str(e)}")
-            return []  # Return an empty array instead of raising exception
+            return [[] for _ in query_texts]  # Return empty arrays instead of raising exception
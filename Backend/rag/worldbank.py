@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+WORLDBANK_BASE_URL = "https://api.worldbank.org/v2"
+# Kept next to this module by default, so every working directory shares one cache
+WORLDBANK_CACHE_PATH = os.getenv(
+    "WORLDBANK_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "worldbank.sqlite")
+)
+# Annual indicators rarely change, so found values are kept for 30 days by default
+WORLDBANK_CACHE_TTL = float(os.getenv("WORLDBANK_CACHE_TTL", str(30 * 24 * 3600)))
+# Indicators without a published value are retried after one day
+WORLDBANK_NEGATIVE_TTL = float(os.getenv("WORLDBANK_NEGATIVE_TTL", str(24 * 3600)))
+
+
+class WorldBankClient:
+    """
+    Fetches World Bank indicator values through a pooled HTTP session and caches them on disk
+    in a SQLite database keyed by (country, indicator, year).
+    """
+    def __init__(self, cache_path: str = WORLDBANK_CACHE_PATH, ttl: float = WORLDBANK_CACHE_TTL,
+                 negative_ttl: float = WORLDBANK_NEGATIVE_TTL, max_workers: int = 4, timeout: float = 10.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Fetches currently running per (country, indicator, year), shared by concurrent callers
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS indicators ("
+            " country TEXT NOT NULL, indicator TEXT NOT NULL, year INTEGER NOT NULL,"
+            " value REAL, found INTEGER NOT NULL, fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (country, indicator, year))"
+        )
+        self._db.commit()
+
+    def _read_cache(self, country_code: str, indicator: str, year: int):
+        """
+        Returns (hit, value) for a cached indicator, honouring the positive and negative TTL.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, found, fetched_at FROM indicators WHERE country = ? AND indicator = ? AND year = ?",
+                (country_code, indicator, year)
+            ).fetchone()
+        if row is None:
+            return False, None
+        value, found, fetched_at = row
+        ttl = self.ttl if found else self.negative_ttl
+        if time.time() - fetched_at > ttl:
+            return False, None
+        return True, value
+
+    def _write_cache(self, country_code: str, indicator: str, year: int, value: Optional[float]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO indicators (country, indicator, year, value, found, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (country_code, indicator, year, value, int(value is not None), time.time())
+            )
+            self._db.commit()
+
+    def _fetch(self, country_code: str, indicator: str, year: int) -> Optional[float]:
+        """
+        Fetches a single indicator value from the World Bank API and stores the answer in the cache.
+        Transport errors are not cached.
+        """
+        url = f'{WORLDBANK_BASE_URL}/country/{country_code}/indicator/{indicator}?format=json&per_page=1&date={year}'
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            logging.warning(f"World Bank request failed for {country_code}/{indicator}/{year}: {e}")
+            return None
+
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        value = None
+        if isinstance(data, list) and len(data) > 1 and data[1]:
+            value = data[1][0].get('value')
+        self._write_cache(country_code, indicator, year, value)
+        return value
+
+    def _fetch_shared(self, country_code: str, indicator: str, year: int) -> Optional[float]:
+        """
+        Fetches an indicator once for all concurrent callers asking for it, e.g. the tickers of the same
+        country in a batch run; the others wait for the running request instead of sending their own.
+        """
+        key = (country_code, indicator, year)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            # A fetch that finished just before this one started may already have filled the cache
+            hit, value = self._read_cache(country_code, indicator, year)
+            if not hit:
+                value = self._fetch(country_code, indicator, year)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def get_indicator_value(self, country_code: str, indicator: str, year: int) -> Optional[float]:
+        """
+        Returns a World Bank indicator value for a country and year, served from the cache if possible.
+        Args:
+            country_code (str): The 3-letter country code (ISO 3166-1 alpha-3).
+            indicator (str): The World Bank indicator code.
+            year (int): The year for which to fetch the indicator value.
+        Returns:
+            The value of the indicator or None if not found.
+        """
+        hit, value = self._read_cache(country_code, indicator, year)
+        if hit:
+            return value
+        return self._fetch_shared(country_code, indicator, year)
+
+    def get_indicator_values(self, country_code: str, indicators: Dict[str, str], year: int) -> Dict[str, Optional[float]]:
+        """
+        Returns several indicator values for a country and year. Cache misses are fetched concurrently.
+        Args:
+            country_code (str): The 3-letter country code (ISO 3166-1 alpha-3).
+            indicators (Dict[str, str]): Mapping of result key to World Bank indicator code.
+            year (int): The year for which to fetch the indicator values.
+        Returns:
+            A dictionary mapping each result key to its indicator value (or None).
+        """
+        results = {}
+        misses = {}
+        for key, code in indicators.items():
+            hit, value = self._read_cache(country_code, code, year)
+            if hit:
+                results[key] = value
+            else:
+                misses[key] = code
+
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(misses))) as executor:
+                futures = {key: executor.submit(self._fetch_shared, country_code, code, year) for key, code in misses.items()}
+                for key, future in futures.items():
+                    results[key] = future.result()
+
+        return {key: results[key] for key in indicators}
+
+
+_default_client: Optional[WorldBankClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_worldbank_client() -> WorldBankClient:
+    """
+    Returns the process-wide WorldBankClient, creating it on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = WorldBankClient()
+        return _default_client
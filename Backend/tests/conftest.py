@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.fake_ollama import FakeOllama
+
+# The rag modules read their configuration at import time, so the fake Ollama server is started
+# and the environment set before any test module imports them
+_fake_ollama = FakeOllama(generation_latency=0.0)
+os.environ["OLLAMA_BASE_URL"] = _fake_ollama.start()
+os.environ["OLLAMA_MAX_RETRIES"] = "0"
+os.environ["LLM_CACHE_BACKEND"] = "none"
+os.environ["SECTOR_ETF_CACHE_PATH"] = ""
+os.environ["SECTOR_ETF_REFRESH_INTERVAL"] = "0"
+os.environ["ANONYMIZED_TELEMETRY"] = "False"
+
+
+def pytest_unconfigure(config):
+    _fake_ollama.stop()
+
+
+@pytest.fixture
+def fake_ollama():
+    """
+    The fake Ollama server all rag modules talk to; latency and model settings are restored after the test.
+    """
+    saved = dict(vars(_fake_ollama))
+    yield _fake_ollama
+    for name in ("embed_latency", "generation_latency", "token_latency", "tokens", "models"):
+        setattr(_fake_ollama, name, saved[name])
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs the test in an empty directory, so the relative rag/.cache and rag/chroma_db paths are isolated.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import _APIServer
+from benchmarks.stubs import FakeTicker, StubWorldBankClient
+from rag import metrics, worldbank
+
+
+@pytest.fixture(scope="module")
+def base_url(tmp_path_factory):
+    """
+    Serves the app from an empty directory with the market data stand-ins and an ingested corpus.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(tmp_path_factory.mktemp("api"))
+        patch.setattr(metrics.yf, "Ticker", FakeTicker)
+        patch.setattr(worldbank, "_default_client", StubWorldBankClient())
+        build_corpus("literature", 2, pages_per_document=2)
+        with _APIServer() as url:
+            job = requests.post(f"{url}/api/ingest-folder", json={"folder_path": "literature"}).json()
+            assert _wait_for_job(url, job["job_id"])["status"] == "completed"
+            yield url
+
+
+def _wait_for_job(base_url, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = requests.get(f"{base_url}/api/jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def _run_spans(base_url):
+    body = requests.get(f"{base_url}/metrics").text
+    line = next(line for line in body.splitlines() if line.startswith('rag_stage_duration_seconds_count{stage="run"}'))
+    return float(line.split()[-1])
+
+
+def _events(response):
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_query_returns_context_and_sources(base_url):
+    response = requests.post(f"{base_url}/api/query", json={"query_text": "return on equity", "n_results": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["context"]
+    assert body["sources"]
+
+
+def test_reload_keeps_the_collection(base_url):
+    assert requests.post(f"{base_url}/api/reload").json() == {"message": "Pipeline neu geladen"}
+    response = requests.post(f"{base_url}/api/query", json={"query_text": "leverage", "n_results": 3})
+    assert response.json()["sources"]
+
+
+def test_run_is_served_from_the_result_cache(base_url):
+    before = requests.get(f"{base_url}/api/run/cache-stats").json()
+    first = requests.post(f"{base_url}/api/run", json={"ticker": "ACME", "include_timings": True}).json()
+    second = requests.post(f"{base_url}/api/run", json={"ticker": "ACME"}).json()
+
+    assert first["results"] == second["results"]
+    assert first["timings"] is not None
+    assert second["timings"] is None
+    for item in first["results"].values():
+        assert item["llm_response"]
+    stats = requests.get(f"{base_url}/api/run/cache-stats").json()
+    assert stats["hits"] == before["hits"] + 1
+
+
+def test_run_stream_emits_ndjson_events(base_url):
+    with requests.post(f"{base_url}/api/run/stream", json={"ticker": "STREAM"}, stream=True) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = _events(response)
+    kinds = [event["event"] for event in events]
+    assert kinds[-1] == "done"
+    assert "error" not in kinds
+    metrics_started = {event["metric"] for event in events if event["event"] == "metric"}
+    metrics_done = {event["metric"] for event in events if event["event"] == "metric_done"}
+    assert metrics_started and metrics_started == metrics_done
+    assert "token" in kinds
+
+
+def test_ingestion_job_reports_its_files(base_url):
+    jobs = requests.get(f"{base_url}/api/jobs").json()
+    ingestion = next(job for job in jobs if job["kind"] == "ingest-folder")
+    assert ingestion["files_done"] == 2
+    assert ingestion["chunks_written"] > 0
+    assert requests.get(f"{base_url}/api/jobs/unknown").status_code == 404
+
+
+def test_ingestion_with_a_corrupt_pdf_is_partial(base_url):
+    build_corpus("mixed", 1, pages_per_document=1)
+    with open("mixed/corrupt.pdf", "wb") as f:
+        f.write(b"not a pdf")
+
+    job = requests.post(f"{base_url}/api/ingest-folder", json={"folder_path": "mixed"}).json()
+    status = _wait_for_job(base_url, job["job_id"])
+
+    assert status["status"] == "partial"
+    assert list(status["result"]["failed"]) == [os.path.join("mixed", "corrupt.pdf")]
+    assert len(status["result"]["ingested"]) == 1
+
+
+def test_metrics_endpoint_exports_stage_durations(base_url):
+    requests.post(f"{base_url}/api/query", json={"query_text": "leverage"})
+    body = requests.get(f"{base_url}/metrics").text
+    assert "rag_stage_duration_seconds" in body
+
+
+def test_health_reports_database_and_llm(base_url):
+    response = requests.get(f"{base_url}/api/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["database"]["count"] > 0
+
+
+def test_run_batch_yields_one_result_per_ticker(base_url):
+    with requests.post(f"{base_url}/api/run-batch", json={"tickers": ["AAA", "BBB"]}, stream=True) as response:
+        events = _events(response)
+    results = {event["ticker"]: event for event in events if event["event"] == "result"}
+    assert set(results) == {"AAA", "BBB"}
+    assert events[-1] == {"event": "done", "tickers": 2, "failed": 0}
+    assert requests.post(f"{base_url}/api/run-batch", json={"tickers": []}).status_code == 422
+
+
+def test_streamed_and_batch_runs_record_a_run_span(base_url):
+    before = _run_spans(base_url)
+    with requests.post(f"{base_url}/api/run/stream", json={"ticker": "SPAN"}, stream=True) as response:
+        assert _events(response)[-1] == {"event": "done"}
+    with requests.post(f"{base_url}/api/run-batch", json={"tickers": ["SPAN"]}, stream=True) as response:
+        assert _events(response)[-1]["event"] == "done"
+    assert _run_spans(base_url) == before + 2
@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.stubs import FakeTicker
+from rag import metrics
+from rag.cache import TTLCache
+from rag.metrics import CompanyMetricsRetriever
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(maxsize=4, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=10)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["size"] == 2
+
+
+def test_ttl_cache_computes_a_missing_key_once_for_concurrent_callers():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", factory))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_ttl_cache_waiting_callers_share_the_result_without_the_cache():
+    # An entry that expires at once cannot serve the waiting callers, the shared computation has to
+    cache = TTLCache(ttl=0)
+    started = threading.Event()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", factory)))
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", factory))) for _ in range(4)]
+    for thread in waiters:
+        thread.start()
+    for thread in [leader, *waiters]:
+        thread.join()
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert cache._inflight == {}
+
+
+def test_ttl_cache_waiting_callers_get_the_error_of_the_computation():
+    cache = TTLCache(ttl=60)
+    started = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    waiters = [threading.Thread(target=call) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    for thread in [leader, *waiters]:
+        thread.join()
+    assert errors == ["upstream down"] * 4
+    assert len(calls) == 1
+    assert cache._inflight == {}
+
+
+def test_ttl_cache_does_not_store_failed_computations():
+    cache = TTLCache(ttl=60)
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", failing)
+    assert cache.get_or_compute("k", lambda: "value") == "value"
+
+
+class _CountingTicker(FakeTicker):
+    info_reads = 0
+
+    @property
+    def info(self):
+        type(self).info_reads += 1
+        return super().info
+
+
+def test_market_snapshot_is_fetched_once_per_ticker(monkeypatch):
+    monkeypatch.setattr(metrics.yf, "Ticker", _CountingTicker)
+    _CountingTicker.info_reads = 0
+    cache = TTLCache(ttl=60)
+
+    retriever = CompanyMetricsRetriever("ACME", snapshot_cache=cache)
+    retriever.get_company_info()
+    retriever.get_current_metrics()
+    # A second request for the same ticker is served from the shared snapshot cache
+    CompanyMetricsRetriever("acme", snapshot_cache=cache).get_company_info()
+    assert _CountingTicker.info_reads == 1
+
+
+def test_snapshot_fields_are_read_from_separate_tickers(monkeypatch):
+    reads = []
+
+    class RecordingTicker(FakeTicker):
+        def __getattribute__(self, name):
+            if name in ("info", "financials", "balance_sheet", "cashflow"):
+                reads.append((self, name))
+            return super().__getattribute__(name)
+
+    monkeypatch.setattr(metrics.yf, "Ticker", RecordingTicker)
+    snapshot = metrics.fetch_snapshot("ACME")
+
+    assert set(snapshot) == {"info", "financials", "balance_sheet", "cashflow"}
+    # No Ticker object is shared between the worker threads
+    assert len({id(ticker) for ticker, _ in reads}) == len(reads) == 4
@@ -0,0 +1,58 @@
+from rag import context as context_module
+from rag.context import CHARS_PER_TOKEN, assemble_context, context_budget
+
+
+def _chunk(doc_id, text, index, chunking="600/200", pdf_hash="abc"):
+    return [doc_id, text, {"pdf_hash": pdf_hash, "chunk_index": index, "chunking": chunking}]
+
+
+def test_neighbouring_chunks_are_merged_without_their_overlap():
+    context, sources = assemble_context([
+        _chunk("c1", "when the return on equity ratio rises. It is the best measure.", 1),
+        _chunk("c0", "Intro sentence here, written when the return on equity ratio rises.", 0),
+    ])
+    assert context == "Intro sentence here, written when the return on equity ratio rises. It is the best measure."
+    assert sorted(sources) == ["c0", "c1"]
+
+
+def test_chunks_of_another_chunking_are_not_neighbours():
+    context, sources = assemble_context([
+        _chunk("a1", "Return on equity compares the net income with the equity.", 1),
+        _chunk("b0", "Debt covenants restrict the leverage of the company.", 0, chunking="300/50"),
+    ])
+    # Both are kept as separate blocks instead of being merged as chunks 0 and 1 of one file
+    assert sources == ["a1", "b0"]
+    assert "Return on equity" in context and "Debt covenants" in context
+
+
+def test_near_duplicate_blocks_are_dropped():
+    text = "The price to earnings ratio relates the share price to the earnings per share of the company."
+    context, sources = assemble_context([
+        _chunk("a", text, 3, pdf_hash="first"),
+        _chunk("b", text + " Indeed.", 7, pdf_hash="second"),
+        _chunk("c", "Free cash flow is what remains after capital expenditures.", 9, pdf_hash="second"),
+    ])
+    assert sources == ["a", "c"]
+    assert context.count("price to earnings") == 1
+
+
+def test_context_stays_within_the_token_budget_in_rank_order():
+    sentence = "Leverage raises the return on equity but also the risk. "
+    results = [_chunk(f"c{i}", f"Block {i}. " + sentence * 20, i * 10, pdf_hash=f"pdf{i}") for i in range(5)]
+    context, sources = assemble_context(results, token_budget=300)
+    assert len(context) <= 300 * CHARS_PER_TOKEN
+    assert sources == [f"c{i}" for i in range(len(sources))]
+    # The last block is cut at a sentence
+    assert context.endswith(".")
+
+
+def test_results_without_chunk_metadata_are_kept_as_they_are():
+    context, sources = assemble_context([["x", "Plain text without metadata."]])
+    assert (context, sources) == ("Plain text without metadata.", ["x"])
+
+
+def test_context_budget_per_model(monkeypatch):
+    monkeypatch.setattr(context_module, "_MODEL_BUDGETS", {"llama3": 800, "mistral:7b": 2000})
+    assert context_budget("llama3:latest") == 800
+    assert context_budget("mistral:7b") == 2000
+    assert context_budget("phi3") == context_module.CONTEXT_TOKEN_BUDGET
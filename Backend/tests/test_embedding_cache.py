@@ -0,0 +1,25 @@
+from rag.embedding_cache import EmbeddingCache
+from rag.vectordb import ChromaDBConnector
+
+
+def test_embedding_cache_round_trip_and_persistence(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many("model-a", ["first", "second"], [[1.0, 2.0], [3.0, 4.0]])
+    assert cache.get_many("model-a", ["second", "unknown", "first"]) == [[3.0, 4.0], None, [1.0, 2.0]]
+    # Embeddings of another model are kept apart
+    assert cache.get_many("model-b", ["first"]) == [None]
+
+    cache.put_many("model-a", ["first", "third"], [[9.0, 9.0], [5.0, 6.0]])
+    reopened = EmbeddingCache(str(tmp_path))
+    # A cached text keeps its first embedding
+    assert reopened.get_many("model-a", ["first", "third"]) == [[1.0, 2.0], [5.0, 6.0]]
+
+
+def test_connector_keeps_the_cache_next_to_its_database(workdir):
+    connector = ChromaDBConnector(path=str(workdir / "db"), embedding_model="mxbai-embed-large:latest")
+    try:
+        assert connector.embedding_cache.directory == str(workdir / "db" / "embedding_cache")
+        connector.embed_documents(["Return on equity measures profitability."])
+        assert not (workdir / "rag").exists()
+    finally:
+        connector.close()
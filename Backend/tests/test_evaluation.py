@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+
+import pytest
+
+import rag
+from rag import llm, vectordb
+
+# The evaluation script imports the backend as the Backend package; it gets the rag modules the other tests
+# use, a second copy would register the metrics twice
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+sys.modules.setdefault("Backend.rag", rag)
+sys.modules.setdefault("Backend.rag.llm", llm)
+sys.modules.setdefault("Backend.rag.vectordb", vectordb)
+
+from Evaluation import evaluation  # noqa: E402
+
+_QUESTIONS = ["Is depreciation the loss of value of fixed assets?", "Is net income money?"]
+
+
+@pytest.fixture
+def evaluator(workdir, monkeypatch):
+    calls = []
+
+    def fake_call_llm(prompt, model_name, temperature, use_cache):
+        calls.append((model_name, temperature))
+        return "Verdict: For"
+
+    monkeypatch.setattr(evaluation, "call_llm", fake_call_llm)
+    with open("questions.csv", "w", encoding="utf-8") as f:
+        f.write("Nummer;question;answer\n")
+        f.writelines(f"{i};{question};-\n" for i, question in enumerate(_QUESTIONS, start=1))
+
+    instance = evaluation.Evaluation(persist_directory=str(workdir / "chroma_db"))
+    instance.csv_path = "questions.csv"
+    monkeypatch.setattr(instance, "query_batch", lambda questions, n_results, mode: ["context"] * len(questions))
+    instance.calls = calls
+    yield instance
+    instance.db_connector.close()
+
+
+def _checkpoint(out_dir):
+    with open(os.path.join(out_dir, evaluation.CHECKPOINT_FILE), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_resume_skips_answers_of_the_same_configuration(evaluator):
+    evaluator.evaluate(models=["m"], out_dir="Results", repeats=2, concurrency=1)
+    assert len(evaluator.calls) == 2 * 2 * len(_QUESTIONS)
+
+    evaluator.evaluate(models=["m"], out_dir="Results", repeats=2, concurrency=1)
+    assert len(evaluator.calls) == 2 * 2 * len(_QUESTIONS)
+
+
+def test_resume_ignores_answers_of_another_configuration(evaluator):
+    evaluator.evaluate(models=["m"], temperature=0.0, out_dir="Results", repeats=1, concurrency=1)
+    evaluator.evaluate(models=["m"], temperature=0.7, out_dir="Results", repeats=1, concurrency=1)
+    evaluator.evaluate(models=["m"], temperature=0.7, n_results=10, out_dir="Results", repeats=1, concurrency=1)
+
+    # Every configuration answered all questions once
+    assert len(evaluator.calls) == 3 * 2 * len(_QUESTIONS)
+    records = _checkpoint("Results")
+    assert len({record["config"] for record in records}) == 3
+
+
+def test_result_csvs_only_contain_the_current_configuration(evaluator):
+    evaluator.evaluate(models=["m"], temperature=0.0, out_dir="Results", repeats=1, concurrency=1)
+    evaluator.evaluate(models=["m"], temperature=0.7, out_dir="Results", repeats=1, concurrency=1)
+
+    csv_files = [name for _, _, files in os.walk("Results") for name in files if name.endswith(".csv")]
+    assert csv_files
+    for root, _, files in os.walk("Results"):
+        for name in files:
+            if name.endswith(".csv"):
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    # Header plus one row per question, not one per configuration
+                    assert len(f.read().strip().splitlines()) == len(_QUESTIONS) + 1
+
+
+def test_config_hash_covers_the_answer_settings(evaluator):
+    base = evaluator.config_hash(0.0, 5, "vector")
+    assert evaluator.config_hash(0.0, 5, "vector") == base
+    assert evaluator.config_hash(0.5, 5, "vector") != base
+    assert evaluator.config_hash(0.0, 3, "vector") != base
+    assert evaluator.config_hash(0.0, 5, "hybrid") != base
+    # The default mode is the configured RETRIEVAL_MODE
+    assert evaluator.config_hash(0.0, 5, None) == evaluator.config_hash(0.0, 5, evaluation.RETRIEVAL_MODE)
+
+
+def test_config_hash_covers_the_corpus_and_database(evaluator, workdir):
+    base = evaluator.config_hash(0.0, 5, "vector")
+    connector = evaluator.db_connector
+    documents = ["Depreciation spreads the cost of fixed assets."]
+    connector.write_chunks(["abc_600_200_chunk_0000"], documents, connector.embed(documents),
+                           [{"source": "a.pdf", "chunking": "600/200"}])
+    with_document = evaluator.config_hash(0.0, 5, "vector")
+    assert with_document != base
+
+    # Same text split with other chunking parameters
+    connector.delete_chunks(["abc_600_200_chunk_0000"])
+    connector.write_chunks(["abc_400_100_chunk_0000"], documents, connector.embed(documents),
+                           [{"source": "a.pdf", "chunking": "400/100"}])
+    assert evaluator.config_hash(0.0, 5, "vector") not in (base, with_document)
+
+    other = evaluation.Evaluation(persist_directory=str(workdir / "other_db"))
+    try:
+        assert other.config_hash(0.0, 5, "vector") != base
+    finally:
+        other.db_connector.close()
@@ -0,0 +1,135 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from rag import health
+from rag.health import HealthChecker, probe_database, probe_ollama
+
+
+class _SilentServer:
+    """
+    Accepts TCP connections and never answers, like an Ollama that hangs; counts the connection attempts.
+    """
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.connections = []
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(conn)
+
+    def close(self):
+        self.sock.close()
+        for conn in self.connections:
+            conn.close()
+
+
+@pytest.fixture
+def silent_server():
+    server = _SilentServer()
+    yield server
+    server.close()
+
+
+def test_probe_ollama_reports_model_availability(fake_ollama):
+    fake_ollama.models = ["llama3:latest"]
+    result = probe_ollama("llama3", "mxbai-embed-large")
+    assert result["reachable"] is True
+    assert result["status"] == "degraded"
+    assert result["models"] == {"llama3": True, "mxbai-embed-large": False}
+
+
+def test_probe_ollama_stays_within_budget_against_hanging_host(silent_server, monkeypatch):
+    monkeypatch.setattr(health, "OLLAMA_BASE_URL", silent_server.url)
+    started = time.perf_counter()
+    result = probe_ollama("llama3", "mxbai-embed-large", timeout=0.5)
+    elapsed = time.perf_counter() - started
+
+    assert result["status"] == "unreachable"
+    assert result["reachable"] is False
+    assert elapsed < 1.0
+    # One request, no retries
+    assert len(silent_server.connections) == 1
+
+
+def test_probe_ollama_fails_fast_on_refused_port(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setattr(health, "OLLAMA_BASE_URL", f"http://127.0.0.1:{port}")
+    started = time.perf_counter()
+    result = probe_ollama("llama3", "mxbai-embed-large", timeout=0.5)
+    assert result["status"] == "unreachable"
+    assert time.perf_counter() - started < 0.5
+
+
+class _Connector:
+    def __init__(self, count=None, error=None):
+        self.count = count
+        self.error = error
+        self.calls = 0
+
+    def get_collection(self):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        if self.count is None:
+            return None
+        connector = self
+
+        class Collection:
+            def count(self):
+                return connector.count
+
+        return Collection()
+
+
+@pytest.mark.parametrize("connector, status", [
+    (_Connector(count=12), "ok"),
+    (_Connector(count=0), "empty"),
+    (_Connector(), "missing"),
+    (_Connector(error="disk gone"), "error"),
+])
+def test_probe_database_status(connector, status):
+    assert probe_database(connector)["status"] == status
+
+
+def test_health_checker_caches_report(fake_ollama):
+    connector = _Connector(count=3)
+    checker = HealthChecker(lambda: connector, llm_model="llama3", embedding_model="mxbai-embed-large", ttl=60)
+    try:
+        first = checker.check()
+        second = checker.check()
+        assert first["status"] == "ok"
+        assert (first["cached"], second["cached"]) == (False, True)
+        assert connector.calls == 1
+
+        checker.invalidate()
+        assert checker.check()["cached"] is False
+        assert connector.calls == 2
+    finally:
+        checker.close()
+
+
+def test_health_checker_reports_error_when_ollama_unreachable(silent_server, monkeypatch):
+    monkeypatch.setattr(health, "OLLAMA_BASE_URL", silent_server.url)
+    checker = HealthChecker(lambda: _Connector(count=3), llm_model="llama3", embedding_model="mxbai-embed-large",
+                            probe_timeout=0.3)
+    try:
+        assert checker.check()["status"] == "error"
+    finally:
+        checker.close()
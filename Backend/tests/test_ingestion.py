@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from benchmarks.corpus import build_corpus
+from rag.ingestion import IngestionPipeline
+from rag.vectordb import ChromaDBConnector
+
+
+@pytest.fixture
+def connector(workdir):
+    db = ChromaDBConnector(path="rag/chroma_db", embedding_model="mxbai-embed-large:latest")
+    yield db
+    db.close()
+
+
+def _stored(connector):
+    collection = connector.get_collection()
+    result = collection.get(include=["documents"])
+    return dict(zip(result["ids"], result["documents"]))
+
+
+def test_folder_ingestion_matches_single_file_ingestion(connector, workdir):
+    paths = build_corpus("literature", 3, pages_per_document=3)
+    events = []
+    report = IngestionPipeline(connector, extract_workers=2, write_batch_size=5,
+                               progress_callback=events.append).ingest(paths)
+
+    assert sorted(report["ingested"]) == sorted(paths)
+    assert not report["failed"]
+    stored = _stored(connector)
+    assert len(stored) == report["chunks"]
+    assert {event["status"] for event in events} >= {"extracted", "writing", "written"}
+
+    reference = ChromaDBConnector(path="reference_db", embedding_model="mxbai-embed-large:latest")
+    try:
+        ids = [chunk_id for path in paths for chunk_id in reference.add_pdf_to_collection(path)]
+        assert sorted(ids) == sorted(stored)
+        assert _stored(reference) == stored
+    finally:
+        reference.close()
+
+
+def test_batches_are_written_while_a_large_pdf_is_still_extracted(connector, fake_ollama):
+    # About 50 batches of 4 chunks: with every queue bounded to 2 entries the extraction has to wait for the writer
+    fake_ollama.embed_latency = 0.01
+    (path,) = build_corpus("literature", 1, pages_per_document=30)
+    events = []
+    report = IngestionPipeline(connector, extract_workers=1, queue_size=2, write_batch_size=4,
+                               progress_callback=events.append).ingest([path])
+
+    statuses = [event["status"] for event in events]
+    assert report["ingested"] == [path]
+    assert statuses.count("writing") > 10
+    # The old implementation chunked the whole file before the first write
+    assert statuses.index("writing") < statuses.index("extracted")
+    assert len(connector.manifest.get(path)["chunk_ids"]) == report["chunks"]
+
+
+def test_unchanged_file_is_skipped_without_extraction(connector):
+    paths = build_corpus("literature", 1)
+    IngestionPipeline(connector, extract_workers=1).ingest(paths)
+    events = []
+    report = IngestionPipeline(connector, extract_workers=1, progress_callback=events.append).ingest(paths)
+    assert report["skipped"] == paths
+    assert [event["status"] for event in events] == ["skipped"]
+
+
+def test_failing_file_does_not_stop_the_others(connector, workdir):
+    paths = build_corpus("literature", 2)
+    broken = os.path.join("literature", "broken.pdf")
+    with open(broken, "wb") as f:
+        f.write(b"not a pdf")
+    report = IngestionPipeline(connector, extract_workers=2).ingest(paths + [broken])
+    assert sorted(report["ingested"]) == sorted(paths)
+    assert list(report["failed"]) == [broken]
+
+
+def test_cancel_removes_partially_written_file(connector, fake_ollama):
+    fake_ollama.embed_latency = 0.01
+    (path,) = build_corpus("literature", 1, pages_per_document=30)
+    events = []
+
+    def should_stop():
+        return any(event["status"] == "writing" for event in events)
+
+    report = IngestionPipeline(connector, extract_workers=1, queue_size=2, write_batch_size=4,
+                               progress_callback=events.append).ingest([path], should_stop=should_stop)
+
+    assert report["cancelled"] == [path]
+    assert report["ingested"] == []
+    assert connector.manifest.get(path) is None
+    assert _stored(connector) == {}
+
+
+def test_other_chunking_of_the_same_content_gets_its_own_chunks(connector, workdir):
+    (path,) = build_corpus("literature", 1, pages_per_document=3)
+    copy = os.path.join("literature", "copy.pdf")
+    with open(path, "rb") as src, open(copy, "wb") as dst:
+        dst.write(src.read())
+
+    IngestionPipeline(connector, extract_workers=1).ingest([path], chunk_size=600, chunk_overlap=200)
+    IngestionPipeline(connector, extract_workers=1).ingest([copy], chunk_size=300, chunk_overlap=50)
+
+    default_ids = connector.manifest.get(path)["chunk_ids"]
+    small_ids = connector.manifest.get(copy)["chunk_ids"]
+    assert not set(default_ids) & set(small_ids)
+    assert all("_600_200_chunk_" in chunk_id for chunk_id in default_ids)
+    # Both chunkings are stored completely, none overwrote the other
+    assert set(_stored(connector)) == set(default_ids) | set(small_ids)
+
+
+def test_rechunking_a_file_replaces_its_chunks(connector):
+    (path,) = build_corpus("literature", 1, pages_per_document=3)
+    IngestionPipeline(connector, extract_workers=1).ingest([path], chunk_size=600, chunk_overlap=200)
+    report = IngestionPipeline(connector, extract_workers=1).ingest([path], chunk_size=300, chunk_overlap=50)
+
+    assert report["ingested"] == [path]
+    assert set(_stored(connector)) == set(connector.manifest.get(path)["chunk_ids"])
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+
+from rag.jobs import CANCELLED, COMPLETED, FAILED, PARTIAL, QUEUED, JobManager
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager()
+    yield manager
+    manager.shutdown()
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.status
+
+
+def _cancelled_while_running(manager, result):
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        job.cancel_event.wait(5)
+        return result
+
+    job = manager.submit("ingest-folder", "literature", work)
+    started.wait(5)
+    manager.cancel(job.id)
+    return job
+
+
+def test_completed_job_reports_progress(manager):
+    def work(job):
+        job.on_progress({"file": "a.pdf", "status": "written", "chunks": 4})
+        job.on_progress({"file": "b.pdf", "status": "skipped"})
+        job.on_progress({"file": "c.pdf", "status": "failed", "error": "broken"})
+        return {"ingested": ["a.pdf"]}
+
+    job = manager.submit("ingest-folder", "literature", work)
+    assert _wait(job) == COMPLETED
+    status = job.to_dict()
+    assert status["result"] == {"ingested": ["a.pdf"]}
+    assert status["files_done"] == 3
+    assert status["chunks_written"] == 4
+    assert status["errors"] == {"c.pdf": "broken"}
+
+
+def test_cancel_that_stopped_files_reports_cancelled(manager):
+    job = _cancelled_while_running(manager, {"ingested": [], "cancelled": ["a.pdf"]})
+    assert _wait(job) == CANCELLED
+
+
+def test_cancelled_files_count_as_done(manager):
+    def work(job):
+        job.on_progress({"file": "a.pdf", "status": "written", "chunks": 2})
+        job.on_progress({"file": "b.pdf", "status": "cancelled"})
+        job.cancel_event.set()
+        return {"ingested": ["a.pdf"], "cancelled": ["b.pdf"]}
+
+    job = manager.submit("ingest-folder", "literature", work)
+    assert _wait(job) == CANCELLED
+    assert job.to_dict()["files_done"] == 2
+
+
+def test_cancel_after_the_last_file_reports_completed(manager):
+    # Everything was written before the cancel request took effect
+    job = _cancelled_while_running(manager, {"ingested": ["a.pdf"], "cancelled": []})
+    assert _wait(job) == COMPLETED
+
+
+def test_cancelled_queued_job_never_runs(manager):
+    release = threading.Event()
+    ran = []
+    first = manager.submit("ingest-folder", "first", lambda job: {"ingested": [job.target]} if release.wait(5) else None)
+    second = manager.submit("add-document", "second", lambda job: ran.append(job))
+    assert second.status == QUEUED
+    assert manager.has_active()
+
+    manager.cancel(second.id)
+    release.set()
+    assert _wait(first) == COMPLETED
+    assert _wait(second) == CANCELLED
+    assert ran == []
+    assert not manager.has_active()
+
+
+def test_shutdown_cancels_queued_jobs():
+    manager = JobManager()
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        job.cancel_event.wait(5)
+
+    first = manager.submit("ingest-folder", "first", work)
+    second = manager.submit("add-document", "second", lambda job: None)
+    started.wait(5)
+
+    manager.shutdown()
+    assert first.status == COMPLETED
+    assert second.status == CANCELLED
+    assert second.finished_at is not None
+    assert not manager.has_active()
+
+
+def test_failed_files_mark_the_job_partial_or_failed(manager):
+    partial = manager.submit("ingest-folder", "literature",
+                             lambda job: {"ingested": ["a.pdf"], "skipped": [], "failed": {"b.pdf": "broken"}})
+    assert _wait(partial) == PARTIAL
+    assert partial.error == "1 file(s) failed to ingest"
+
+    failed = manager.submit("ingest-folder", "literature",
+                            lambda job: {"ingested": [], "skipped": [], "failed": {"b.pdf": "broken"}})
+    assert _wait(failed) == FAILED
+
+
+def test_failing_job_records_the_error(manager):
+    def work(job):
+        raise RuntimeError("disk full")
+
+    job = manager.submit("add-document", "a.pdf", work)
+    assert _wait(job) == FAILED
+    assert job.to_dict()["error"] == "disk full"
+
+
+def test_finished_jobs_are_forgotten_beyond_max_jobs():
+    manager = JobManager(max_jobs=2)
+    try:
+        jobs = [manager.submit("add-document", str(i), lambda job: None) for i in range(3)]
+        for job in jobs:
+            _wait(job)
+        manager.submit("add-document", "3", lambda job: None)
+        assert manager.get(jobs[0].id) is None
+        assert len(manager.list()) == 2
+    finally:
+        manager.shutdown()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rag import llm
+from rag.http_client import aclose_async_client
+from rag.llm import acall_llm, acheck_ollama_connection, aget_available_models, astream_llm, call_llm, get_available_models
+
+
+@pytest.fixture
+def busy_backend():
+    # Every generation slot of the backend is taken by other requests
+    slots = llm._get_generation_slots(llm.OLLAMA_BASE_URL)
+    for _ in range(llm.OLLAMA_MAX_PARALLEL):
+        slots.acquire()
+    yield slots
+    for _ in range(llm.OLLAMA_MAX_PARALLEL):
+        slots.release()
+
+
+def _run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await aclose_async_client()
+    return asyncio.run(main())
+
+
+async def _collect(fragments):
+    return [fragment async for fragment in fragments]
+
+
+def test_waiting_for_a_slot_is_bounded_by_the_timeout(busy_backend):
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError) as error:
+        call_llm("prompt", timeout=0.3, use_cache=False)
+    assert time.perf_counter() - started < 1.0
+    assert str(error.value) == "Ollama LLM-Aufruf fehlgeschlagen: Read timed out. (read timeout=0.3)"
+
+
+def test_slot_timeout_reads_like_a_response_timeout(fake_ollama):
+    fake_ollama.generation_latency = 1.0
+    with pytest.raises(RuntimeError) as error:
+        call_llm("prompt", timeout=0.3, use_cache=False)
+    message = str(error.value)
+    assert message.startswith("Ollama LLM-Aufruf fehlgeschlagen:")
+    assert "Read timed out. (read timeout=" in message
+
+
+def test_time_spent_waiting_for_a_slot_is_taken_from_the_budget(busy_backend, fake_ollama):
+    fake_ollama.generation_latency = 0.4
+    # The slot becomes free after 0.3s, the remaining 0.2s are too short for the 0.4s response
+    threading.Timer(0.3, busy_backend.release).start()
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        call_llm("prompt", timeout=0.5, use_cache=False)
+    assert time.perf_counter() - started < 0.7
+    busy_backend.acquire()
+
+
+def test_async_calls_match_the_sync_call():
+    expected = call_llm("Explain the return on equity", use_cache=False)
+    assert _run(acall_llm("Explain the return on equity", use_cache=False)) == expected
+    fragments = _run(_collect(astream_llm("Explain the return on equity")))
+    assert len(fragments) > 1
+    assert "".join(fragments).strip() == expected
+
+
+def test_async_slot_wait_is_bounded_and_does_not_block_the_loop(busy_backend):
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            with pytest.raises(RuntimeError) as error:
+                await acall_llm("prompt", timeout=0.3, use_cache=False)
+        finally:
+            ticker.cancel()
+        return ticks, str(error.value)
+
+    ticks, message = _run(main())
+    # The threaded callers hold every slot, the async call waits for the same ones
+    assert message == "Ollama LLM-Aufruf fehlgeschlagen: Read timed out. (read timeout=0.3)"
+    assert ticks > 10
+
+
+def test_cancelled_async_wait_hands_back_a_late_slot(busy_backend):
+    async def main():
+        waiting = asyncio.create_task(acall_llm("prompt", timeout=5, use_cache=False))
+        await asyncio.sleep(0.1)
+        waiting.cancel()
+        # The slot freed after the cancellation is taken by the waiting thread and has to come back
+        busy_backend.release()
+        await asyncio.sleep(0.2)
+
+    _run(main())
+    assert busy_backend.acquire(timeout=0)
+
+
+def test_async_model_listing_matches_the_sync_one():
+    assert _run(acheck_ollama_connection()) is True
+    assert _run(aget_available_models()) == get_available_models()
+
@@ -0,0 +1,83 @@
+import pytest
+
+from rag import llm
+from rag.llm import MemoryResponseCache, ResponseCache, SQLiteResponseCache, call_llm
+
+_PROMPT = "What is the return on equity?"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryResponseCache(max_bytes=20)
+    return SQLiteResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=20)
+
+
+@pytest.fixture
+def installed_cache(monkeypatch):
+    cache = MemoryResponseCache()
+    monkeypatch.setattr(llm, "_response_cache", cache)
+    return cache
+
+
+def _key(prompt=_PROMPT):
+    return llm._response_cache_key("llama3", prompt, {"temperature": 0.01, "num_predict": 512})
+
+
+def test_response_cache_is_abstract():
+    with pytest.raises(TypeError):
+        ResponseCache()
+
+    class Incomplete(ResponseCache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_cache_get_set_and_clear(cache):
+    assert cache.get("a") is None
+    cache.set("a", "first")
+    cache.set("a", "second")
+    assert cache.get("a") == "second"
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_cache_evicts_least_recently_used_above_max_bytes(cache):
+    cache.set("a", "x" * 8)
+    cache.set("b", "y" * 8)
+    assert cache.get("a") == "x" * 8
+    # 24 bytes do not fit into 20: "b" was used least recently
+    cache.set("c", "z" * 8)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 8
+    assert cache.get("c") == "z" * 8
+
+
+def test_sqlite_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    SQLiteResponseCache(path).set("a", "answer")
+    assert SQLiteResponseCache(path).get("a") == "answer"
+
+
+def test_call_llm_serves_cached_response(installed_cache):
+    installed_cache.set(_key(), "cached answer")
+    assert call_llm(_PROMPT) == "cached answer"
+    # use_cache=False generates a new answer and leaves the cache alone
+    assert call_llm(_PROMPT, use_cache=False) != "cached answer"
+    assert installed_cache.get(_key()) == "cached answer"
+
+
+def test_call_llm_stores_generated_response(installed_cache):
+    answer = call_llm(_PROMPT)
+    assert installed_cache.get(_key()) == answer
+
+
+def test_cache_bypass_regenerates_and_refreshes_the_entry(installed_cache, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_CACHE_BYPASS", True)
+    installed_cache.set(_key(), "stale answer")
+    answer = call_llm(_PROMPT)
+    assert answer != "stale answer"
+    assert installed_cache.get(_key()) == answer
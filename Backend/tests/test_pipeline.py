@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.stubs import FakeTicker, StubWorldBankClient
+from rag import metrics, worldbank
+from rag import pipeline as pipeline_module
+from rag.http_client import aclose_async_client
+from rag.pipeline import RAGPipeline
+
+
+@pytest.fixture
+def pipeline(workdir, monkeypatch):
+    monkeypatch.setattr(metrics.yf, "Ticker", FakeTicker)
+    monkeypatch.setattr(worldbank, "_default_client", StubWorldBankClient())
+    pipeline = RAGPipeline(llm_concurrency=4, retrieval_mode="vector")
+    connector = pipeline.db_connector
+    documents = ["Return on equity measures profitability.", "Debt covenants limit leverage."]
+    connector.write_chunks(["a", "b"], documents, connector.embed(documents), [{"source": "test"}] * 2)
+    yield pipeline
+    pipeline.close()
+
+
+def test_prompts_are_generated_concurrently(pipeline, fake_ollama):
+    fake_ollama.generation_latency = 0.2
+    prompts = {f"metric_{i}": f"Prompt {i}" for i in range(8)}
+
+    started = time.perf_counter()
+    responses, failed = pipeline._generate(prompts)
+    elapsed = time.perf_counter() - started
+
+    assert set(responses) == set(prompts) and not failed
+    # Eight generations on four slots take two rounds, not eight
+    assert elapsed < 8 * 0.2 / 2
+
+
+def test_timed_out_metric_is_reported_and_the_run_not_cached(pipeline, fake_ollama):
+    pipeline.llm_timeout = 0.1
+    fake_ollama.generation_latency = 0.5
+
+    results = pipeline.run("ACME")
+
+    assert results and all(item["llm_response"].startswith("Keine LLM-Antwort") for item in results.values())
+    assert pipeline.cache_stats()["size"] == 0
+
+
+def test_metric_queries_are_embedded_in_one_request(pipeline, monkeypatch):
+    connector = pipeline.db_connector
+    calls = []
+    embed = connector.embed
+
+    def spy(texts):
+        calls.append(list(texts))
+        return embed(texts)
+
+    monkeypatch.setattr(connector, "embed", spy)
+    metric_names = ["eps_direct", "roe_direct", "debt_to_equity_direct"]
+    contexts = pipeline.retrieve_metrics(metric_names)
+
+    assert len(contexts) == len(metric_names)
+    assert len(calls) == 1
+
+
+def test_run_stream_generates_with_the_async_client(pipeline, monkeypatch):
+    warmups = []
+    acall_llm = pipeline_module.acall_llm
+
+    async def spy(prompt, *args, **kwargs):
+        warmups.append(kwargs)
+        return await acall_llm(prompt, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline_module, "LLM_PREFIX_WARMUP", True)
+    monkeypatch.setattr(pipeline_module, "acall_llm", spy)
+
+    async def collect():
+        try:
+            return [event async for event in pipeline.run_stream("ACME")]
+        finally:
+            await aclose_async_client()
+
+    events = asyncio.run(collect())
+
+    assert events[-1] == {"event": "done"}
+    done = [event for event in events if event["event"] == "metric_done"]
+    assert done and all(event["llm_response"] for event in done)
+    assert [warmup["max_tokens"] for warmup in warmups] == [1]
+    # A complete run is cached like a run of /api/run
+    assert pipeline.cache_stats()["size"] == 1
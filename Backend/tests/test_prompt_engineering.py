@@ -0,0 +1,110 @@
+import json
+import textwrap
+from typing import Any, Dict, Optional
+
+import pytest
+
+from rag import prompt_engineering
+from rag.prompt_engineering import build_metric_analysis_prompt, build_shared_prefix
+
+
+# Verbatim copy of build_metric_analysis_prompt before the template was moved into a module constant
+def _baseline_prompt(
+    ticker: str,
+    metric: str,
+    value: Optional[float],
+    historical_metrics: Dict[str, Any],
+    peer_metrics: Dict[str, Any],
+    macro_info: Dict[str, Any],
+    company_info: Dict[str, Any],
+    literature_context: Optional[str] = None
+) -> str:
+    payload = {
+        "ticker": ticker,
+        "metric": metric,
+        "value": value,  # may be None
+        "historical_metrics": historical_metrics or {},
+        "peer_metrics": peer_metrics or {},
+        "macro_info": macro_info or {},
+        "company_info": company_info or {},
+        "literature_context": literature_context or "",
+    }
+
+    data_json = json.dumps(payload, ensure_ascii=False, sort_keys=True, indent=2, default=str)
+
+    prompt = f"""
+    You are an equity analyst. Your sole task is to interpret a single fundamental metric for one company in plain English for a general audience. Do not predict whether the stock will go up or down. Do not give investment advice. Do not provide forward-looking statements or guidance.
+
+    ### Task
+    - Explain what the metric is and what it measures.
+    - Interpret the provided current value (if present) in simple terms.
+    - Use the historical data to describe trend or stability, if available.
+    - Use peer/industry context only to help a layperson understand whether the level is typical or unusual.
+    - Briefly mention any macro or company-specific context that meaningfully affects interpretation of this metric.
+    - State limitations and what this metric does NOT tell us.
+    - Keep the tone neutral, factual, and educational.
+
+    ### Rules (must-follow)
+    1) **No predictions** (no “will rise/fall”, no target prices, no timing).
+    2) **No advice** (no “buy/sell/hold”, no allocation or suitability statements).
+    3) **No fabrication**: Use ONLY the data provided below; if something is missing, say “not provided”.
+    4) **Jargon**: Avoid it; if used, define it in one short clause.
+    5) **Comparisons**: When comparing, prefer “relative to its own history” and “relative to peers in the same industry”, if that data is provided.
+    6) **Numbers**: Quote exact numbers from the input; do not invent benchmarks.
+
+    ### Input Data (JSON)
+    {data_json}
+
+    ### Output format (use these exact section headings)
+    1) Plain-English summary (2–3 sentences)
+    2) What this metric measures
+    3) Interpretation of the current value
+    4) Historical context (trend, variability)
+    5) Peer/industry comparison
+    6) Context that may affect interpretation (macro & company specifics)
+    7) Limitations & caveats of this metric
+    8) One-sentence takeaway (layman-friendly)
+
+    Write the answer in English. Do not include this instruction block in your reply.
+    """.strip()
+
+    return textwrap.dedent(prompt)
+
+
+_INPUTS = dict(
+    ticker="AAPL",
+    historical_metrics={2024: {"revenue": 391e9, "net_income": None}, 2023: {"revenue": 383e9, "net_income": 97e9}},
+    peer_metrics={"Sector": "Technology", "ETF Symbol": "XLK", "Beta": 1.1},
+    macro_info={"country": "USA", "gdp_growth": 2.8, "inflation_rate": None},
+    company_info={"name": "Apple Inc.", "description": "Designs \"phones\"\nand computers ..."},
+)
+
+
+def test_default_layout_is_json():
+    assert prompt_engineering.PROMPT_LAYOUT == "json"
+
+
+@pytest.mark.parametrize("metric, value, literature_context", [
+    ("pe_ratio_direct", 31.5, "The P/E ratio compares price and earnings.\n--- Page 2 ---\nMore text {with braces}."),
+    ("eps_direct", None, None),
+    ("roe_direct", 1.45, ""),
+])
+def test_json_layout_matches_baseline_prompt(metric, value, literature_context):
+    expected = _baseline_prompt(metric=metric, value=value, literature_context=literature_context, **_INPUTS)
+    assert build_metric_analysis_prompt(metric=metric, value=value, literature_context=literature_context,
+                                        layout="json", **_INPUTS) == expected
+    assert build_metric_analysis_prompt(metric=metric, value=value, literature_context=literature_context,
+                                        **_INPUTS) == expected
+
+
+def test_shared_prefix_layout_shares_the_ticker_prefix():
+    prefix = build_shared_prefix(**_INPUTS)
+    prompts = [
+        build_metric_analysis_prompt(metric=metric, value=1.0, literature_context=f"context of {metric}",
+                                     layout="shared_prefix", **_INPUTS)
+        for metric in ("eps_direct", "roa_direct")
+    ]
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+    assert prompts[0] != prompts[1]
+    assert prompts[0].endswith(json.dumps({"metric": "eps_direct", "value": 1.0,
+                                           "literature_context": "context of eps_direct"}, indent=2))
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from fastapi_rag_api import RAGAPI
+from rag.pipeline import RAGPipeline
+
+
+@pytest.fixture
+def pipeline(workdir):
+    pipeline = RAGPipeline()
+    connector = pipeline.db_connector
+    documents = ["Return on equity measures profitability.", "Debt covenants limit leverage."]
+    connector.write_chunks(["a", "b"], documents, connector.embed(documents), [{"source": "test"}] * 2)
+    yield pipeline
+    pipeline.close()
+
+
+def test_reload_keeps_the_connector_stores(pipeline):
+    connector = pipeline.db_connector
+    stores = (connector.manifest, connector.embedding_cache, connector.lexical_index)
+    client = connector.client
+    version = connector.content_version
+
+    pipeline.reload()
+
+    assert pipeline.db_connector is connector
+    assert (connector.manifest, connector.embedding_cache, connector.lexical_index) == stores
+    assert connector.client is not client
+    assert connector.content_version != version
+    assert connector.get_collection().count() == 2
+    assert [doc_id for doc_id, _ in connector.query_collection("return on equity", n_results=1)] == ["a"]
+
+
+def test_reopen_waits_for_running_client_calls(pipeline):
+    connector = pipeline.db_connector
+    in_call = threading.Event()
+    release = threading.Event()
+
+    def running_call():
+        with connector._client_gate.shared():
+            in_call.set()
+            release.wait(5)
+
+    worker = threading.Thread(target=running_call)
+    worker.start()
+    in_call.wait(5)
+    reopened = threading.Thread(target=connector.reopen)
+    reopened.start()
+    reopened.join(0.3)
+    # The client is not replaced under the running call
+    assert reopened.is_alive()
+
+    release.set()
+    worker.join(5)
+    reopened.join(5)
+    assert not reopened.is_alive()
+    assert connector.get_collection().count() == 2
+
+
+def test_api_rejects_reload_while_a_job_runs(pipeline):
+    api = RAGAPI(pipeline)
+    started = threading.Event()
+    release = threading.Event()
+
+    def work(job):
+        started.set()
+        release.wait(5)
+
+    try:
+        api.jobs.submit("ingest-folder", "literature", work)
+        started.wait(5)
+        with pytest.raises(HTTPException) as error:
+            api.reload()
+        assert error.value.status_code == 409
+
+        release.set()
+        api.jobs.shutdown()
+        assert api.reload() == {"message": "Pipeline neu geladen"}
+    finally:
+        release.set()
+        api.jobs.shutdown()
@@ -0,0 +1,72 @@
+import pytest
+
+from rag import vectordb
+from rag.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from rag.vectordb import ChromaDBConnector
+
+# Chunks sharing only the stopwords of the query: the fake embeddings (hashed bag of words) rank them first,
+# BM25 ignores them
+_GENERIC = [
+    f"The state of the market and the mood of the board at the end of the year {i}."
+    for i in range(8)
+]
+# The only chunk with the rare term the query is really about
+_TARGET = "Covenant zorblax thresholds are tested quarterly by the lending banks."
+_QUERY = "the zorblax ratio of the company"
+
+
+@pytest.fixture
+def connector(workdir):
+    db = ChromaDBConnector(path="rag/chroma_db", embedding_model="mxbai-embed-large:latest")
+    documents = _GENERIC + [_TARGET]
+    ids = [f"chunk_{i}" for i in range(len(documents))]
+    db.write_chunks(ids, documents, db.embed(documents), [{"source": "test"} for _ in documents])
+    yield db
+    db.close()
+
+
+def test_default_retrieval_mode_is_vector():
+    assert vectordb.RETRIEVAL_MODE == "vector"
+
+
+def test_hybrid_ranks_lexical_match_above_vector_only(connector):
+    target_id = f"chunk_{len(_GENERIC)}"
+    vector_ids = [doc_id for doc_id, _ in connector.query_collection(_QUERY, n_results=3, mode="vector")]
+    hybrid_ids = [doc_id for doc_id, _ in connector.query_collection(_QUERY, n_results=3, mode="hybrid")]
+
+    # Vector-only search misses the chunk, the fused ranking puts it first
+    assert target_id not in vector_ids
+    assert hybrid_ids[0] == target_id
+
+
+def test_lexical_mode_uses_bm25(connector):
+    results = connector.query_collection(_QUERY, n_results=1, mode="lexical")
+    assert results[0][1] == _TARGET
+
+
+def test_unknown_mode_is_rejected(connector):
+    with pytest.raises(ValueError):
+        connector.query_collection(_QUERY, mode="sparse")
+
+
+def test_bm25_index_add_delete_and_search(tmp_path):
+    index = BM25Index(str(tmp_path / "lexical.sqlite"))
+    index.add(["a", "b", "c"], ["price to earnings ratio", "return on equity", "earnings per share growth"])
+    assert index.count() == 3
+    # The shorter document scores higher for the same term frequency
+    assert [doc_id for doc_id, _ in index.search("earnings", 5)] == ["a", "c"]
+
+    index.delete(["a"])
+    assert [doc_id for doc_id, _ in index.search("earnings", 5)] == ["c"]
+    index.clear()
+    assert index.count() == 0
+
+
+def test_tokenize_keeps_ratio_abbreviations_and_drops_stopwords():
+    assert tokenize("The P/E ratio of a company") == ["p/e", "ratio", "company"]
+
+
+def test_reciprocal_rank_fusion_prefers_documents_ranked_by_both():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d", "a"]])
+    assert fused[:2] == ["b", "a"]
+    assert set(fused) == {"a", "b", "c", "d"}
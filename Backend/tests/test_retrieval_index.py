@@ -0,0 +1,138 @@
+import pytest
+
+from rag import pipeline as pipeline_module
+from rag.pipeline import RAGPipeline
+
+_GENERIC = [f"Chapter {i} describes the history of the stock exchange in year {1900 + i}." for i in range(40)]
+
+
+@pytest.fixture
+def pipeline(workdir):
+    pipeline = RAGPipeline(retrieval_mode="vector")
+    connector = pipeline.db_connector
+    ids = [f"generic_{i}" for i in range(len(_GENERIC))]
+    connector.write_chunks(ids, _GENERIC, connector.embed(_GENERIC), [{"source": "test"} for _ in _GENERIC])
+    pipeline.refresh_retrieval_index()
+    yield pipeline
+    pipeline.close()
+
+
+@pytest.fixture
+def searched(pipeline, monkeypatch):
+    # Query texts that were searched again
+    calls = []
+    query_ranked = pipeline._query_ranked
+
+    def spy(query_texts, n_results, query_embeddings=None):
+        calls.extend(query_texts)
+        return query_ranked(query_texts, n_results, query_embeddings)
+
+    monkeypatch.setattr(pipeline, "_query_ranked", spy)
+    return calls
+
+
+def _metric_query(pipeline, metric="eps_direct"):
+    return pipeline.query_builder.build_query(metric)
+
+
+def test_added_chunk_only_updates_the_queries_it_ranks_in(pipeline, searched):
+    query = _metric_query(pipeline)
+    connector = pipeline.db_connector
+    # The fake embedding of a text equal to the query is the query embedding itself
+    connector.write_chunks(["eps"], [query], connector.embed([query]), [{"source": "test"}])
+
+    pipeline.update_retrieval_index(["eps"])
+
+    assert query in searched
+    assert len(searched) < len(pipeline._retrieval_rankings)
+    version, index = pipeline._retrieval_index
+    assert version == connector.content_version
+    assert "eps" in index[query][1]
+
+
+def test_removed_chunk_updates_the_queries_that_used_it(pipeline, searched):
+    query = _metric_query(pipeline)
+    removed = pipeline._retrieval_rankings[query][1][0]
+    pipeline.db_connector.delete_chunks([removed])
+
+    pipeline.update_retrieval_index([])
+
+    assert query in searched
+    _, index = pipeline._retrieval_index
+    assert all(removed not in sources for _, sources in index.values())
+
+
+def test_chunk_ranked_below_all_results_keeps_them(pipeline, searched):
+    connector = pipeline.db_connector
+    # The generic chunks embed almost alike, so every query gets exact matches to leave them clearly behind
+    queries = list(pipeline._retrieval_rankings)
+    matches = [query for query in queries for _ in range(pipeline_module.METRIC_QUERY_RESULTS)]
+    ids = [f"match_{i}" for i in range(len(matches))]
+    connector.write_chunks(ids, matches, connector.embed(matches), [{"source": "test"} for _ in matches])
+    pipeline.refresh_retrieval_index()
+    searched.clear()
+    version_before, index_before = pipeline._retrieval_index
+    # A copy of a chunk no query ranks is not closer than their last results
+    text = _GENERIC[0]
+    connector.write_chunks(["copy"], [text], connector.embed([text]), [{"source": "test"}])
+
+    pipeline.update_retrieval_index(["copy"])
+
+    assert searched == []
+    version, index = pipeline._retrieval_index
+    assert version != version_before
+    assert index == index_before
+
+
+def test_incremental_update_matches_a_full_refresh(pipeline):
+    connector = pipeline.db_connector
+    texts = ["market value of equity and share price", "net income divided by total assets", "zzz qqq"]
+    ids = ["new_0", "new_1", "new_2"]
+    connector.write_chunks(ids, texts, connector.embed(texts), [{"source": "test"} for _ in texts])
+    connector.delete_chunks([pipeline._retrieval_rankings[_metric_query(pipeline)][1][0]])
+
+    pipeline.update_retrieval_index(ids)
+    _, incremental = pipeline._retrieval_index
+
+    pipeline._retrieval_index = (None, {})
+    assert pipeline.refresh_retrieval_index() == incremental
+
+
+def test_hybrid_mode_recomputes_on_the_next_run(workdir):
+    pipeline = RAGPipeline(retrieval_mode="hybrid")
+    try:
+        connector = pipeline.db_connector
+        connector.write_chunks(["a"], [_GENERIC[0]], connector.embed([_GENERIC[0]]), [{"source": "test"}])
+        pipeline.refresh_retrieval_index()
+        assert pipeline._retrieval_rankings == {}
+        connector.write_chunks(["b"], [_GENERIC[1]], connector.embed([_GENERIC[1]]), [{"source": "test"}])
+
+        pipeline.update_retrieval_index(["b"])
+        # The stale index stays marked with its old version and is refreshed by retrieve_metrics
+        assert pipeline._retrieval_index[0] != connector.content_version
+        pipeline.retrieve_metrics(["eps_direct"])
+        assert pipeline._retrieval_index[0] == connector.content_version
+    finally:
+        pipeline.close()
+
+
+def test_ingestion_error_is_not_masked_by_the_index_update(pipeline, monkeypatch, workdir):
+    def failing_ingest(self, pdf_paths, **kwargs):
+        raise RuntimeError("disk full")
+
+    def failing_update(added_chunk_ids):
+        raise AssertionError("must not run after a failed ingestion")
+
+    monkeypatch.setattr(pipeline_module.IngestionPipeline, "ingest", failing_ingest)
+    monkeypatch.setattr(pipeline, "update_retrieval_index", failing_update)
+    with pytest.raises(RuntimeError, match="disk full"):
+        pipeline.ingest_pdf_folder(str(workdir))
+
+
+def test_failing_index_update_does_not_fail_the_ingestion(pipeline, monkeypatch, workdir):
+    def failing_update(added_chunk_ids):
+        raise RuntimeError("Ollama unreachable")
+
+    monkeypatch.setattr(pipeline, "update_retrieval_index", failing_update)
+    report = pipeline.ingest_pdf_folder(str(workdir))
+    assert report["ingested"] == []
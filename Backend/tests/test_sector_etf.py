@@ -0,0 +1,35 @@
+import pytest
+
+from rag import sector_etf
+from rag.sector_etf import SectorETFCache
+
+
+@pytest.fixture
+def etf_fetches(monkeypatch):
+    fetched = []
+
+    def fetch(etf_ticker):
+        fetched.append(etf_ticker)
+        return {"ETF Name": f"{etf_ticker} Fund", "Beta": 1.1}
+
+    monkeypatch.setattr(sector_etf, "fetch_etf_insights", fetch)
+    return fetched
+
+
+def test_sector_etf_insights_are_shared_across_tickers(etf_fetches):
+    cache = SectorETFCache(persist_path=None)
+    first = cache.get_insights("Technology")
+    second = cache.get_insights("Technology")
+    assert first == second == {"Sector": "Technology", "ETF Symbol": "XLK", "ETF Name": "XLK Fund", "Beta": 1.1}
+    assert etf_fetches == ["XLK"]
+    # Unmapped sectors make no request
+    assert cache.get_insights("Shipping")["ETF Symbol"] == "N/A"
+    assert etf_fetches == ["XLK"]
+
+
+def test_sector_etf_cache_survives_a_restart(etf_fetches, tmp_path):
+    path = str(tmp_path / "sector_etf.json")
+    SectorETFCache(persist_path=path).get_insights("Energy")
+    restarted = SectorETFCache(persist_path=path)
+    assert restarted.get_insights("Energy")["ETF Name"] == "XLE Fund"
+    assert etf_fetches == ["XLE"]
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from rag.worldbank import WorldBankClient
+
+
+class _WorldBankSession:
+    """
+    Answers World Bank requests with a fixed value after a delay and counts them.
+    """
+    def __init__(self, value, latency=0.0):
+        self.value = value
+        self.latency = latency
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout):
+        with self._lock:
+            self.urls.append(url)
+        time.sleep(self.latency)
+        session = self
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return [{"page": 1}, [{"value": session.value}]]
+
+        return Response()
+
+
+def test_worldbank_values_are_cached_on_disk(tmp_path):
+    path = str(tmp_path / "worldbank.sqlite")
+    client = WorldBankClient(cache_path=path)
+    client.session = _WorldBankSession(2.5)
+    assert client.get_indicator_value("USA", "NY.GDP.MKTP.KD.ZG", 2024) == 2.5
+    assert client.get_indicator_value("USA", "NY.GDP.MKTP.KD.ZG", 2024) == 2.5
+    assert len(client.session.urls) == 1
+
+    restarted = WorldBankClient(cache_path=path)
+    restarted.session = _WorldBankSession(9.9)
+    assert restarted.get_indicator_value("USA", "NY.GDP.MKTP.KD.ZG", 2024) == 2.5
+    assert restarted.session.urls == []
+
+
+def test_worldbank_missing_values_use_the_negative_ttl(tmp_path):
+    client = WorldBankClient(cache_path=str(tmp_path / "worldbank.sqlite"), negative_ttl=0.05)
+    client.session = _WorldBankSession(None)
+    assert client.get_indicator_value("USA", "FP.CPI.TOTL.ZG", 2024) is None
+    assert client.get_indicator_value("USA", "FP.CPI.TOTL.ZG", 2024) is None
+    assert len(client.session.urls) == 1
+    time.sleep(0.1)
+    client.get_indicator_value("USA", "FP.CPI.TOTL.ZG", 2024)
+    assert len(client.session.urls) == 2
+
+
+def test_worldbank_concurrent_lookups_share_one_request(tmp_path):
+    client = WorldBankClient(cache_path=str(tmp_path / "worldbank.sqlite"))
+    client.session = _WorldBankSession(1.0, latency=0.1)
+    indicators = {"gdp_growth": "NY.GDP.MKTP.KD.ZG", "inflation_rate": "FP.CPI.TOTL.ZG"}
+    threads = [threading.Thread(target=client.get_indicator_values, args=("DEU", indicators, 2024)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(client.session.urls) == len(indicators)
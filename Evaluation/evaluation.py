@@ -1,5 +1,9 @@
 import os
-from Backend.rag.vectordb import ChromaDBConnector
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from Backend.rag.vectordb import ChromaDBConnector, RETRIEVAL_MODE
 from Backend.rag.llm import call_llm
 import pandas as pd
 import logging
@@ -8,6 +12,12 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s',
     datefmt='%H:%M:%S'
 )
+REPEATS = 5  # Anzahl der Wiederholungen pro Modell
+# Anzahl gleichzeitig bearbeiteter Fragen pro Modell
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "2"))
+# Antworten aller Modelle und Durchläufe, eine JSON-Zeile pro beantworteter Frage
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
 def _sanitize_for_path(name: str) -> str:
     """Ersetzt problematische Zeichen für Dateisystem-Pfade."""
     return "".join(c if c.isalnum() or c in ('-', '_') else '-' for c in name)
@@ -84,7 +94,61 @@ class Evaluation:
     def add_single_pdf(self, path: str):
         self.db_connector.add_pdf_to_collection(pdf_path=path)
 
-    def evaluate(self, models=None, temperature: float = 0.0, out_dir: str = "Results"):
+    def query_batch(self, query_texts: list, n_results: int = 5, retrieval_mode: str = None) -> list:
+        """
+        Holt den Kontext für mehrere Fragen mit einer Embedding-Anfrage und einer Suche.
+        """
+        contexts = []
+        for results in self.db_connector.query_collection_batch(query_texts, n_results, mode=retrieval_mode):
+            # Nur die Dokument-Texte zum Kontext hinzufügen (ohne Quellenangabe)
+            contexts.append("\n\n".join(doc_text for doc_id, doc_text in results))
+        return contexts
+
+    def corpus_fingerprint(self) -> dict:
+        """
+        Kennung des indexierten Korpus: Hash über alle Chunk-IDs (sie enthalten den Inhalts-Hash der PDF
+        und das Chunking) und die verwendeten Chunking-Einstellungen (chunk_size/chunk_overlap).
+        """
+        collection = self.db_connector.get_collection()
+        if collection is None:
+            return {"chunks": None, "chunking": []}
+        result = collection.get(include=["metadatas"])
+        chunks = hashlib.sha256("\n".join(sorted(result["ids"])).encode("utf-8")).hexdigest()
+        chunking = sorted({(metadata or {}).get("chunking", "") for metadata in result["metadatas"]})
+        return {"chunks": chunks, "chunking": chunking}
+
+    def config_hash(self, temperature: float, n_results: int, retrieval_mode: str = None) -> str:
+        """
+        Kennung aller Einstellungen, die die Antworten beeinflussen (Temperatur, Top-k, Retrieval-Modus,
+        Embedding-Modell, Prompt-Texte, Datenbank-Verzeichnis sowie Korpus und Chunking);
+        Checkpoint-Einträge werden nur bei gleicher Kennung wiederverwendet.
+        """
+        config = {
+            "temperature": temperature,
+            "n_results": n_results,
+            "retrieval_mode": retrieval_mode or RETRIEVAL_MODE,
+            "embedding_model": self.embedding_model,
+            "persist_directory": os.path.abspath(self.persist_directory),
+            "corpus": self.corpus_fingerprint(),
+            "prompt_context": self.prompt_builder("{question}", "{context}"),
+            "prompt_no_context": self.prompt_builder("{question}", ""),
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def evaluate(self, models=None, temperature: float = 0.0, out_dir: str = "Results", repeats: int = REPEATS,
+                 concurrency: int = EVAL_CONCURRENCY, resume: bool = True, n_results: int = 5,
+                 retrieval_mode: str = None):
+        """
+        Beantwortet alle Fragen je Modell und Durchlauf mit und ohne Kontext.
+        Der Kontext wird einmal pro Frage abgerufen, die Antworten eines Modells werden parallel
+        (höchstens concurrency gleichzeitig) erzeugt und jede fertige Frage sofort an
+        <out_dir>/checkpoint.jsonl angehängt. Ein abgebrochener Lauf setzt beim nächsten Aufruf
+        an den noch fehlenden (Modell, Durchlauf, Frage)-Kombinationen fort; fehlgeschlagene
+        Fragen werden nicht gespeichert und beim nächsten Aufruf wiederholt.
+        Jeder Eintrag trägt die Kennung der Einstellungen (config_hash); Antworten eines Laufs mit anderen
+        Einstellungen werden weder fortgesetzt noch in die CSV-Dateien übernommen.
+        Die CSV-Dateien je Durchlauf werden aus dem Checkpoint geschrieben.
+        """
         # Fallback-Modelle (als Liste, nicht als ein einzelner String)
         if models is None:
             models = ["mistral:7b"]
@@ -98,50 +162,136 @@ class Evaluation:
         df = pd.read_csv(self.csv_path, encoding="utf-8", delimiter=";")
         questions = df["question"].tolist()
 
-        REPEATS = 5  # Anzahl der Wiederholungen pro Modell
+        checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+        if not resume and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        _truncate_partial_line(checkpoint_path)
+        config = self.config_hash(temperature, n_results, retrieval_mode)
+        records = _read_checkpoint(checkpoint_path, config)
+        done = {
+            (r["model"], r["run"], r["question_number"])
+            for r in records
+            if 0 < r["question_number"] <= len(questions) and questions[r["question_number"] - 1] == r["question"]
+        }
 
-        for model in models:
-            model_safe = _sanitize_for_path(model)
-            model_dir = os.path.join(out_dir, model_safe)
-            os.makedirs(model_dir, exist_ok=True)
+        # Kontext einmal pro Frage abrufen, nicht pro Modell und Durchlauf
+        logging.info(f"Retrieving context for {len(questions)} questions (config {config})")
+        contexts = self.query_batch(questions, n_results, retrieval_mode)
+        checkpoint_lock = threading.Lock()
 
-            for run_idx in range(1, REPEATS + 1):
-                rows = []
-
-                for i, question in enumerate(questions, start=1):
-                    context = self.query(question)
-                    logging.info(f"[{model} | Run {run_idx}] Retrieved context for question {i}: {context[:100]}...")
-                    context_prompt = self.prompt_builder(question, context)
-                    no_context_prompt = self.prompt_builder(question, "")
-
-                    logging.info(f"[{model} | Run {run_idx}] Evaluating question {i}: {question}")
-
-                    answer_context = call_llm(
-                        prompt=context_prompt, model_name=model, temperature=temperature
-                    )
-                    answer_no_context = call_llm(
-                        prompt=no_context_prompt, model_name=model, temperature=temperature
-                    )
-
-                    rows.append({
-                        "model": model,
-                        "run": run_idx,
-                        "question_number": i,
-                        "question": question,
-                        "answer_context": answer_context,
-                        "answer_no_context": answer_no_context,
-                    })
-
-                # gewünschte Spaltenreihenfolge
-                out_df = pd.DataFrame(
-                    rows,
-                    columns=["model", "run", "question_number", "question", "answer_context", "answer_no_context"]
-                )
-                out_path = os.path.join(model_dir, f"answers_run{run_idx}_{model_safe}.csv")
-                out_df.to_csv(out_path, index=False, encoding="utf-8")
+        def answer(model: str, run_idx: int, i: int):
+            question = questions[i - 1]
+            context_prompt = self.prompt_builder(question, contexts[i - 1])
+            no_context_prompt = self.prompt_builder(question, "")
+            logging.info(f"[{model} | Run {run_idx}] Evaluating question {i}: {question}")
+
+            # Wiederholungen sollen neu generieren, nicht aus dem Antwort-Cache kommen
+            answer_context = call_llm(
+                prompt=context_prompt, model_name=model, temperature=temperature, use_cache=False
+            )
+            answer_no_context = call_llm(
+                prompt=no_context_prompt, model_name=model, temperature=temperature, use_cache=False
+            )
+            record = {
+                "config": config,
+                "model": model,
+                "run": run_idx,
+                "question_number": i,
+                "question": question,
+                "answer_context": answer_context,
+                "answer_no_context": answer_no_context,
+            }
+            with checkpoint_lock:
+                _append_checkpoint(checkpoint_path, record)
+
+        for model in models:
+            pending = [
+                (run_idx, i)
+                for run_idx in range(1, repeats + 1)
+                for i in range(1, len(questions) + 1)
+                if (model, run_idx, i) not in done
+            ]
+            logging.info(f"[{model}] {len(pending)} of {repeats * len(questions)} answers pending")
+            failed = 0
+            executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+            try:
+                futures = {executor.submit(answer, model, run_idx, i): (run_idx, i) for run_idx, i in pending}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed += 1
+                        run_idx, i = futures[future]
+                        logging.error(f"[{model} | Run {run_idx}] Question {i} failed: {e}")
+            finally:
+                # Bei Abbruch laufende Fragen noch abschließen, wartende verwerfen
+                executor.shutdown(wait=True, cancel_futures=True)
+                _write_result_csvs(_read_checkpoint(checkpoint_path, config), out_dir, models)
+            if failed:
+                logging.warning(f"[{model}] {failed} questions failed, run again to retry them")
 
         return None
 
+
+def _read_checkpoint(path: str, config: str) -> list:
+    """
+    Liest die gespeicherten Antworten mit der Einstellungs-Kennung config; eine beim Abbruch unvollständig
+    geschriebene Zeile wird ignoriert.
+    """
+    records = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("config") != config:
+                continue
+            records[(record["model"], record["run"], record["question_number"])] = record
+    return list(records.values())
+
+
+def _truncate_partial_line(path: str):
+    """
+    Entfernt eine beim Abbruch unvollständig geschriebene letzte Zeile, damit neue Antworten in eigenen Zeilen beginnen.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _append_checkpoint(path: str, record: dict):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _write_result_csvs(records: list, out_dir: str, models: list):
+    """
+    Schreibt je Modell und Durchlauf eine CSV-Datei mit den bisher gespeicherten Antworten.
+    """
+    columns = ["model", "run", "question_number", "question", "answer_context", "answer_no_context"]
+    for model in models:
+        model_safe = _sanitize_for_path(model)
+        model_dir = os.path.join(out_dir, model_safe)
+        runs = sorted({r["run"] for r in records if r["model"] == model})
+        for run_idx in runs:
+            rows = sorted(
+                (r for r in records if r["model"] == model and r["run"] == run_idx),
+                key=lambda r: r["question_number"]
+            )
+            os.makedirs(model_dir, exist_ok=True)
+            # gewünschte Spaltenreihenfolge
+            out_df = pd.DataFrame(rows, columns=columns)
+            out_path = os.path.join(model_dir, f"answers_run{run_idx}_{model_safe}.csv")
+            out_df.to_csv(out_path, index=False, encoding="utf-8")
+
 if __name__ == "__main__":
     logging.info("Starting Evaluation")
     evaluator = Evaluation()
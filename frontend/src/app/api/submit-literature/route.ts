@@ -13,15 +13,42 @@ const FASTAPI_BASE_URL =
 // Standard-Ordner: <projectRoot>/public/Literature
 const LITERATURE_DIR = path.join(process.cwd(), "public", "Literature");
 
+// Polling des Ingestion-Jobs (FastAPI verarbeitet die PDFs im Hintergrund)
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_TIMEOUT_MS = 30 * 60 * 1000;
+
+/**
+ * Wartet, bis der Ingestion-Job im Backend abgeschlossen ist, und gibt den letzten Status zurück.
+ */
+async function waitForJob(jobId: string) {
+  const url = `${FASTAPI_BASE_URL}/api/jobs/${encodeURIComponent(jobId)}`;
+  const deadline = Date.now() + JOB_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const res = await fetch(url, { cache: "no-store" });
+    const job = await res.json().catch(() => ({}));
+    if (!res.ok) {
+      throw new Error(`Job-Status nicht abrufbar (${res.status})`);
+    }
+    if (["completed", "partial", "failed", "cancelled"].includes(job?.status)) {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+  throw new Error("Zeitüberschreitung beim Warten auf den Ingestion-Job");
+}
+
 /**
  * Löscht ALLE Inhalte im Ordner, lässt den Ordner selbst aber bestehen.
+ * Pfade in `keep` (z. B. fehlgeschlagene PDFs) bleiben erhalten.
  */
-async function clearDirectoryContents(dir: string) {
+async function clearDirectoryContents(dir: string, keep: string[] = []) {
   let deleted: string[] = [];
+  const kept = new Set(keep.map((p) => path.resolve(p)));
   try {
     const entries = await readdir(dir, { withFileTypes: true });
     for (const entry of entries) {
       const abs = path.join(dir, entry.name);
+      if (kept.has(path.resolve(abs))) continue;
       // rm kann rekursiv Dateien/Ordner entfernen
       await rm(abs, { recursive: true, force: true });
       deleted.push(abs);
@@ -71,8 +98,36 @@ export async function POST(req: Request) {
       );
     }
 
-    // 2) Inhalte im Literature-Ordner löschen (Ordner bleibt erhalten)
-    const deleted = await clearDirectoryContents(folderPath);
+    // 2) Auf den Hintergrund-Job warten – Dateien erst danach löschen
+    const job = backend?.job_id ? await waitForJob(backend.job_id) : null;
+    const failedFiles = Object.keys(job?.result?.failed ?? {});
+    if (job && !["completed", "partial"].includes(job.status)) {
+      return NextResponse.json(
+        {
+          error: "Backend-Ingestion fehlgeschlagen",
+          job,
+          sent: { folder_path: folderPath, fastapi_url: fastApiUrl },
+        },
+        { status: 502 }
+      );
+    }
+
+    // 3) Inhalte im Literature-Ordner löschen (Ordner bleibt erhalten) – fehlgeschlagene PDFs bleiben liegen
+    const deleted = await clearDirectoryContents(folderPath, failedFiles);
+
+    if (failedFiles.length > 0) {
+      return NextResponse.json(
+        {
+          error: "Einige PDFs konnten nicht verarbeitet werden und wurden nicht gelöscht",
+          failed: job.result.failed,
+          folder_path: folderPath,
+          deleted_count: deleted.length,
+          backend,
+          job,
+        },
+        { status: 502 }
+      );
+    }
 
     return NextResponse.json(
       {
@@ -80,6 +135,7 @@ export async function POST(req: Request) {
         folder_path: folderPath,
         deleted_count: deleted.length,
         backend,
+        job,
       },
       { status: 200 }
     );
@@ -101,7 +157,9 @@ export async function POST(req: Request) {
  * Zweck:
  *  - Ruft dein FastAPI-Backend unter /api/ingest-folder auf
  *  - Übergibt den Pfad zum Ordner public/Literature (oder optional einen anderen Ordner via JSON)
+ *  - Wartet per Polling auf /api/jobs/{job_id}, bis die Ingestion im Hintergrund fertig ist
  *  - Löscht anschließend ALLE Inhalte in diesem Ordner (Ordner selbst bleibt bestehen)
+ *  - PDFs, die das Backend nicht verarbeiten konnte, bleiben liegen; die Antwort ist dann ein Fehler (502)
  *
  * Nutzung:
  *  - POST /api/submit-literature   → nimmt automatisch public/Literature
@@ -116,6 +174,7 @@ export async function POST(req: Request) {
  *    "message": "...",
  *    "folder_path": "...",
  *    "deleted_count": 3,
- *    "backend": {... Antwort vom FastAPI ...}
+ *    "backend": {... Antwort vom FastAPI ...},
+ *    "job": {... letzter Job-Status ...}
  *  }
  */
\ No newline at end of file